@@ -1,78 +1,231 @@
 # merge_tree_controller.py
 import sys
+import json
+import time
 import random
-from functools import lru_cache
-from collections import deque
+import traceback
+from importlib.util import find_spec
 
 from PySide6 import QtCore, QtWidgets, QtUiTools
-from PySide6.QtWidgets import QTreeWidgetItem, QLabel, QWidget
+from PySide6.QtWidgets import QLabel, QWidget
 from PySide6.QtGui import QColor, QBrush
 
-try:
-    import psutil
-    import matplotlib
-    matplotlib.use("QtAgg")
-    from matplotlib.figure import Figure
-    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-    _HAS_MONITOR = True
-except Exception:
-    _HAS_MONITOR = False
-    # el código seguirá funcionando sin monitor; solo no mostrará gráficas
-
-# ---------------- Instrumented merge sort (generador de eventos) ----------------
-def merge_sort_gen(arr, l, r):
-    """Generador que ordena arr[l:r] y emite eventos:
-       ('enter', l, r, snapshot)
-       ('compare', i, j)
-       ('take', idx)
-       ('write', l, r, pos, val)
-       ('exit', l, r, snapshot_final)
+# psutil y pyqtgraph se cargan recién al arrancar la primera corrida, cuando
+# se muestra la gráfica (_setup_monitor); aquí solo se comprueba que estén
+_HAS_MONITOR = find_spec("psutil") is not None and find_spec("pyqtgraph") is not None
+# el código seguirá funcionando sin monitor; solo no mostrará gráficas
+
+from merge_events import STRIDE
+from bounds import mergesort_best, mergesort_worst
+from monitor import PlaybackMetrics, RunStats, SampleRing, format_summary
+from instrumented import format_costs
+from merge_trace import TraceFile, record_trace, save_timeline
+from merge_timeline import (
+    MergeTreeState, MergeTimeline, count_stats, node_range,
+    STYLE_ACTIVE, STYLE_DONE, STYLE_COMPARED,
+)
+
+# ritmo de refresco y parte del frame reservada para aplicar eventos
+FRAME_MS = 16
+EVENT_BUDGET_S = 0.010
+EVENT_BATCH = 256  # eventos entre consultas al reloj
+# el costo de pintar (avisar a la vista + lo que el repintado de Qt pasa del
+# frame) se estima con una media móvil y se descuenta del presupuesto de
+# eventos, que nunca baja de MIN_EVENT_BUDGET_S
+MIN_EVENT_BUDGET_S = 0.001
+PAINT_COST_ALPHA = 0.25
+
+# velocidad inicial de reproducción (eventos por segundo)
+DEFAULT_EVENTS_PER_SEC = 10
+
+# cada cuánto se reescribe el HUD de métricas mientras corre
+HUD_REFRESH_S = 0.25
+
+# colores de cada estilo de nodo (STYLE_IDLE usa el fondo por defecto)
+STYLE_COLORS = {
+    STYLE_ACTIVE: "#00aaff",
+    STYLE_DONE: "#1a8a1a",
+    STYLE_COMPARED: "#f60000",
+}
+
+# elementos por celda de contenido y tamaño hasta el que se expande todo el árbol
+MAX_CELL_ITEMS = 64
+EXPAND_ALL_MAX_N = 2048
+
+# tamaño máximo del arreglo: el modelo del árbol es perezoso, así que
+# generarlo y recorrerlo es barato también con 10^6
+MAX_N = 1_000_000
+# tamaño máximo para grabar la corrida en memoria: la grabación es
+# incremental, pero una corrida completa guarda todos sus eventos
+# (~n·log2(n)·3 eventos de 20-40 bytes) y un checkpoint de O(n) cada n
+# eventos; con 10^5 son ~5M eventos y ~300 MB. Por encima, la corrida se
+# graba directo a disco con "Guardar traza" y se reproduce abriéndola (mmap).
+RECORD_MAX_N = 100_000
+
+# ---------------- Modelo virtual del árbol ----------------
+class MergeTreeModel(QtCore.QAbstractItemModel):
+    """Árbol de llamadas de merge sort sin items pre-creados.
+
+       Cada QModelIndex guarda como internalId el índice heap del nodo
+       (raíz 1, hijos 2k y 2k+1) y su rango (l, r) se calcula bajando desde
+       la raíz. Los textos se formatean solo cuando la vista los pide, es
+       decir, para las filas visibles, y se cachean hasta que el nodo cambia.
     """
-    yield ('enter', l, r, arr[l:r])
-    if r - l <= 1:
-        yield ('exit', l, r, arr[l:r])
-        return
-    m = (l + r) // 2
-    yield from merge_sort_gen(arr, l, m)
-    yield from merge_sort_gen(arr, m, r)
-    i, j = l, m
-    temp = []
-    while i < m and j < r:
-        yield ('compare', i, j)
-        if arr[i] <= arr[j]:
-            temp.append(arr[i]); yield ('take', i); i += 1
+    HEADERS = ("Segmento [l:r]", "Contenido")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.state = None
+        self._ranges = {}
+        self._texts = {}
+        self._brushes = {style: QBrush(QColor(c)) for style, c in STYLE_COLORS.items()}
+
+    def set_state(self, state):
+        self.beginResetModel()
+        self.state = state
+        self._ranges.clear()
+        self._texts.clear()
+        self.endResetModel()
+
+    def node_range(self, idx):
+        rng = self._ranges.get(idx)
+        if rng is None:
+            if len(self._ranges) > 65536:
+                self._ranges.clear()
+            rng = self._ranges[idx] = node_range(self.state.n, idx)
+        return rng
+
+    def node_index(self, idx, column=0):
+        row = 0 if idx == 1 else idx & 1
+        return self.createIndex(row, column, idx)
+
+    def nodes_changed(self, nodes, visible=None):
+        """Invalida la caché de los nodos dados y avisa a la vista. Con
+        `visible` (ver visible_nodes) solo se avisa de las filas a la vista:
+        las demás piden sus datos de nuevo cuando se muestran."""
+        texts = self._texts
+        if len(nodes) >= len(texts):
+            texts.clear()
         else:
-            temp.append(arr[j]); yield ('take', j); j += 1
-    while i < m:
-        temp.append(arr[i]); yield ('take', i); i += 1
-    while j < r:
-        temp.append(arr[j]); yield ('take', j); j += 1
-    for idx, val in enumerate(temp):
-        pos = l + idx
-        yield ('write', l, r, pos, val)
-        arr[pos] = val
-    yield ('exit', l, r, arr[l:r])
-
-def make_sort_events(original):
-    arr = original[:]  # copia que se muta dentro del generator
-    return merge_sort_gen(arr, 0, len(arr)), arr
-
-# ---------------- Cálculo exacto de mejor/peor caso por recurrencia ----------------
-@lru_cache(maxsize=None)
-def worst_case_comparisons(n):
-    if n <= 1:
-        return 0
-    a = n // 2
-    b = n - a
-    return worst_case_comparisons(a) + worst_case_comparisons(b) + (n - 1)
-
-@lru_cache(maxsize=None)
-def best_case_comparisons(n):
-    if n <= 1:
-        return 0
-    a = n // 2
-    b = n - a
-    return best_case_comparisons(a) + best_case_comparisons(b) + min(a, b)
+            for idx in nodes:
+                texts.pop(idx, None)
+        if visible is None:
+            if len(nodes) > 1024:
+                self.layoutAboutToBeChanged.emit()
+                self.layoutChanged.emit()
+                return
+            visible = nodes
+        else:
+            visible = [idx for idx in visible if idx in nodes]
+        for idx in visible:
+            self.dataChanged.emit(self.node_index(idx, 0), self.node_index(idx, 1))
+
+    def refresh(self, visible=None):
+        """Todo cambió (p. ej. tras un seek). Con `visible` se avisa solo de
+        esas filas, sin relayout de la vista."""
+        self._texts.clear()
+        if visible is None:
+            self.layoutAboutToBeChanged.emit()
+            self.layoutChanged.emit()
+            return
+        for idx in visible:
+            self.dataChanged.emit(self.node_index(idx, 0), self.node_index(idx, 1))
+
+    # ------------ API de QAbstractItemModel ------------
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if self.state is None or column < 0 or column > 1 or row < 0:
+            return QtCore.QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(0, column, 1) if row == 0 else QtCore.QModelIndex()
+        p = parent.internalId()
+        l, r = self.node_range(p)
+        if r - l <= 1 or row > 1:
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column, 2 * p + row)
+
+    def parent(self, index=QtCore.QModelIndex()):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        idx = index.internalId()
+        if idx <= 1:
+            return QtCore.QModelIndex()
+        return self.node_index(idx >> 1)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if self.state is None:
+            return 0
+        if not parent.isValid():
+            return 1
+        if parent.column() > 0:
+            return 0
+        l, r = self.node_range(parent.internalId())
+        return 2 if r - l > 1 else 0
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 2
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        idx = index.internalId()
+        if role == QtCore.Qt.DisplayRole:
+            l, r = self.node_range(idx)
+            if index.column() == 0:
+                return f"[{l}:{r}]"
+            text = self._texts.get(idx)
+            if text is None:
+                text = self._texts[idx] = self.state.node_text(idx, l, r, MAX_CELL_ITEMS)
+            return text
+        if role == QtCore.Qt.BackgroundRole and index.column() == 0:
+            l, r = self.node_range(idx)
+            return self._brushes.get(self.state.node_style(idx, l, r))
+        return None
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+def visible_nodes(view):
+    """idx (internalId) de las filas que la vista muestra ahora, de arriba
+    abajo; con filas de alto uniforme son unas pocas decenas."""
+    nodes = []
+    height = view.viewport().height()
+    index = view.indexAt(QtCore.QPoint(0, 0))
+    while index.isValid() and view.visualRect(index).top() < height:
+        nodes.append(index.internalId())
+        index = view.indexBelow(index)
+    return nodes
+
+# ---------------- Costos de trazas sin cabecera de costos ----------------
+class TraceCostsSignals(QtCore.QObject):
+    done = QtCore.Signal(object, object)   # MergeTimeline, SortStats (None si falló)
+
+
+class TraceCostsWorker(QtCore.QRunnable):
+    """Cuenta en otro hilo los costos de una traza de la versión 1, que no
+    los trae en la cabecera. Abre su propio mmap: la reproducción puede
+    cerrar la traza mientras tanto."""
+
+    def __init__(self, timeline):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.timeline = timeline
+        self.path = timeline.trace.path
+        self.signals = TraceCostsSignals()
+
+    def run(self):
+        stats = None
+        try:
+            trace = TraceFile(self.path)
+            try:
+                stats = count_stats(trace.events, trace.count)
+            finally:
+                trace.close()
+        except (OSError, ValueError):
+            traceback.print_exc()
+        self.signals.done.emit(self.timeline, stats)
+
 
 # ---------------- Controller que carga el .ui y conecta todo ----------------
 class MergeTreeController:
@@ -91,9 +244,12 @@ class MergeTreeController:
         self.win.setWindowTitle("MergeSort - Tree Visual (controller)")
 
         # Buscar widgets por objectName (los definidos en Designer)
-        self.tree = self.win.findChild(QtWidgets.QTreeWidget, "treeWidget")
+        self.tree = self.win.findChild(QtWidgets.QTreeView, "treeView")
+        self.model = MergeTreeModel(self.win)
         # proteger por si tree no existe
         if self.tree is not None:
+            self.tree.setModel(self.model)
+            self.tree.setUniformRowHeights(True)
             header = self.tree.header()
             try:
                 header.setFixedHeight(70)
@@ -112,35 +268,64 @@ class MergeTreeController:
         self.btnStep = self.win.findChild(QtWidgets.QPushButton, "btnStep")
         self.btnReset = self.win.findChild(QtWidgets.QPushButton, "btnReset")
         self.spinSpeed = self.win.findChild(QtWidgets.QSpinBox, "spinSpeed")
+        self.chkMaxSpeed = self.win.findChild(QtWidgets.QCheckBox, "chkMaxSpeed")
         self.lblComparisons = self.win.findChild(QtWidgets.QLabel, "lblComparisons")
         # opcionales: etiquetas para mejor/peor caso si el diseñador las agregó
         self.lblBest = self.win.findChild(QtWidgets.QLabel, "lblBest")
         self.lblWorst = self.win.findChild(QtWidgets.QLabel, "lblWorst")
+        self.lblCosts = self.win.findChild(QtWidgets.QLabel, "lblCosts")
+        # línea de tiempo: slider para saltar a cualquier evento
+        self.sliderTimeline = self.win.findChild(QtWidgets.QSlider, "sliderTimeline")
+        self.lblEvent = self.win.findChild(QtWidgets.QLabel, "lblEvent")
+        # HUD de métricas de reproducción y su exportación a JSON
+        self.chkHud = self.win.findChild(QtWidgets.QCheckBox, "chkHud")
+        self.btnExportMetrics = self.win.findChild(QtWidgets.QPushButton, "btnExportMetrics")
+        self.lblHud = self.win.findChild(QtWidgets.QLabel, "lblHud")
+        # barra de estado: resumen del monitor al terminar cada corrida
+        # (QMainWindow.statusBar() la crea si el .ui no la trae)
+        self.statusBar = (self.win.statusBar()
+                          if isinstance(self.win, QtWidgets.QMainWindow) else None)
+        # trazas binarias: grabar la corrida / reproducir una grabada
+        self.btnSaveTrace = self.win.findChild(QtWidgets.QPushButton, "btnSaveTrace")
+        self.btnOpenTrace = self.win.findChild(QtWidgets.QPushButton, "btnOpenTrace")
         # widget donde insertaremos el gráfico (debe existir en el .ui con ese objectName)
         self.plot_container = self.win.findChild(QtWidgets.QWidget, "plotWidget")
 
         # Estado / datos
         self.arr = []
-        self.tree_items = {}  # mapa (l,r) -> QTreeWidgetItem
-        self.generator = None
+        self.timeline = None  # eventos grabados + checkpoints
+        self.state = MergeTreeState([])
+        self.cursor = 0  # índice del próximo evento a aplicar
         self.sorted_copy = None
         self.timer = QtCore.QTimer(self.win)
-        self.timer.timeout.connect(self.process_next_event)
+        self.timer.timeout.connect(self.process_frame)
+        self.timer.setInterval(FRAME_MS)
         self.is_running = False
         self.comparisons = 0
-
-        # Monitor (si psutil/matplotlib disponibles)
+        # velocidad en eventos por segundo; max_speed drena todo lo que cabe en el frame
+        self.events_per_sec = DEFAULT_EVENTS_PER_SEC
+        self.max_speed = False
+        self._credit = 0.0
+        self._last_frame = 0.0
+        # estimación del costo de pintado y trabajo del tick anterior (s)
+        self._paint_cost = 0.0
+        self._tick_work = 0.0
+
+        # Monitor (si psutil/pyqtgraph disponibles): se arma en la primera
+        # corrida, ver _ensure_monitor
         self._monitor_timer = None
+        self._monitor_tried = False
         self._proc = None
-        self._cpu = deque()
-        self._mem = deque()
-        self._times = deque()
-        if _HAS_MONITOR:
-            try:
-                self._setup_monitor(sample_interval_ms=200, window_seconds=30)
-            except Exception:
-                # si algo falla, desactivar monitor silenciosamente
-                self._monitor_timer = None
+        self._ring = None
+        # métricas de la corrida en curso y resumen de la última terminada
+        self.run_stats = None
+        self.last_summary = None
+        self._active_since = None
+        # contadores e histogramas de grabación y reproducción (ver monitor.py)
+        self.metrics = PlaybackMetrics()
+        self._hud_at = 0.0
+        # conteo de costos de una traza vieja en curso (TraceCostsWorker)
+        self._costs_worker = None
 
         # Conexiones a botones
         if self.btnGenerate: self.btnGenerate.clicked.connect(self.generate)
@@ -149,50 +334,71 @@ class MergeTreeController:
         if self.btnStep: self.btnStep.clicked.connect(self.step_once)
         if self.btnReset: self.btnReset.clicked.connect(self.reset_view)
         if self.spinSpeed: self.spinSpeed.valueChanged.connect(self.on_speed_change)
+        if self.chkMaxSpeed: self.chkMaxSpeed.toggled.connect(self.on_max_speed_toggled)
+        if self.sliderTimeline: self.sliderTimeline.valueChanged.connect(self.seek)
+        if self.chkHud: self.chkHud.toggled.connect(self.on_hud_toggled)
+        if self.btnExportMetrics: self.btnExportMetrics.clicked.connect(self.export_metrics_dialog)
+        if self.btnSaveTrace: self.btnSaveTrace.clicked.connect(self.save_trace_dialog)
+        if self.btnOpenTrace: self.btnOpenTrace.clicked.connect(self.open_trace_dialog)
 
         # Ajustes por defecto
         if self.spinN:
-            self.spinN.setRange(1, 600)
+            self.spinN.setRange(1, MAX_N)
             self.spinN.setValue(8)
-        # velocidad por defecto 120 ms
+        # velocidad por defecto: sin señales, porque setRange recorta el 0
+        # inicial a 1 y on_speed_change lo copiaría en events_per_sec
         if self.spinSpeed:
-            self.spinSpeed.setRange(1, 2000)
-            self.spinSpeed.setValue(120)
-            self.timer.setInterval(120)
-        else:
-            self.timer.setInterval(120)
+            self.spinSpeed.blockSignals(True)
+            self.spinSpeed.setRange(1, 1000000)
+            self.spinSpeed.setValue(DEFAULT_EVENTS_PER_SEC)
+            self.spinSpeed.blockSignals(False)
 
         # Generación inicial
         self.generate()
 
     # ------------ Monitor: setup + sampling --------------------------------
+    def _ensure_monitor(self):
+        """Arma el monitor la primera vez que hace falta (un solo intento)."""
+        if self._monitor_tried or not _HAS_MONITOR:
+            return
+        self._monitor_tried = True
+        try:
+            self._setup_monitor(sample_interval_ms=200, window_seconds=30)
+        except Exception:
+            # si algo falla, desactivar monitor silenciosamente
+            self._monitor_timer = None
+
     def _setup_monitor(self, sample_interval_ms=200, window_seconds=20):
-        """Configura el monitor si psutil y matplotlib están disponibles."""
+        """Configura el monitor si psutil y pyqtgraph están disponibles: las
+        muestras van a un SampleRing y cada una solo actualiza los datos de
+        las curvas (sin rehacer listas ni redibujar toda la figura)."""
         if not _HAS_MONITOR:
             return
+        import numpy as np
+        import psutil
+        import pyqtgraph as pg
+
         self._proc = psutil.Process()
         self._sample_interval_ms = sample_interval_ms
         self._window_seconds = window_seconds
         max_points = max(10, int(window_seconds * 1000 // sample_interval_ms))
-        self._cpu = deque(maxlen=max_points)
-        self._mem = deque(maxlen=max_points)
-        self._times = deque(maxlen=max_points)
-
-        # preparar figura
-        fig = Figure(figsize=(4,2.2), tight_layout=True)
-        self._ax_cpu = fig.add_subplot(211)
-        self._ax_mem = fig.add_subplot(212, sharex=self._ax_cpu)
-        self._ax_cpu.set_ylabel("CPU %")
-        self._ax_mem.set_ylabel("RSS (MB)")
-        self._ax_mem.set_xlabel("muestras")
-
-        self._line_cpu, = self._ax_cpu.plot([], [], lw=1.4, label="CPU%")
-        self._line_mem, = self._ax_mem.plot([], [], lw=1.2, color="#66ffcc", label="RSS MB")
-        self._ax_cpu.grid(True, alpha=0.25)
-        self._ax_mem.grid(True, alpha=0.25)
-
-        self._canvas = FigureCanvas(fig)
-        # insertar canvas en plot_container (creado en Designer)
+        self._ring = SampleRing(max_points)
+
+        # preparar gráfica: CPU arriba, RSS abajo, eje x compartido
+        self._plot = pg.GraphicsLayoutWidget()
+        plot_cpu = self._plot.addPlot(row=0, col=0)
+        plot_mem = self._plot.addPlot(row=1, col=0)
+        plot_mem.setXLink(plot_cpu)
+        plot_cpu.setLabel("left", "CPU %")
+        plot_mem.setLabel("left", "RSS (MB)")
+        plot_mem.setLabel("bottom", "muestras")
+        plot_cpu.showGrid(x=True, y=True, alpha=0.25)
+        plot_mem.showGrid(x=True, y=True, alpha=0.25)
+        self._line_cpu = plot_cpu.plot(pen=pg.mkPen(width=1.4))
+        self._line_mem = plot_mem.plot(pen=pg.mkPen("#66ffcc", width=1.2))
+        self._xs = np.arange(max_points)
+
+        # insertar la gráfica en plot_container (creado en Designer)
         if self.plot_container is not None:
             if self.plot_container.layout() is None:
                 self.plot_container.setLayout(QtWidgets.QVBoxLayout())
@@ -201,7 +407,7 @@ class MergeTreeController:
                 w = self.plot_container.layout().itemAt(i).widget()
                 if w:
                     w.setParent(None)
-            self.plot_container.layout().addWidget(self._canvas)
+            self.plot_container.layout().addWidget(self._plot)
 
         # timer de muestreo
         self._monitor_timer = QtCore.QTimer(self.win)
@@ -215,54 +421,71 @@ class MergeTreeController:
             pass
 
     def _sample_metrics(self):
-        """Muestra cpu% y rss del proceso actual y actualiza las curvas."""
+        """Muestra cpu% y rss del proceso actual y actualiza las curvas. El
+        tiempo que tarda se suma al costo del monitor de la corrida."""
         if not _HAS_MONITOR or self._proc is None:
             return
+        t0 = time.perf_counter()
         try:
             cpu_pct = self._proc.cpu_percent(interval=None)
             mem_rss = self._proc.memory_info().rss / (1024 * 1024.0)  # MB
         except Exception:
             return
 
-        self._cpu.append(cpu_pct)
-        self._mem.append(mem_rss)
-        self._times.append(len(self._times) + 1)
-
-        # actualizar líneas
-        self._line_cpu.set_data(range(len(self._cpu)), list(self._cpu))
-        self._line_mem.set_data(range(len(self._mem)), list(self._mem))
-
-        # re-escalar y dibujar
-        try:
-            self._ax_cpu.relim(); self._ax_cpu.autoscale_view()
-            self._ax_mem.relim(); self._ax_mem.autoscale_view()
-            self._canvas.draw_idle()
-        except Exception:
-            pass
-
-    # ---------------- Tree building (solo con QTreeWidget que definiste en Designer) ----------------
+        self._ring.append(cpu_pct, mem_rss)
+        if self.run_stats is not None:
+            self.run_stats.add_sample(cpu_pct, mem_rss)
+
+        # actualizar curvas con vistas del ring buffer (pyqtgraph reescala solo)
+        cpu, mem = self._ring.window()
+        xs = self._xs[:len(cpu)]
+        self._line_cpu.setData(xs, cpu)
+        self._line_mem.setData(xs, mem)
+        if self.run_stats is not None:
+            self.run_stats.monitor_s += time.perf_counter() - t0
+
+    # ---------------- Resumen de la corrida ----------------
+    def _begin_run(self):
+        """Arranca las métricas de una corrida nueva si no hay una en curso
+        (reanudar tras una pausa sigue sumando a la misma)."""
+        if self.run_stats is None:
+            self.run_stats = RunStats()
+            if self._ring is not None:
+                self._ring.clear()
+
+    def _begin_active(self):
+        self._active_since = time.perf_counter()
+
+    def _end_active(self):
+        """Suma al tiempo de pared de la corrida el tramo que estuvo corriendo."""
+        if self._active_since is not None and self.run_stats is not None:
+            self.run_stats.wall_s += time.perf_counter() - self._active_since
+        self._active_since = None
+
+    def _show_monitor_summary(self):
+        """Resumen de la corrida que terminó: CPU p50/p95, pico de RSS,
+        eventos/s, tiempo de pared y costo del monitor."""
+        if self.run_stats is None:
+            return
+        # última muestra: cubre desde el tick anterior hasta el final
+        self._sample_metrics()
+        self.last_summary = self.run_stats.summary()
+        self.run_stats = None
+        text = f"MergeSort n={len(self.arr)}: {format_summary(self.last_summary)}"
+        if self.statusBar is not None:
+            self.statusBar.showMessage(text)
+
+    # ---------------- Tree building (QTreeView del .ui + modelo virtual) ----------------
     def build_tree(self):
+        """Enlaza el estado actual al modelo; no crea ninguna fila por adelantado."""
+        self.model.set_state(self.state)
         if self.tree is None:
             return
-        self.tree.clear()
-        self.tree_items.clear()
-        n = len(self.arr)
-        def rec(l, r, parent_item):
-            label = f"[{l}:{r}]"
-            content = str(self.arr[l:r])
-            item = QTreeWidgetItem([label, content])
-            if parent_item is None:
-                self.tree.addTopLevelItem(item)
-            else:
-                parent_item.addChild(item)
-            self.tree_items[(l,r)] = item
-            if r - l <= 1:
-                return
-            m = (l + r) // 2
-            rec(l, m, item)
-            rec(m, r, item)
-        rec(0, n, None)
-        self.tree.expandAll()
+        if len(self.arr) <= EXPAND_ALL_MAX_N:
+            self.tree.expandAll()
+        else:
+            # expandir 2M nodos obligaría a la vista a recorrerlos todos
+            self.tree.expandToDepth(3)
         # Ajuste de columnas: si quieres, puedes setear tamaños por defecto aquí
         try:
             header = self.tree.header()
@@ -273,15 +496,33 @@ class MergeTreeController:
     # ---------------- UI actions ----------------
     def generate(self):
         n = self.spinN.value() if self.spinN else 8
-        self.arr = [random.randint(0, n*5) for _ in range(n)]
-        self.generator = None
+        self.load_array(random.choices(range(n*5 + 1), k=n))
+
+    def load_array(self, arr, timeline=None):
+        """Carga un arreglo nuevo. Con `timeline` (p. ej. de una traza) la
+        corrida ya está grabada y no se vuelve a ordenar."""
+        old = self.timeline
+        n = len(arr)
+        self.arr = arr
+        self.timeline = timeline
+        self.state = MergeTreeState(self.arr)
+        self.cursor = 0
         self.sorted_copy = None
+        self.metrics = PlaybackMetrics()
+        if timeline is not None:
+            self.sorted_copy = timeline.sorted
+            self.cursor = timeline.seek(self.state, 0)
+        if old is not None and getattr(old, "trace", None) is not None:
+            old.trace.close()
+        self._update_costs()
+        self._refresh_hud(force=True)
         self.reset_counters()
         self.build_tree()
+        self._update_timeline_widgets()
         # actualizar cálculo best/worst
         try:
-            best = best_case_comparisons(n)
-            worst = worst_case_comparisons(n)
+            best = mergesort_best(n)
+            worst = mergesort_worst(n)
             if self.lblBest: self.lblBest.setText(f"Mejor Caso ({n}): {best}")
             if self.lblWorst: self.lblWorst.setText(f"Peor Caso ({n}): {worst}")
         except Exception:
@@ -293,34 +534,125 @@ class MergeTreeController:
 
     def update_stats(self):
         if self.lblComparisons: self.lblComparisons.setText(f"Comparaciones: {self.comparisons}")
+        self._update_timeline_widgets()
+
+    def _update_costs(self):
+        """Costos de la corrida grabada (mismo conteo que el registro de
+        instrumented); se muestran cuando termina de grabarse."""
+        if not self.lblCosts:
+            return
+        if self.timeline is None:
+            self.lblCosts.setText("Costos: se calculan al iniciar la corrida")
+        elif not self.timeline.done:
+            self.lblCosts.setText("Costos: se muestran al terminar de grabar la corrida")
+        elif not self.timeline.has_stats:
+            # traza sin costos en la cabecera: se cuentan fuera del hilo de la GUI
+            self.lblCosts.setText("Costos: contando los eventos de la traza...")
+            if self._costs_worker is None or self._costs_worker.timeline is not self.timeline:
+                self._costs_worker = TraceCostsWorker(self.timeline)
+                self._costs_worker.signals.done.connect(self._on_trace_costs)
+                QtCore.QThreadPool.globalInstance().start(self._costs_worker)
+        else:
+            self.lblCosts.setText("Costos: " + format_costs(self.timeline.stats().to_dict()))
+
+    def _on_trace_costs(self, timeline, stats):
+        if self._costs_worker is not None and self._costs_worker.timeline is timeline:
+            self._costs_worker = None
+        if timeline is not self.timeline:
+            return   # se cargó otra corrida mientras tanto
+        if stats is None:
+            if self.lblCosts: self.lblCosts.setText("Costos: no se pudieron contar")
+            return
+        timeline.set_stats(stats)
+        self._update_costs()
+
+    def _update_timeline_widgets(self):
+        total = len(self.timeline) if self.timeline is not None else 0
+        if self.sliderTimeline:
+            # el slider solo llega hasta lo grabado
+            self.sliderTimeline.blockSignals(True)
+            self.sliderTimeline.setRange(0, total)
+            self.sliderTimeline.setValue(self.cursor)
+            self.sliderTimeline.setEnabled(total > 0)
+            self.sliderTimeline.blockSignals(False)
+        more = "+" if self.timeline is not None and not self.timeline.done else ""
+        if self.lblEvent: self.lblEvent.setText(f"Evento: {self.cursor} / {total}{more}")
 
     def on_speed_change(self, v):
         try:
-            self.timer.setInterval(int(v))
+            self.events_per_sec = max(1, int(v))
         except Exception:
             pass
 
+    def on_max_speed_toggled(self, checked):
+        self.max_speed = bool(checked)
+        if self.spinSpeed: self.spinSpeed.setEnabled(not checked)
+
+    def _start_timer(self):
+        # el crédito de eventos arranca en cero para no aplicar una ráfaga
+        self._credit = 0.0
+        self._last_frame = time.perf_counter()
+        self._begin_active()
+        self.timer.start()
+
+    def _can_record(self):
+        """False (y lo avisa) si la corrida no se puede grabar en memoria."""
+        if self.timeline is not None or len(self.arr) <= RECORD_MAX_N:
+            return True
+        if self.lblEvent:
+            self.lblEvent.setText(f"n > {RECORD_MAX_N}: guardar la traza y abrirla para reproducir")
+        return False
+
+    def _prepare_run(self):
+        """Crea la línea de tiempo de la corrida y vuelve al evento 0. No
+        ordena nada todavía: los eventos se graban a medida que la
+        reproducción los pide (ver _record)."""
+        self.timeline = MergeTimeline(self.arr)
+        self.metrics = PlaybackMetrics()
+        # el estado ya está en el evento 0 desde generate(): se reutiliza para
+        # no reiniciar el modelo (y con él lo expandido en la vista)
+        self.cursor = self.timeline.seek(self.state, 0)
+        self._paint_all()
+        self.reset_counters()
+        self._update_costs()
+
+    def _record(self, until=None, deadline=None):
+        """Graba más eventos de la corrida (ver MergeTimeline.record) y, si el
+        sort terminó, actualiza lo que depende de la corrida completa."""
+        timeline = self.timeline
+        if timeline.done:
+            return
+        timeline.record(until, deadline)
+        self.metrics.add_record(timeline)
+        if timeline.done:
+            self.sorted_copy = timeline.sorted
+            self._update_costs()
+
     def start(self):
-        if self.generator is None:
-            self.generator, self.sorted_copy = make_sort_events(self.arr[:])
-            self.reset_counters()
+        if not self._can_record():
+            return
+        if self.timeline is None:
+            self._prepare_run()
+        elif self.timeline.done and self.cursor >= len(self.timeline):
+            # la corrida ya terminó: rebobinar sin volver a ordenar
+            self.seek(0)
         if not self.is_running:
             self.is_running = True
+            self._ensure_monitor()
+            self._begin_run()
             # iniciar monitor si existe
             try:
                 if _HAS_MONITOR and self._monitor_timer is not None:
-                    # limpiar series anteriores
-                    self._cpu.clear(); self._mem.clear(); self._times.clear()
                     self._monitor_timer.start()
             except Exception:
                 pass
-            # intervalo ya fijado en spinSpeed (o por defecto 120)
-            self.timer.start()
+            self._start_timer()
 
     def pause_or_resume(self):
         if self.is_running:
             # pausar ambos timers
             self.timer.stop()
+            self._end_active()
             try:
                 if _HAS_MONITOR and self._monitor_timer is not None:
                     self._monitor_timer.stop()
@@ -329,28 +661,35 @@ class MergeTreeController:
             self.is_running = False
             if self.btnPause: self.btnPause.setText("Resume")
         else:
-            if self.generator is None:
-                self.generator, self.sorted_copy = make_sort_events(self.arr[:])
-                self.reset_counters()
+            if not self._can_record():
+                return
+            if self.timeline is None:
+                self._prepare_run()
+            self._ensure_monitor()
+            self._begin_run()
             try:
                 if _HAS_MONITOR and self._monitor_timer is not None:
                     self._monitor_timer.start()
             except Exception:
                 pass
             self.is_running = True
-            self.timer.start()
+            self._start_timer()
             if self.btnPause: self.btnPause.setText("Pause")
 
+    def pause(self):
+        """Pausa la reproducción y el monitor si están en marcha."""
+        if self.is_running:
+            self.pause_or_resume()
+
     def step_once(self):
-        if self.generator is None:
-            self.generator, self.sorted_copy = make_sort_events(self.arr[:])
-            self.reset_counters()
-        try:
-            ev = next(self.generator)
-            self.handle_event(ev)
+        if not self._can_record():
+            return
+        if self.timeline is None:
+            self._prepare_run()
+        if self._next_event():
             self.update_stats()
-        except StopIteration:
-            self.generator = None
+            self._refresh_hud(force=True)
+        else:
             self.is_running = False
             # al terminar, detener monitor si estaba en marcha
             try:
@@ -362,11 +701,11 @@ class MergeTreeController:
     def reset_view(self):
         self.timer.stop()
         self.is_running = False
-        self.generator = None
-        self.sorted_copy = None
-        # rebuild tree from original arr (no mutación)
-        self.build_tree()
-        self.reset_counters()
+        # la corrida se abandona: sin resumen
+        self._end_active()
+        self.run_stats = None
+        # volver al evento 0 desde el primer checkpoint (sin reconstruir el árbol)
+        self.seek(0)
         if self.btnPause: self.btnPause.setText("Pause")
         # detener monitor si existe
         try:
@@ -376,19 +715,72 @@ class MergeTreeController:
             pass
 
     # ---------------- Event processing ----------------
-    def process_next_event(self):
-        if self.generator is None:
+    def process_frame(self):
+        """Tick del timer (~60 fps): aplica al estado todos los eventos que
+           tocan en este frame según la velocidad, sin pasar de EVENT_BUDGET_S,
+           y repinta una sola vez cada nodo que haya cambiado.
+        """
+        if self.timeline is None:
             self.timer.stop()
             self.is_running = False
             return
-        try:
-            ev = next(self.generator)
-            self.handle_event(ev)
+        now = time.perf_counter()
+        metrics = self.metrics
+        interval = now - self._last_frame
+        metrics.frame_interval_us.add(interval * 1e6)
+        # lo que el frame anterior se pasó del período sin contar su propio
+        # trabajo es repintado de Qt: se suma al costo de pintar
+        repaint = max(0.0, interval - self._tick_work - FRAME_MS / 1000)
+        if self.max_speed:
+            quota = sys.maxsize
+        else:
+            # crédito acotado a un cuarto de segundo si el frame llegó tarde
+            self._credit = min(self._credit + (now - self._last_frame) * self.events_per_sec,
+                               max(1.0, self.events_per_sec * 0.25))
+            quota = int(self._credit)
+            self._credit -= quota
+        self._last_frame = now
+
+        budget = max(MIN_EVENT_BUDGET_S, EVENT_BUDGET_S - self._paint_cost)
+        deadline = now + budget
+        first = self.cursor
+        # grabar lo que falte para este frame con la mitad del presupuesto: la
+        # otra mitad queda para reproducir lo grabado
+        if self.cursor + quota > len(self.timeline):
+            self._record(self.cursor + quota, now + budget / 2)
+        total = len(self.timeline)
+        stop = min(total, self.cursor + quota)
+        while self.cursor < stop:
+            nxt = min(stop, self.cursor + EVENT_BATCH)
+            # el primer evento de cada lote se mide solo: muestra del costo
+            # por tipo sin cronometrar cada evento
+            self._apply_timed(self.cursor)
+            self.timeline.apply_range(self.state, self.cursor + 1, nxt)
+            self.cursor = nxt
+            if time.perf_counter() >= deadline:
+                break
+        self.comparisons = self.state.comparisons
+        t_paint = time.perf_counter()
+        self._paint_dirty()
+        done = time.perf_counter()
+        played = self.cursor - first
+        if self.run_stats is not None:
+            self.run_stats.events += played
+        metrics.paint_us.add((done - t_paint) * 1e6)
+        metrics.tick_work_us.add((done - now) * 1e6)
+        self._tick_work = done - now
+        self._paint_cost += PAINT_COST_ALPHA * (done - t_paint + repaint - self._paint_cost)
+        metrics.events_per_tick.add(played)
+        metrics.events += played
+        metrics.ticks += 1
+
+        finished = self.timeline.done and self.cursor >= total
+        if not finished:
             self.update_stats()
-        except StopIteration:
+        else:
             self.timer.stop()
+            self._end_active()
             self.is_running = False
-            self.generator = None
             self.update_stats()
             # cuando termina, detener monitor y mostrar resumen
             try:
@@ -396,40 +788,178 @@ class MergeTreeController:
                     self._monitor_timer.stop()
             except Exception:
                 pass
-            self._print_monitor_summary()
-
-    def handle_event(self, ev):
-        typ = ev[0]
-        if typ == 'enter':
-            _, l, r, snap = ev
-            item = self.tree_items.get((l,r))
-            if item:
-                item.setBackground(0, QBrush(QColor("#00aaff")))
-                item.setText(1, str(snap))
-        elif typ == 'compare':
-            _, i, j = ev
-            self.comparisons += 1
-            # marcar hojas que contienen i y j (si existen)
-            leaf_i = self.tree_items.get((i, i+1))
-            leaf_j = self.tree_items.get((j, j+1))
-            if leaf_i: leaf_i.setBackground(0, QBrush(QColor("#f60000")))
-            if leaf_j: leaf_j.setBackground(0, QBrush(QColor("#f60000")))
-        elif typ == 'take':
-            pass
-        elif typ == 'write':
-            _, l, r, pos, val = ev
-            seg_item = self.tree_items.get((l, r))
-            if seg_item:
-                seg_item.setText(1, f"... writing {pos}:{val} ...")
-            leaf = self.tree_items.get((pos, pos+1))
-            if leaf:
-                leaf.setText(1, str([val]))
-        elif typ == 'exit':
-            _, l, r, snap = ev
-            item = self.tree_items.get((l,r))
-            if item:
-                item.setBackground(0, QBrush(QColor("#1a8a1a")))
-                item.setText(1, str(snap))
+            self._show_monitor_summary()
+        self._refresh_hud(force=finished)
+
+    def _apply_timed(self, k):
+        """Aplica el evento k midiendo cuánto tarda (histograma de su tipo)."""
+        ev = self.timeline.events
+        base = k * STRIDE
+        op = ev[base]
+        t = time.perf_counter_ns()
+        self.state.apply(op, ev[base+1], ev[base+2], ev[base+3], ev[base+4])
+        self.metrics.handler_ns[op].add(time.perf_counter_ns() - t)
+
+    def _next_event(self):
+        """Aplica el evento self.cursor de la línea de tiempo; False si terminó."""
+        if self.cursor >= len(self.timeline):
+            self._record(self.cursor + 1)
+        if self.cursor >= len(self.timeline):
+            return False
+        ev = self.timeline.events
+        base = self.cursor * STRIDE
+        self.cursor += 1
+        self.handle_event(ev[base], ev[base+1], ev[base+2], ev[base+3], ev[base+4])
+        return True
+
+    def handle_event(self, op, a, b, c, d):
+        """Aplica un evento codificado (ver merge_events.OP_*) al estado y
+           repinta solo los nodos que cambiaron.
+        """
+        t = time.perf_counter_ns()
+        self.state.apply(op, a, b, c, d)
+        self.metrics.handler_ns[op].add(time.perf_counter_ns() - t)
+        self.metrics.events += 1
+        self.comparisons = self.state.comparisons
+        self._paint_dirty()
+
+    # ---------------- Métricas: HUD y exportación ----------------
+    def on_hud_toggled(self, checked):
+        if self.lblHud is None:
+            return
+        self.lblHud.setVisible(checked)
+        self._refresh_hud(force=True)
+
+    def _refresh_hud(self, force=False):
+        """Reescribe el HUD si está visible, como mucho cada HUD_REFRESH_S."""
+        if self.lblHud is None or not self.lblHud.isVisible():
+            return
+        now = time.perf_counter()
+        if not force and now - self._hud_at < HUD_REFRESH_S:
+            return
+        self._hud_at = now
+        self.lblHud.setText(self.metrics.hud_text())
+
+    def metrics_report(self):
+        """Métricas de grabación/reproducción junto con los ajustes con que se
+        tomaron, para comparar velocidades y tamaños de lote."""
+        return {
+            "n": len(self.arr),
+            "settings": {
+                "frame_ms": FRAME_MS,
+                "event_budget_s": EVENT_BUDGET_S,
+                "event_batch": EVENT_BATCH,
+                "events_per_sec": self.events_per_sec,
+                "max_speed": self.max_speed,
+                "checkpoint_interval": self.timeline.interval if self.timeline else None,
+            },
+            "metrics": self.metrics.to_dict(),
+            "costs": (self.timeline.stats().to_dict()
+                      if self.timeline is not None and self.timeline.done
+                      and self.timeline.has_stats else None),
+            "run_summary": self.last_summary,
+        }
+
+    def export_metrics(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.metrics_report(), f, indent=2, ensure_ascii=False)
+
+    def export_metrics_dialog(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self.win, "Exportar métricas", f"metricas_merge_n{len(self.arr)}.json",
+            "JSON (*.json)")
+        if not path:
+            return
+        try:
+            self.export_metrics(path)
+        except OSError as e:
+            QtWidgets.QMessageBox.warning(self.win, "Exportar métricas", str(e))
+
+    # ---------------- Trazas binarias ----------------
+    def save_trace(self, path):
+        """Graba la corrida actual; antes termina de grabar en memoria lo que
+        la reproducción todavía no pidió. Si es demasiado grande para tenerla
+        en memoria se ordena una vez grabando directo al archivo."""
+        if self.timeline is None and len(self.arr) > RECORD_MAX_N:
+            record_trace(path, self.arr)
+            return
+        if self.timeline is None:
+            self._prepare_run()
+        while not self.timeline.done:
+            self._record()
+        save_timeline(path, self.timeline)
+        self._update_timeline_widgets()
+
+    def open_trace(self, path):
+        """Reproduce una traza grabada: los eventos se leen del archivo
+        mapeado en memoria y el sort no se vuelve a ejecutar."""
+        trace = TraceFile(path)
+        self.timer.stop()
+        self.is_running = False
+        self._end_active()
+        self.run_stats = None
+        if self.btnPause: self.btnPause.setText("Pause")
+        n = trace.n
+        if self.spinN:
+            if n > self.spinN.maximum():
+                self.spinN.setMaximum(n)
+            self.spinN.setValue(n)
+        self.load_array(list(trace.original), MergeTimeline.from_trace(trace))
+
+    def save_trace_dialog(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self.win, "Guardar traza", f"merge_n{len(self.arr)}.mstrace",
+            "Trazas de merge sort (*.mstrace)")
+        if not path:
+            return
+        try:
+            self.save_trace(path)
+        except OSError as e:
+            QtWidgets.QMessageBox.warning(self.win, "Guardar traza", str(e))
+
+    def open_trace_dialog(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self.win, "Abrir traza", "", "Trazas de merge sort (*.mstrace);;Todos (*)")
+        if not path:
+            return
+        try:
+            self.open_trace(path)
+        except (OSError, ValueError) as e:
+            QtWidgets.QMessageBox.warning(self.win, "Abrir traza", str(e))
+
+    # ---------------- Timeline: seek ----------------
+    def seek(self, k):
+        """Salta al estado tras aplicar los primeros k eventos.
+           Coste acotado: checkpoint previo + como mucho un intervalo de eventos.
+        """
+        if self.timeline is None:
+            if k <= 0 or not self._can_record():
+                return
+            self._prepare_run()
+        k = max(0, min(int(k), len(self.timeline)))
+        if self.cursor <= k < self.cursor + self.timeline.interval:
+            # avanzar poco: basta con aplicar los eventos que faltan
+            self.timeline.apply_range(self.state, self.cursor, k)
+            self.cursor = k
+            self._paint_dirty()
+        else:
+            self.cursor = self.timeline.seek(self.state, k)
+            self._paint_all()
+        self.comparisons = self.state.comparisons
+        self.update_stats()
+
+    # ---------------- Pintado de nodos ----------------
+    def _visible(self):
+        return visible_nodes(self.tree) if self.tree is not None else None
+
+    def _paint_dirty(self):
+        if self.state.dirty:
+            self.model.nodes_changed(self.state.dirty, self._visible())
+            self.state.dirty.clear()
+
+    def _paint_all(self):
+        self.model.refresh(self._visible())
+        self.state.dirty.clear()
 
     def show(self):
         self.win.show()
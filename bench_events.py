@@ -0,0 +1,70 @@
+# bench_events.py
+# Micro-benchmark de los motores de eventos de merge sort (sin Qt).
+#   python bench_events.py                 -> n = 10^3 .. 10^6
+#   python bench_events.py --sizes 1000 50000 --repeat 3
+import argparse
+import random
+import time
+
+from merge_events import STRIDE, merge_sort_gen, merge_sort_iter, merge_sort_encoded
+
+
+def run_tuples(engine, data):
+    arr = data[:]
+    count = 0
+    for _ in engine(arr, 0, len(arr)):
+        count += 1
+    return count
+
+
+def run_encoded(data):
+    arr = data[:]
+    count = 0
+    for buf in merge_sort_encoded(arr, 0, len(arr)):
+        count += len(buf) // STRIDE
+    return count
+
+
+ENGINES = {
+    "recursivo (yield from)": lambda data: run_tuples(merge_sort_gen, data),
+    "pila explícita": lambda data: run_tuples(merge_sort_iter, data),
+    "pila explícita codificado": run_encoded,
+}
+
+
+def bench(sizes, repeat=1, seed=0):
+    rows = []
+    for n in sizes:
+        rnd = random.Random(seed + n)
+        data = [rnd.randint(0, n * 5) for _ in range(n)]
+        counts = set()
+        for name, run in ENGINES.items():
+            best = None
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                count = run(data)
+                dt = time.perf_counter() - t0
+                best = dt if best is None else min(best, dt)
+            counts.add(count)
+            rows.append((n, name, count, best, count / best if best else 0.0))
+        if len(counts) != 1:
+            raise RuntimeError(f"Los motores emitieron distinto número de eventos para n={n}")
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eventos/s de los generadores de merge sort")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10**3, 10**4, 10**5, 10**6])
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="repeticiones por motor (se reporta la mejor)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'n':>9}  {'motor':<27} {'eventos':>11} {'tiempo (s)':>11} {'eventos/s':>12}")
+    for n, name, count, secs, rate in bench(args.sizes, args.repeat, args.seed):
+        print(f"{n:>9}  {name:<27} {count:>11} {secs:>11.3f} {rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
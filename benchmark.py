@@ -0,0 +1,171 @@
+# benchmark.py
+# Benchmark headless de los algoritmos instrumentados (sin Qt).
+#   python benchmark.py --sizes 1000 10000 100000 --dist random sorted --repeat 5
+#   python benchmark.py --format csv --output resultados.csv
+import argparse
+import csv
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from sort_algorithms import ALGORITHMS
+
+
+# -----------------------------
+# Distribuciones de entrada
+# -----------------------------
+
+def dist_random(n, rnd):
+    # mismo rango que usa SortingComparison
+    return [rnd.randint(1, 10000) for _ in range(n)]
+
+
+def dist_sorted(n, rnd):
+    return list(range(n))
+
+
+def dist_reversed(n, rnd):
+    return list(range(n, 0, -1))
+
+
+def dist_few_unique(n, rnd):
+    return [rnd.randint(1, 10) for _ in range(n)]
+
+
+def dist_nearly_sorted(n, rnd):
+    data = list(range(n))
+    for _ in range(max(1, n // 100)):
+        i, j = rnd.randrange(n), rnd.randrange(n)
+        data[i], data[j] = data[j], data[i]
+    return data
+
+
+DISTRIBUTIONS = {
+    "random": dist_random,
+    "sorted": dist_sorted,
+    "reversed": dist_reversed,
+    "few_unique": dist_few_unique,
+    "nearly_sorted": dist_nearly_sorted,
+}
+
+# por defecto también las entradas ordenadas: ahí se ven los pivotes que
+# degeneran a O(n²) (y el paso a heapsort del introsort)
+DEFAULT_DISTRIBUTIONS = ["random", "sorted", "reversed"]
+
+
+# -----------------------------
+# Medición
+# -----------------------------
+
+def measure(func, data, warmup=1, repeat=5):
+    """Ejecuta func sobre copias de data y devuelve tiempos (ns), comparaciones
+       y pico de memoria. El pico se mide en una ejecución aparte con
+       tracemalloc para no inflar los tiempos.
+    """
+    for _ in range(warmup):
+        func(data.copy())
+
+    times = []
+    comparisons = None
+    for _ in range(repeat):
+        arr = data.copy()
+        t0 = time.perf_counter_ns()
+        _, comparisons = func(arr)
+        times.append(time.perf_counter_ns() - t0)
+
+    arr = data.copy()
+    tracemalloc.start()
+    try:
+        func(arr)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return times, comparisons, peak
+
+
+def run_suite(sizes, distributions, algorithms, warmup=1, repeat=5, seed=0, progress=None):
+    results = []
+    for dist in distributions:
+        for n in sizes:
+            data = DISTRIBUTIONS[dist](n, random.Random(f"{seed}-{dist}-{n}"))
+            for name in algorithms:
+                times, comparisons, peak = measure(ALGORITHMS[name], data, warmup, repeat)
+                row = {
+                    "algorithm": name,
+                    "distribution": dist,
+                    "size": n,
+                    "repeat": repeat,
+                    "wall_ns_min": min(times),
+                    "wall_ns_median": int(statistics.median(times)),
+                    "wall_ns_mean": int(statistics.fmean(times)),
+                    "comparisons": comparisons,
+                    "peak_bytes": peak,
+                }
+                results.append(row)
+                if progress:
+                    progress(row)
+    return results
+
+
+# -----------------------------
+# Salida
+# -----------------------------
+
+FIELDS = ["algorithm", "distribution", "size", "repeat", "wall_ns_min",
+          "wall_ns_median", "wall_ns_mean", "comparisons", "peak_bytes"]
+
+
+def write_json(results, args, out):
+    json.dump({
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "warmup": args.warmup,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }, out, indent=2)
+    out.write("\n")
+
+
+def write_csv(results, args, out):
+    writer = csv.DictWriter(out, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark headless de quicksort/mergesort")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dist", nargs="+", default=DEFAULT_DISTRIBUTIONS,
+                        choices=sorted(DISTRIBUTIONS))
+    parser.add_argument("--algorithms", nargs="+", default=list(ALGORITHMS), choices=list(ALGORITHMS))
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("--output", help="archivo de salida (por defecto stdout)")
+    args = parser.parse_args(argv)
+
+    def progress(row):
+        print(f"{row['distribution']:>13} n={row['size']:<9} {row['algorithm']:<10} "
+              f"{row['wall_ns_median'] / 1e6:10.2f} ms  {row['comparisons']} comp.",
+              file=sys.stderr)
+
+    results = run_suite(args.sizes, args.dist, args.algorithms,
+                        args.warmup, args.repeat, args.seed, progress)
+    writer = write_json if args.format == "json" else write_csv
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as out:
+            writer(results, args, out)
+    else:
+        writer(results, args, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+# bounds.py
+# Cotas teóricas de comparaciones en O(1) / O(log n), sin recursión ni caché.
+# Sin dependencias de Qt.
+#
+# El árbol de división de mergesort (mitades ⌊m/2⌋, ⌈m/2⌉) tiene en cada
+# nivel a lo sumo dos tamaños distintos y consecutivos, así que cualquier suma
+# de costos por nodo se evalúa nivel por nivel llevando {tamaño: cantidad}:
+# O(log n).
+#
+#   python bounds.py   # verifica las cotas de quicksort por fuerza bruta (n <= 8)
+#                      # y los esperados contra el conteo de cada variante
+import itertools
+import math
+
+EULER_GAMMA = 0.5772156649015329
+
+# coeficientes de n·ln n del quicksort esperado con pivote de muestra:
+# mediana de 3 = 12/7 (Sedgewick); ninther = 12600/8027 (Durand)
+MEDIAN3_COEF = 12 / 7
+NINTHER_COEF = 12600 / 8027
+
+QUICKSORT_PIVOTS = ("middle", "random", "median3", "ninther")
+
+
+def ceil_lg(n):
+    """⌈lg n⌉ para n >= 1."""
+    return (n - 1).bit_length()
+
+
+def harmonic(n):
+    """H_n = 1 + 1/2 + ... + 1/n. Exacto para n chico, expansión de
+       Euler-Maclaurin (error < 1e-12 desde n = 64) para n grande."""
+    if n < 64:
+        return math.fsum(1.0 / k for k in range(1, n + 1))
+    inv = 1.0 / n
+    inv2 = inv * inv
+    return math.log(n) + EULER_GAMMA + inv / 2 - inv2 / 12 + inv2 * inv2 / 120
+
+
+def _level_sum(n, split, cost):
+    """Suma cost(m, a, b) sobre todos los nodos internos (m >= 2) del árbol
+       que genera split(m) -> (a, b) desde la raíz n. O(log n)."""
+    total = 0
+    level = {n: 1}
+    while level:
+        nxt = {}
+        for m, count in level.items():
+            if m < 2:
+                continue
+            a, b = split(m)
+            total += count * cost(m, a, b)
+            nxt[a] = nxt.get(a, 0) + count
+            nxt[b] = nxt.get(b, 0) + count
+        level = nxt
+    return total
+
+
+def _halves(m):
+    return m // 2, m - m // 2
+
+
+# ---------------- Mergesort ----------------
+def mergesort_worst(n):
+    """Peor caso exacto: n⌈lg n⌉ − 2^⌈lg n⌉ + 1 (cada merge de m cuesta m−1)."""
+    if n <= 1:
+        return 0
+    k = ceil_lg(n)
+    return n * k - (1 << k) + 1
+
+
+def mergesort_best(n):
+    """Mejor caso exacto: cada merge cuesta min(a, b) = ⌊m/2⌋."""
+    if n <= 1:
+        return 0
+    return _level_sum(n, _halves, lambda m, a, b: a)
+
+
+def mergesort_expected(n):
+    """Esperado exacto sobre permutaciones al azar (claves distintas): un merge
+       de a y b elementos cuesta en promedio a + b − a/(b+1) − b/(a+1)."""
+    if n <= 1:
+        return 0.0
+    return _level_sum(n, _halves, lambda m, a, b: m - a / (b + 1) - b / (a + 1))
+
+
+# ---------------- Quicksort ----------------
+# Modelo de quicksort_count: una comparación por elemento del rango en cada
+# partición (m por rango de m elementos) y el pivote sale de la recursión.
+def quicksort_worst(n):
+    """Peor caso exacto (el pivote siempre es un extremo): 2 + 3 + ... + n."""
+    if n <= 1:
+        return 0
+    return n * (n + 1) // 2 - 1
+
+
+def quicksort_best(n):
+    """Mejor caso exacto, min sobre k de C(k) + C(n−1−k) + n.
+
+       Cada rango de m >= 2 elementos cuesta m y los de un elemento no
+       cuestan nada: sobre el árbol de pivotes el total es Σ(profundidad + 1)
+       menos la cantidad de hojas. Lo minimiza un árbol completo con los r
+       nodos del último nivel agrupados de a pares (así quedan más hojas en
+       el penúltimo). No siempre es el pivote mediana: con n = 5 partir en
+       (1, 3) cuesta 8 y en (2, 2) cuesta 9.
+    """
+    if n <= 1:
+        return 0
+    h = n.bit_length() - 1          # profundidad del último nivel
+    r = n - (1 << h) + 1            # nodos en ese nivel
+    depth_sum = (h - 2) * (1 << h) + 2 + h * r
+    leaves = r + (1 << (h - 1)) - (r + 1) // 2
+    return depth_sum + n - leaves
+
+
+def _uniform_cost(n):
+    """Esperado con pivote de rango uniforme y m comparaciones por rango de
+       m >= 2: C(n) = n + (2/n) Σ C(k), con solución exacta
+       C(n) = 2(n+1)H_n − (10/3)(n+1) + 3 para n >= 2."""
+    return 2 * (n + 1) * harmonic(n) - 10 * (n + 1) / 3 + 3
+
+
+def _uniform_ranges(n):
+    """Rangos de m >= 2 elementos que se parten en promedio con pivote de
+       rango uniforme (la misma recurrencia con costo 1 por rango): (2n − 1)/3."""
+    return (2 * n - 1) / 3
+
+
+# quicksort_inplace_count: una partición de m elementos cuesta en promedio
+# α·m + δ comparaciones, sin contar las de elegir el pivote.
+#   lomuto: m − 1, exacto.
+#   hoare:  los dos barridos suman m + 1 o m + 2, y el pivote no queda fuera:
+#           sigue dentro de uno de los lados. δ es el efectivo de ese modelo,
+#           medido con pivote uniforme (python bounds.py lo compara con el
+#           conteo real de cada variante).
+#   3way:   los barridos de Hoare más dos igualdades por intercambio; con
+#           pivote de rango x·m hay en promedio x(1−x)·m intercambios, así
+#           que α = 1 + 2·E[x(1−x)] depende de la regla (ver THREEWAY_ALPHA).
+PARTITION_TOLLS = {"lomuto": (1.0, -1.0), "hoare": (1.0, 4.75), "3way": (4 / 3, 2.5)}
+
+# E[x(1−x)] del rango relativo del pivote: uniforme 1/6, mediana de 3 (Beta(2,2))
+# 1/5, ninther (mediana de tres medianas de 3) 86/385
+THREEWAY_ALPHA = {"middle": 4 / 3, "random": 4 / 3, "median3": 7 / 5, "ninther": 557 / 385}
+
+# comparaciones medias de median3 sobre tres claves distintas
+MEDIAN3_COST = 8 / 3
+
+
+def quicksort_expected(n, pivot="middle", scheme=None):
+    """Comparaciones esperadas sobre permutaciones al azar (claves distintas).
+
+       scheme=None es quicksort_count (m comparaciones por rango de m):
+       "middle" y "random" dan la solución exacta de _uniform_cost; con
+       "median3" y "ninther", solo el término principal coef·n·ln n.
+
+       Con scheme ("hoare", "lomuto" o "3way") sigue el conteo de
+       quicksort_inplace_count (ver PARTITION_TOLLS):
+         - pivote uniforme: α·_uniform_cost(n) + (δ + selección)·_uniform_ranges(n),
+           exacto para lomuto;
+         - lomuto y 3way con muestra: solo el término principal, α·coef·n·ln n;
+         - hoare con muestra: el pivote queda dentro de un lado y desde el
+           segundo nivel la muestra no mejora el rango, así que se usa el
+           modelo uniforme más el costo de la mediana de 3 en cada rango
+           (el ninther también la usa en los rangos de menos de 40).
+    """
+    if pivot not in QUICKSORT_PIVOTS:
+        raise ValueError(f"Regla de pivote desconocida: {pivot}")
+    if scheme is not None and scheme not in PARTITION_TOLLS:
+        raise ValueError(f"Esquema de partición desconocido: {scheme}")
+    if n <= 1:
+        return 0.0
+    sampled = pivot in ("median3", "ninther")
+    if scheme is None:
+        if pivot == "median3":
+            return MEDIAN3_COEF * n * math.log(n)
+        if pivot == "ninther":
+            return NINTHER_COEF * n * math.log(n)
+        return _uniform_cost(n)
+    alpha, delta = PARTITION_TOLLS[scheme]
+    if scheme == "3way":
+        alpha = THREEWAY_ALPHA[pivot]
+    if not sampled:
+        return alpha * _uniform_cost(n) + delta * _uniform_ranges(n)
+    if scheme == "hoare":
+        return _uniform_cost(n) + (delta + MEDIAN3_COST) * _uniform_ranges(n)
+    coef = MEDIAN3_COEF if pivot == "median3" else NINTHER_COEF
+    return alpha * coef * n * math.log(n)
+
+
+# ---------------- Verificación ----------------
+def _check_quicksort(max_n=8):
+    """Compara quicksort_best/worst con el mínimo y el máximo de
+       quicksort_count sobre todas las permutaciones de n <= max_n."""
+    from sort_algorithms import quicksort_count
+    for n in range(max_n + 1):
+        counts = [quicksort_count(list(p))[1] for p in itertools.permutations(range(n))]
+        best, worst = min(counts), max(counts)
+        status = "ok" if (best, worst) == (quicksort_best(n), quicksort_worst(n)) else "ERROR"
+        print(f"n={n}: mejor {best} (cota {quicksort_best(n)}), "
+              f"peor {worst} (cota {quicksort_worst(n)}) {status}")
+        if status != "ok":
+            return False
+    return True
+
+
+def _check_expected(n=2000, reps=20, tolerance=0.15):
+    """Compara quicksort_expected con el promedio de quicksort_inplace_count
+       sobre `reps` permutaciones al azar de n elementos, variante por variante."""
+    import random
+    from sort_algorithms import PARTITION_SCHEMES, quicksort_inplace_count
+    ok = True
+    for scheme in PARTITION_SCHEMES:
+        for pivot in QUICKSORT_PIVOTS:
+            total = 0
+            for r in range(reps):
+                data = list(range(n))
+                random.Random(r).shuffle(data)
+                total += quicksort_inplace_count(data, scheme, pivot, seed=r)[1]
+            measured = total / reps
+            expected = quicksort_expected(n, pivot, scheme)
+            error = expected / measured - 1
+            status = "ok" if abs(error) <= tolerance else "ERROR"
+            ok = ok and status == "ok"
+            print(f"{scheme:>6} {pivot:<8} n={n}: medido {measured:.0f}, "
+                  f"esperado {expected:.0f} ({error:+.1%}) {status}")
+    return ok
+
+
+if __name__ == "__main__":
+    ok = _check_quicksort()
+    ok = _check_expected() and ok
+    raise SystemExit(0 if ok else 1)
@@ -1,53 +1,114 @@
 # general.py (versión corregida para cargar y mostrar exactamente el .ui)
 import sys
-import subprocess
-import importlib
+import time
 import traceback
-from types import ModuleType
-from pathlib import Path
+
+# antes que PySide6: con --startup-report mide todos los imports que siguen
+import startup
+if startup.requested():
+    startup.install()
 
 from PySide6.QtUiTools import QUiLoader
-from PySide6.QtCore import QFile
-from PySide6.QtWidgets import QApplication, QMessageBox, QPushButton, QLabel
-from PySide6 import QtWidgets
+from PySide6.QtCore import QEvent, QFile, QObject, QTimer
+from PySide6.QtWidgets import QApplication, QMessageBox, QPushButton, QLabel, QWidget
 
-def try_import(module_name: str):
-    try:
-        return importlib.import_module(module_name)
-    except Exception:
-        return None
-
-def find_window_class(mod: ModuleType, candidates: list):
-    if mod is None:
-        return None
-    for name in candidates:
-        cls = getattr(mod, name, None)
-        if isinstance(cls, type):
-            return cls
-    return None
-
-def run_subprocess(script_path: str, status_label: QLabel = None):
-    try:
-        subprocess.Popen([sys.executable, script_path])
-    except Exception as e:
-        if status_label:
-            status_label.setText(f"Error al ejecutar {script_path}: {e}")
+# ---------------- Registro de ventanas ----------------
+# Todas las ventanas viven en este proceso y en esta QApplication: cada botón
+# tiene una fábrica que importa su módulo recién al primer clic (el launcher
+# arranca sin cargar pyqtgraph, matplotlib ni tkinter) y la instancia se
+# reutiliza al volver a abrirla.
+TK_PUMP_MS = 15   # cada cuánto se atienden los eventos de una ventana Tk
+
+
+class TkWindow:
+    """Ventana Tk hospedada en el proceso Qt: Tk no corre su propio mainloop,
+    un QTimer llama root.update() mientras está visible. Cerrarla solo la
+    oculta, para poder reabrirla con su estado."""
+
+    def __init__(self, gui_cls, parent=None):
+        import tkinter as tk
+        self.root = tk.Tk()
+        self.gui = gui_cls(self.root)
+        self.root.protocol("WM_DELETE_WINDOW", self.hide)
+        self.timer = QTimer(parent)
+        self.timer.setInterval(TK_PUMP_MS)
+        self.timer.timeout.connect(self.pump)
+
+    def pump(self):
+        try:
+            self.root.update()
+        except Exception:
+            # la ventana se destruyó por fuera
+            self.timer.stop()
+
+    def show(self):
+        self.root.deiconify()
+        self.root.lift()
+        self.timer.start()
+
+    def hide(self):
+        self.timer.stop()
+        self.root.withdraw()
+
+    def destroy(self):
+        self.timer.stop()
+        try:
+            self.root.destroy()
+        except Exception:
+            pass
+
+
+def make_comparaciones(parent):
+    from ui import SortingComparison
+    return SortingComparison()
+
+
+class PauseOnClose(QObject):
+    """Filtro de eventos: cerrar una ventana Qt hospedada solo la oculta, así
+    que al cerrarla se pausa su reproducción (timers de cuadros y del
+    monitor) para que no siga corriendo de fondo."""
+
+    def __init__(self, widget, pause):
+        super().__init__(widget)
+        self.pause = pause
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Close:
+            self.pause()
+        return False
+
+
+def make_mergesort(parent):
+    from app import MergeTreeController
+    inst = MergeTreeController("tree.ui")
+    PauseOnClose(inst.win, inst.pause)
+    return inst
+
+
+def make_quicksort(parent):
+    from quicksort import QuicksortGUI
+    return TkWindow(QuicksortGUI, parent)
+
+
+# objectName del botón en comparacion.ui -> fábrica de la ventana
+WINDOWS = {
+    "Comparaciones": make_comparaciones,
+    "Mergesort": make_mergesort,
+    "Quicksort": make_quicksort,
+}
+
+
+def present(inst):
+    """Muestra y trae al frente una ventana del registro."""
+    widget = inst if isinstance(inst, QWidget) else getattr(inst, "win", None)
+    if widget is None:
+        inst.show()
+        return
+    widget.show()
+    widget.raise_()
+    widget.activateWindow()
 
-def instantiate_and_show(cls):
-    try:
-        inst = cls()
-        if isinstance(inst, QtWidgets.QWidget):
-            inst.show()
-            return inst
-        if hasattr(inst, "win") and isinstance(inst.win, QtWidgets.QWidget):
-            inst.win.show()
-            return inst
-        if hasattr(inst, "show") and callable(inst.show):
-            inst.show()
-            return inst
-    except Exception:
-        traceback.print_exc()
-    return None
 
 def load_ui_and_wire(ui_filename="comparaciones.ui"):
     f = QFile(ui_filename)
@@ -61,110 +122,46 @@ def load_ui_and_wire(ui_filename="comparaciones.ui"):
     if loaded is None:
         raise RuntimeError("QUiLoader devolvió None al cargar el .ui")
     loaded.show()
-    btn_comp = loaded.findChild(QPushButton, "Comparaciones")
-    btn_merge = loaded.findChild(QPushButton, "Mergesort")
-    btn_quick = loaded.findChild(QPushButton, "Quicksort")
     status_label = loaded.findChild(QLabel, "label")
 
     windows = {}
-    
-    def open_comparaciones():
-        mods = ["ui", "sorting_comparison", "sortingcomparison", "app", "comparaciones"]
-        classes = ["ComparacionesWindow", "SortingComparison", "ComparisonsWindow", "Comparaciones"]
-        scripts = ["ui.py", "app.py", "sorting_comparison.py", "comparaciones.py"]
-        for m in mods:
-            mod = try_import(m)
-            if mod:
-                cls = find_window_class(mod, classes)
-                if cls:
-                    inst = instantiate_and_show(cls)
-                    if inst:
-                        windows["comparaciones"] = inst
-                        if status_label: status_label.setText(f"Abierto {m}.{cls.__name__}")
-                        return
-                for fn in ("main", "run", "start"):
-                    fcall = getattr(mod, fn, None)
-                    if callable(fcall):
-                        try:
-                            fcall()
-                            if status_label: status_label.setText(f"Ejecutado {m}.{fn}()")
-                            return
-                        except Exception:
-                            traceback.print_exc()
-        for s in scripts:
-            if Path(s).exists():
-                run_subprocess(s, status_label)
-                return
-        if status_label:
-            status_label.setText("No se pudo abrir Comparaciones (revise nombres).")
-
-    def open_mergesort():
-        mods = ["merge_tree_controller", "app", "mergesort", "mergesort_window"]
-        classes = ["MergeTreeController", "MergesortWindow", "MergesortController", "Mergesort"]
-        scripts = ["merge_tree_controller.py", "app.py", "mergesort.py"]
-        for m in mods:
-            mod = try_import(m)
-            if mod:
-                cls = find_window_class(mod, classes)
-                if cls:
-                    inst = instantiate_and_show(cls)
-                    if inst:
-                        windows["mergesort"] = inst
-                        if status_label: status_label.setText(f"Abierto {m}.{cls.__name__}")
-                        return
-                for fn in ("main", "run", "start"):
-                    fcall = getattr(mod, fn, None)
-                    if callable(fcall):
-                        try:
-                            fcall()
-                            if status_label: status_label.setText(f"Ejecutado {m}.{fn}()")
-                            return
-                        except Exception:
-                            traceback.print_exc()
-        for s in scripts:
-            if Path(s).exists():
-                run_subprocess(s, status_label)
-                return
-        if status_label:
-            status_label.setText("No se pudo abrir Mergesort (revise nombres).")
-
-    def open_quicksort():
-        mods = ["quicksort", "quicksort_gui", "quick", "quicksort_module"]
-        classes = ["QuicksortWindow", "QuicksortGUI", "QuickSortWindow"]
-        scripts = ["quicksort.py", "quick.py"]
-        for m in mods:
-            mod = try_import(m)
-            if mod:
-                if find_window_class(mod, ["QuicksortGUI"]) or hasattr(mod, "QuicksortGUI"):
-                    try:
-                        path = Path(mod.__file__).name
-                    except Exception:
-                        path = None
-                    if path and Path(path).exists():
-                        run_subprocess(path, status_label)
-                        return
-                    break
-                cls = find_window_class(mod, classes)
-                if cls:
-                    inst = instantiate_and_show(cls)
-                    if inst:
-                        windows["quicksort"] = inst
-                        if status_label: status_label.setText(f"Abierto {m}.{cls.__name__}")
-                        return
-        for s in scripts:
-            if Path(s).exists():
-                run_subprocess(s, status_label)
+
+    def open_window(name):
+        inst = windows.get(name)
+        if inst is None:
+            t0 = time.perf_counter()
+            try:
+                inst = WINDOWS[name](loaded)
+            except Exception as e:
+                traceback.print_exc()
+                if status_label:
+                    status_label.setText(f"No se pudo abrir {name}: {e}")
                 return
+            windows[name] = inst
+            present(inst)
+            ms = (time.perf_counter() - t0) * 1000
+            if status_label:
+                status_label.setText(f"Abierto {name} ({ms:.0f} ms)")
+            if startup.active():
+                startup.report(f"{name} abierta en {ms:.0f} ms")
+            return
         if status_label:
-            status_label.setText("No se pudo abrir Quicksort (revise nombres).")
+            status_label.setText(f"Abierto {name}")
+        present(inst)
+
+    def close_tk_windows():
+        for inst in windows.values():
+            if isinstance(inst, TkWindow):
+                inst.destroy()
 
-    if btn_comp:
-        btn_comp.clicked.connect(open_comparaciones)
-    if btn_merge:
-        btn_merge.clicked.connect(open_mergesort)
-    if btn_quick:
-        btn_quick.clicked.connect(open_quicksort)
+    for name in WINDOWS:
+        btn = loaded.findChild(QPushButton, name)
+        if btn:
+            btn.clicked.connect(lambda _=False, name=name: open_window(name))
+    QApplication.instance().aboutToQuit.connect(close_tk_windows)
 
+    # las referencias deben vivir lo mismo que el launcher
+    loaded.windows = windows
     return loaded
 
 if __name__ == "__main__":
@@ -175,4 +172,7 @@ if __name__ == "__main__":
         traceback.print_exc()
         QMessageBox.critical(None, "Error", f"No se pudo cargar 'comparaciones.ui':\n{e}")
         sys.exit(1)
+    if startup.active():
+        # se ejecuta con el primer ciclo del event loop, ya con la ventana mostrada
+        QTimer.singleShot(0, lambda: startup.report("primera ventana"))
     sys.exit(app.exec())
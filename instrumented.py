@@ -0,0 +1,414 @@
+# instrumented.py
+# Registro de algoritmos instrumentados con un único protocolo de eventos: el
+# de merge_events (bloques array('q') de STRIDE enteros, ver OP_*) más
+# OP_READ. Cada algoritmo ordena arr[l:r] en el sitio y emite sus eventos;
+# los costos (comparaciones, lecturas y escrituras de elementos, pico de
+# memoria auxiliar y profundidad) los cuenta SortStats a partir del flujo,
+# igual para todos. Sin dependencias de Qt.
+#
+# Costo de cada evento:
+#   OP_COMPARE i j   1 comparación, 2 lecturas
+#   OP_READ    idx   1 lectura (p. ej. los dos lados de un swap)
+#   OP_TAKE    idx   1 lectura y el elemento pasa al buffer auxiliar del frame
+#   OP_WRITE   ...   1 escritura en el arreglo
+#   OP_ENTER / OP_EXIT abren y cierran un frame (un llamado recursivo, una
+#   pasada); al cerrarse se libera lo que el frame tomó en su buffer.
+# La memoria auxiliar se mide en elementos: contadores e índices no cuentan.
+from array import array
+
+from merge_events import (
+    OP_ENTER, OP_COMPARE, OP_TAKE, OP_WRITE, OP_EXIT, STRIDE, EVENT_NAMES,
+    CHUNK_EVENTS, merge_sort_encoded,
+)
+
+OP_READ = 5
+INSTRUMENTED_EVENT_NAMES = EVENT_NAMES + ('read',)
+
+# timsort: tramos más cortos que esto se extienden con inserción binaria
+MIN_MERGE = 32
+RADIX_BITS = 8
+
+
+# ---------------- Costos a partir del flujo de eventos ----------------
+class SortStats:
+    """Costos acumulados de un flujo de eventos; feed() recibe bloques
+       codificados (array('q') o memoryview de una traza)."""
+
+    __slots__ = ("events", "comparisons", "reads", "writes",
+                 "aux", "aux_peak", "depth", "max_depth", "_frames")
+
+    def __init__(self):
+        self.events = 0
+        self.comparisons = 0
+        self.reads = 0
+        self.writes = 0
+        self.aux = 0
+        self.aux_peak = 0
+        self.depth = 0
+        self.max_depth = 0
+        self._frames = []   # aux al abrir cada frame abierto
+
+    def feed(self, buf):
+        ops = buf[0::STRIDE]
+        if not hasattr(ops, "count"):
+            ops = ops.tolist()   # memoryview
+        compares = ops.count(OP_COMPARE)
+        takes = ops.count(OP_TAKE)
+        self.events += len(ops)
+        self.comparisons += compares
+        self.reads += 2 * compares + takes + ops.count(OP_READ)
+        self.writes += ops.count(OP_WRITE)
+        if not (takes or ops.count(OP_ENTER) or ops.count(OP_EXIT)):
+            return
+        # profundidad y memoria auxiliar dependen del orden de los eventos
+        aux, peak = self.aux, self.aux_peak
+        depth, max_depth = self.depth, self.max_depth
+        frames = self._frames
+        for op in ops:
+            if op == OP_TAKE:
+                aux += 1
+                if aux > peak:
+                    peak = aux
+            elif op == OP_ENTER:
+                frames.append(aux)
+                depth += 1
+                if depth > max_depth:
+                    max_depth = depth
+            elif op == OP_EXIT:
+                aux = frames.pop()
+                depth -= 1
+        self.aux, self.aux_peak = aux, peak
+        self.depth, self.max_depth = depth, max_depth
+
+    @classmethod
+    def from_dict(cls, d):
+        """Costos ya contados (p. ej. los de la cabecera de una traza); solo
+           los totales, no se puede seguir alimentando."""
+        self = cls()
+        for name in ("events", "comparisons", "reads", "writes", "aux_peak", "max_depth"):
+            setattr(self, name, d[name])
+        return self
+
+    def to_dict(self):
+        return {
+            "events": self.events,
+            "comparisons": self.comparisons,
+            "reads": self.reads,
+            "writes": self.writes,
+            "aux_peak": self.aux_peak,
+            "max_depth": self.max_depth,
+        }
+
+
+def format_costs(s):
+    """Costos de un to_dict() en una línea legible."""
+    return (f"{s['comparisons']} comparaciones · {s['reads']} lecturas · "
+            f"{s['writes']} escrituras · aux pico {s['aux_peak']} · "
+            f"profundidad {s['max_depth']}")
+
+
+# ---------------- Algoritmos ----------------
+# Todos con la firma de merge_sort_encoded: (arr, l, r, chunk_events) ->
+# generador de bloques; los bloques pueden pasarse un poco de chunk_events.
+def quick_sort_encoded(arr, l, r, chunk_events=CHUNK_EVENTS):
+    """Quicksort Lomuto con el pivote del medio. Una pila explícita con
+       frames de cierre (l, ~r) mantiene anidados ENTER/EXIT como en la
+       versión recursiva; los swaps son 2 lecturas y 2 escrituras."""
+    limit = chunk_events * STRIDE
+    buf = []
+    put = buf.extend
+
+    def swap(i, j, lo, hi):
+        x, y = arr[i], arr[j]
+        arr[i], arr[j] = y, x
+        put((OP_READ, i, 0, 0, 0, OP_READ, j, 0, 0, 0,
+             OP_WRITE, lo, hi, i, y, OP_WRITE, lo, hi, j, x))
+
+    stack = [l, r]
+    while stack:
+        hi = stack.pop()
+        lo = stack.pop()
+        if hi < 0:
+            put((OP_EXIT, lo, ~hi, 0, 0))
+            continue
+        put((OP_ENTER, lo, hi, 0, 0))
+        if hi - lo <= 1:
+            put((OP_EXIT, lo, hi, 0, 0))
+            continue
+        p = hi - 1
+        mid = (lo + p) // 2
+        if mid != p:
+            swap(mid, p, lo, hi)
+        pivot = arr[p]
+        i = lo
+        for j in range(lo, p):
+            put((OP_COMPARE, j, p, 0, 0))
+            if arr[j] < pivot:
+                if i != j:
+                    swap(i, j, lo, hi)
+                i += 1
+            if len(buf) >= limit:
+                yield array('q', buf)
+                buf.clear()
+        if i != p:
+            swap(i, p, lo, hi)
+        stack += (lo, ~hi)
+        if hi - (i + 1) > 0:
+            stack += (i + 1, hi)
+        if i - lo > 0:
+            stack += (lo, i)
+    if buf:
+        yield array('q', buf)
+
+
+def heap_sort_encoded(arr, l, r, chunk_events=CHUNK_EVENTS):
+    """Heapsort con max-heap sobre arr[l:r]: sin memoria auxiliar y con un
+       solo frame (no es recursivo)."""
+    limit = chunk_events * STRIDE
+    buf = []
+    put = buf.extend
+    n = r - l
+
+    def swap(i, j):
+        x, y = arr[i], arr[j]
+        arr[i], arr[j] = y, x
+        put((OP_READ, i, 0, 0, 0, OP_READ, j, 0, 0, 0,
+             OP_WRITE, l, r, i, y, OP_WRITE, l, r, j, x))
+
+    def sift(root, end):
+        while True:
+            child = 2 * root + 1
+            if child >= end:
+                return
+            if child + 1 < end:
+                put((OP_COMPARE, l + child, l + child + 1, 0, 0))
+                if arr[l + child] < arr[l + child + 1]:
+                    child += 1
+            put((OP_COMPARE, l + root, l + child, 0, 0))
+            if not arr[l + root] < arr[l + child]:
+                return
+            swap(l + root, l + child)
+            root = child
+
+    put((OP_ENTER, l, r, 0, 0))
+    for root in range(n // 2 - 1, -1, -1):
+        sift(root, n)
+        if len(buf) >= limit:
+            yield array('q', buf)
+            buf.clear()
+    for end in range(n - 1, 0, -1):
+        swap(l, l + end)
+        sift(0, end)
+        if len(buf) >= limit:
+            yield array('q', buf)
+            buf.clear()
+    put((OP_EXIT, l, r, 0, 0))
+    yield array('q', buf)
+
+
+def _min_run(n):
+    """Largo mínimo de tramo de timsort: entre MIN_MERGE/2 y MIN_MERGE."""
+    extra = 0
+    while n >= MIN_MERGE:
+        extra |= n & 1
+        n >>= 1
+    return n + extra
+
+
+def tim_sort_encoded(arr, l, r, chunk_events=CHUNK_EVENTS):
+    """Timsort simplificado: tramos ascendentes naturales (los estrictamente
+       descendentes se invierten), extendidos a min_run con inserción binaria
+       y mezclados con las invariantes de la pila de tramos de timsort. Cada
+       merge copia el tramo izquierdo al buffer auxiliar (un frame). Sin
+       galloping."""
+    limit = chunk_events * STRIDE
+    buf = []
+    put = buf.extend
+    min_run = _min_run(r - l)
+
+    def swap(i, j):
+        x, y = arr[i], arr[j]
+        arr[i], arr[j] = y, x
+        put((OP_READ, i, 0, 0, 0, OP_READ, j, 0, 0, 0,
+             OP_WRITE, l, r, i, y, OP_WRITE, l, r, j, x))
+
+    def insertion(lo, start, hi):
+        # arr[lo:start] ya está ordenado; inserta arr[start:hi] con búsqueda binaria
+        for k in range(start, hi):
+            x = arr[k]
+            put((OP_READ, k, 0, 0, 0))
+            a, b = lo, k
+            while a < b:
+                m = (a + b) // 2
+                put((OP_COMPARE, k, m, 0, 0))
+                if x < arr[m]:
+                    b = m
+                else:
+                    a = m + 1
+            for t in range(k, a, -1):
+                arr[t] = arr[t - 1]
+                put((OP_READ, t - 1, 0, 0, 0, OP_WRITE, l, r, t, arr[t]))
+            if a != k:
+                arr[a] = x
+                put((OP_WRITE, l, r, a, x))
+
+    def merge(s1, n1, n2):
+        # el tramo izquierdo va al buffer; el merge es estable (<= toma de la izquierda)
+        s2, e = s1 + n1, s1 + n1 + n2
+        put((OP_ENTER, s1, e, 0, 0))
+        temp = arr[s1:s2]
+        for t in range(s1, s2):
+            put((OP_TAKE, t, 0, 0, 0))
+        i, j, out = 0, s2, s1
+        while i < n1 and j < e:
+            put((OP_COMPARE, s1 + i, j, 0, 0))
+            if temp[i] <= arr[j]:
+                val = temp[i]
+                i += 1
+            else:
+                val = arr[j]
+                put((OP_READ, j, 0, 0, 0))
+                j += 1
+            arr[out] = val
+            put((OP_WRITE, s1, e, out, val))
+            out += 1
+        while i < n1:
+            arr[out] = temp[i]
+            put((OP_WRITE, s1, e, out, temp[i]))
+            i += 1
+            out += 1
+        put((OP_EXIT, s1, e, 0, 0))
+
+    put((OP_ENTER, l, r, 0, 0))
+    runs = []   # (inicio, largo)
+    i = l
+    while i < r:
+        j = i + 1
+        if j < r:
+            put((OP_COMPARE, j, j - 1, 0, 0))
+            if arr[j] < arr[j - 1]:
+                # estrictamente descendente: se invierte sin romper la estabilidad
+                j += 1
+                while j < r:
+                    put((OP_COMPARE, j, j - 1, 0, 0))
+                    if not arr[j] < arr[j - 1]:
+                        break
+                    j += 1
+                a, b = i, j - 1
+                while a < b:
+                    swap(a, b)
+                    a += 1
+                    b -= 1
+            else:
+                j += 1
+                while j < r:
+                    put((OP_COMPARE, j, j - 1, 0, 0))
+                    if arr[j] < arr[j - 1]:
+                        break
+                    j += 1
+        run_end = min(r, i + min_run)
+        if j < run_end:
+            insertion(i, j, run_end)
+            j = run_end
+        runs.append((i, j - i))
+        i = j
+        # invariantes: A > B + C y B > C (A, B, C: los tres tramos del tope)
+        while len(runs) > 1:
+            k = len(runs) - 2
+            if ((k > 0 and runs[k - 1][1] <= runs[k][1] + runs[k + 1][1])
+                    or (k > 1 and runs[k - 2][1] <= runs[k - 1][1] + runs[k][1])):
+                if runs[k - 1][1] < runs[k + 1][1]:
+                    k -= 1
+            elif runs[k][1] > runs[k + 1][1]:
+                break
+            (s1, n1), (_, n2) = runs[k], runs[k + 1]
+            merge(s1, n1, n2)
+            runs[k:k + 2] = [(s1, n1 + n2)]
+        if len(buf) >= limit:
+            yield array('q', buf)
+            buf.clear()
+    while len(runs) > 1:
+        (s1, n1), (_, n2) = runs[-2], runs[-1]
+        merge(s1, n1, n2)
+        runs[-2:] = [(s1, n1 + n2)]
+        if len(buf) >= limit:
+            yield array('q', buf)
+            buf.clear()
+    put((OP_EXIT, l, r, 0, 0))
+    yield array('q', buf)
+
+
+def radix_sort_encoded(arr, l, r, chunk_events=CHUNK_EVENTS):
+    """Radix LSD de RADIX_BITS bits por pasada sobre enteros (los negativos
+       se desplazan por el mínimo). Sin comparaciones: cada pasada es un
+       frame que cuenta dígitos, copia todo al buffer de salida y lo escribe
+       de vuelta."""
+    limit = chunk_events * STRIDE
+    buf = []
+    put = buf.extend
+    put((OP_ENTER, l, r, 0, 0))
+    if r - l > 1:
+        for k in range(l, r):
+            put((OP_READ, k, 0, 0, 0))
+        low = min(arr[l:r])
+        span = max(arr[l:r]) - low
+        mask = (1 << RADIX_BITS) - 1
+        shift = 0
+        while True:
+            put((OP_ENTER, l, r, 0, 0))
+            counts = [0] * (mask + 2)
+            for k in range(l, r):
+                counts[((arr[k] - low) >> shift & mask) + 1] += 1
+                put((OP_READ, k, 0, 0, 0))
+            for d in range(mask + 1):
+                counts[d + 1] += counts[d]
+            out = [None] * (r - l)
+            for k in range(l, r):
+                x = arr[k]
+                d = (x - low) >> shift & mask
+                out[counts[d]] = x
+                counts[d] += 1
+                put((OP_TAKE, k, 0, 0, 0))
+                if len(buf) >= limit:
+                    yield array('q', buf)
+                    buf.clear()
+            for k, x in enumerate(out, l):
+                arr[k] = x
+                put((OP_WRITE, l, r, k, x))
+                if len(buf) >= limit:
+                    yield array('q', buf)
+                    buf.clear()
+            put((OP_EXIT, l, r, 0, 0))
+            shift += RADIX_BITS
+            if span >> shift == 0:
+                break
+    put((OP_EXIT, l, r, 0, 0))
+    yield array('q', buf)
+
+
+# ---------------- Registro ----------------
+# nombre -> (texto para la UI, generador de eventos)
+INSTRUMENTED = {
+    "merge": ("Merge sort", merge_sort_encoded),
+    "quick": ("Quicksort (Lomuto, pivote medio)", quick_sort_encoded),
+    "heap": ("Heapsort", heap_sort_encoded),
+    "timsort": ("Timsort simplificado", tim_sort_encoded),
+    "radix": ("Radix LSD (base 256)", radix_sort_encoded),
+}
+
+
+def run_instrumented(name, data, chunk_events=CHUNK_EVENTS):
+    """Ordena una copia de data con INSTRUMENTED[name] y cuenta sus costos.
+       Devuelve (ordenado, SortStats)."""
+    _, engine = INSTRUMENTED[name]
+    arr = list(data)
+    stats = SortStats()
+    for buf in engine(arr, 0, len(arr), chunk_events):
+        stats.feed(buf)
+    return arr, stats
+
+
+def measure_costs(data, names=None):
+    """Costos (SortStats.to_dict()) de cada algoritmo sobre los mismos datos."""
+    names = list(INSTRUMENTED) if names is None else names
+    return {name: run_instrumented(name, data)[1].to_dict() for name in names}
@@ -0,0 +1,159 @@
+# measure.py
+# Medición real de CPU y memoria por algoritmo: cada ordenamiento corre
+# aislado en un proceso hijo y el padre lo muestrea mientras ordena.
+# Sin dependencias de Qt.
+import multiprocessing
+import os
+import random
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from sort_algorithms import ALGORITHMS
+
+# "spawn" funciona igual en Windows/Linux/macOS y no hereda el estado de Qt
+_CTX = multiprocessing.get_context("spawn")
+
+# 50 Hz: por debajo de ~10 ms el tick de cpu_times hace que la CPU oscile 0/200 %
+SAMPLE_INTERVAL_S = 0.02
+
+# por encima de este tamaño no se mide el pico de tracemalloc: el hook por
+# asignación vuelve la corrida extra varias veces más lenta que el sort
+TRACEMALLOC_MAX_N = 200_000
+
+
+def _sort_worker(name, data, conn):
+    """Proceso hijo: avisa justo antes de ordenar y reporta al terminar.
+       El pico de tracemalloc se mide en una ejecución previa, fuera de la
+       ventana muestreada, para que el hook de asignaciones no infle tiempos."""
+    func = ALGORITHMS[name]
+    peak = None
+    if len(data) <= TRACEMALLOC_MAX_N:
+        tracemalloc.start()
+        func(data.copy())
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    conn.send(("start",))
+    cpu0 = time.process_time_ns()
+    t0 = time.perf_counter_ns()
+    _, comparisons = func(data)
+    wall_ns = time.perf_counter_ns() - t0
+    cpu_ns = time.process_time_ns() - cpu0
+    conn.send(("done", comparisons, wall_ns, cpu_ns, peak))
+    conn.close()
+
+
+def _cpu_seconds(proc):
+    t = proc.cpu_times()
+    return t.user + t.system
+
+
+def measure_sort(name, data, interval=SAMPLE_INTERVAL_S, on_sample=None, should_cancel=None):
+    """Ordena `data` con ALGORITHMS[name] en un proceso aparte y lo muestrea
+       cada `interval` segundos mientras ordena.
+
+       Devuelve un dict con comparaciones, tiempo de pared y de CPU del sort,
+       pico de tracemalloc (None si len(data) > TRACEMALLOC_MAX_N) y las series t (ms), cpu (%) y rss (MB) del hijo.
+       on_sample(t_ms, cpu_pct, rss_mb) se llama con cada muestra; si
+       should_cancel() devuelve True se mata el hijo y se devuelve None.
+    """
+    # psutil solo lo usa el padre al medir; los hijos (spawn) no lo importan
+    import psutil
+
+    parent_conn, child_conn = _CTX.Pipe(duplex=False)
+    proc = _CTX.Process(target=_sort_worker, args=(name, data, child_conn), daemon=True)
+    proc.start()
+    child_conn.close()
+    try:
+        ps = psutil.Process(proc.pid)
+        # esperar a que el hijo termine de arrancar (import + datos)
+        while not parent_conn.poll(0.05):
+            if should_cancel and should_cancel():
+                return None
+            if not proc.is_alive():
+                raise RuntimeError(f"El proceso de {name} terminó sin empezar a ordenar")
+        parent_conn.recv()
+
+        times, cpu, rss = [], [], []
+        t0 = last_t = time.perf_counter()
+        last_cpu = _cpu_seconds(ps)
+
+        def sample():
+            nonlocal last_t, last_cpu
+            now = time.perf_counter()
+            try:
+                cpu_s = _cpu_seconds(ps)
+                rss_mb = ps.memory_info().rss / (1024 * 1024.0)
+            except psutil.Error:
+                return
+            dt = now - last_t
+            pct = 100.0 * (cpu_s - last_cpu) / dt if dt > 0 else 0.0
+            last_t, last_cpu = now, cpu_s
+            t_ms = (now - t0) * 1000.0
+            times.append(t_ms); cpu.append(pct); rss.append(rss_mb)
+            if on_sample:
+                on_sample(t_ms, pct, rss_mb)
+
+        sample()
+        while not parent_conn.poll(interval):
+            if should_cancel and should_cancel():
+                return None
+            if not proc.is_alive():
+                raise RuntimeError(f"El proceso de {name} terminó sin reportar resultados")
+            sample()
+        sample()
+
+        _, comparisons, wall_ns, cpu_ns, peak = parent_conn.recv()
+        proc.join()
+        return {
+            "algorithm": name,
+            "size": len(data),
+            "comparisons": comparisons,
+            "wall_ns": wall_ns,
+            "cpu_ns": cpu_ns,
+            "tracemalloc_peak": peak,
+            "rss_peak_mb": max(rss) if rss else 0.0,
+            "t_ms": times,
+            "cpu_pct": cpu,
+            "rss_mb": rss,
+        }
+    finally:
+        if proc.is_alive():
+            proc.terminate()
+            proc.join()
+        parent_conn.close()
+
+
+# ---------------- Comparaciones en lote (todas las CPUs) ----------------
+def compare_task(size, seed, quicksort="quicksort", mergesort="mergesort"):
+    """Tarea de un worker del pool: genera su propia lista y cronometra solo
+       cada sort (perf_counter_ns), sin muestreo ni tracemalloc. `quicksort` y
+       `mergesort` son las variantes registradas en ALGORITHMS que se miden
+       en cada papel."""
+    rnd = random.Random(seed)
+    data = [rnd.randint(1, 10000) for _ in range(size)]
+    result = {"size": size}
+    for role, name in (("quicksort", quicksort), ("mergesort", mergesort)):
+        arr = data.copy()
+        t0 = time.perf_counter_ns()
+        _, comparisons = ALGORITHMS[name](arr)
+        result[role] = {"comparisons": comparisons, "wall_ns": time.perf_counter_ns() - t0}
+    return result
+
+
+def start_batch(sizes, on_done, seed=None, quicksort="quicksort", mergesort="mergesort"):
+    """Reparte las comparaciones de `sizes` en un pool de procesos con un
+       worker por CPU. on_done(future) se llama (desde un hilo del pool) a
+       medida que termina cada tamaño; future.result() es el dict de
+       compare_task. Devuelve (executor, futures): con
+       executor.shutdown(cancel_futures=True) se cancelan las pendientes.
+    """
+    seed = random.randrange(2**32) if seed is None else seed
+    workers = max(1, min(os.cpu_count() or 1, len(sizes)))
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=_CTX)
+    futures = []
+    for k, size in enumerate(sizes):
+        fut = executor.submit(compare_task, size, seed + k, quicksort, mergesort)
+        fut.add_done_callback(on_done)
+        futures.append(fut)
+    return executor, futures
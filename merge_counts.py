@@ -0,0 +1,127 @@
+# merge_counts.py
+# Conteo vectorizado (NumPy) de las comparaciones de merge sort, nivel por
+# nivel, para arreglos de 10^7-10^8 elementos. Sin dependencias de Qt.
+#
+# En un merge de A = arr[l:m] y B = arr[m:r] (ambos ya ordenados) se hace una
+# comparación por elemento colocado hasta que uno de los dos se agota:
+#     comparaciones = (r - l) - restantes
+# y `restantes` solo depende de los *conjuntos* de valores de A y B:
+#   desempate a la derecha (`<`, mergesort_count):
+#       max(A) <  max(B) -> restantes = #{b en B : b >  max(A)}
+#       si no            -> restantes = #{a en A : a >= max(B)}
+#   desempate a la izquierda (`<=`, merge_sort_gen):
+#       max(A) <= max(B) -> restantes = #{b en B : b >= max(A)}
+#       si no            -> restantes = #{a en A : a >  max(B)}
+# Como los rangos de cada nodo son rangos del arreglo *original*, no hace falta
+# mezclar nada: basta recorrer el árbol de divisiones (m = (l + r) // 2) de la
+# raíz a las hojas con máximos y conteos por segmento. O(n) por nivel.
+import numpy as np
+
+# elementos por bloque al comparar contra los umbrales repetidos por segmento
+BLOCK = 1 << 22
+
+TIES = ("right", "left")
+
+
+def _segment_counts(values, bounds, thr, below):
+    """Para cada segmento k = values[bounds[k]:bounds[k+1]] (no vacío) cuenta
+       #{x < thr[k]} si below[k], o #{x > thr[k]} si no. Procesa por bloques
+       de ~BLOCK elementos para no materializar umbrales de tamaño n."""
+    nseg = len(bounds) - 1
+    counts = np.zeros(nseg, dtype=np.int64)
+    if nseg <= 64:
+        # pocos segmentos grandes: una pasada por segmento, sin repeat
+        for k in range(nseg):
+            seg = values[bounds[k]:bounds[k + 1]]
+            counts[k] = np.count_nonzero(seg < thr[k] if below[k] else seg > thr[k])
+        return counts
+    # cortes de bloque alineados a límites de segmento
+    cuts = np.unique(np.searchsorted(bounds, np.arange(0, bounds[-1], BLOCK)))
+    cuts = np.append(cuts[cuts < nseg], nseg)
+    for s0, s1 in zip(cuts[:-1].tolist(), cuts[1:].tolist()):
+        b = bounds[s0:s1 + 1]
+        lo, hi = int(b[0]), int(b[-1])
+        lengths = np.diff(b)
+        rep = np.repeat(thr[s0:s1], lengths)
+        block = values[lo:hi]
+        hit = np.where(np.repeat(below[s0:s1], lengths), block < rep, block > rep)
+        # suma por segmento con una sola cumsum (reduceat es lento con
+        # millones de segmentos de 1-3 elementos)
+        acc = np.zeros(hi - lo + 1, dtype=np.int32)  # hi - lo <= BLOCK + segmento
+        np.cumsum(hit, out=acc[1:])
+        counts[s0:s1] = acc[b[1:] - lo] - acc[b[:-1] - lo]
+    return counts
+
+
+def _compact(values):
+    """Copia contigua en el entero más chico que la representa: a 10^8
+       elementos el ancho de banda de memoria es el costo dominante."""
+    values = np.ascontiguousarray(values)
+    if values.dtype.kind in "iu" and len(values):
+        lo, hi = values.min(), values.max()
+        for dtype in (np.int16, np.int32):
+            info = np.iinfo(dtype)
+            if info.min <= lo and hi <= info.max:
+                return values.astype(dtype)
+    return values
+
+
+def mergesort_comparisons(values, ties="right"):
+    """Número exacto de comparaciones del merge sort top-down sobre `values`.
+
+       ties="right" reproduce mergesort_count (toma la izquierda solo si
+       izq < der); ties="left" reproduce merge_sort_gen y los eventos
+       'compare' del árbol (izq <= der). Ambos dividen igual: m = (l + r) // 2.
+    """
+    if ties not in TIES:
+        raise ValueError(f"Desempate desconocido: {ties}")
+    values = _compact(values)
+    n = len(values)
+    total = 0
+    parent = np.array([0, n], dtype=np.int64)
+    while True:
+        lengths = np.diff(parent)
+        split = lengths >= 2
+        nsplit = int(np.count_nonzero(split))
+        if not nsplit:
+            return total
+        # límites del nivel hijo: los del padre más el punto medio de cada
+        # segmento que se divide (los de longitud 1 pasan tal cual)
+        before = np.zeros(len(parent), dtype=np.int64)
+        np.cumsum(split, out=before[1:])
+        child = np.empty(len(parent) + nsplit, dtype=np.int64)
+        pos = np.arange(len(parent)) + before
+        child[pos] = parent
+        left = pos[:-1][split]
+        right = left + 1
+        child[right] = (parent[:-1][split] + parent[1:][split]) // 2
+
+        maxima = np.maximum.reduceat(values, child[:-1])
+        a_max, b_max = maxima[left], maxima[right]
+
+        # cada hijo se compara contra el máximo de su hermano; #{x >= t} se
+        # obtiene como len - #{x < t} para hacer una sola pasada por nivel
+        thr = maxima
+        thr[left] = b_max
+        thr[right] = a_max
+        below = np.zeros(len(thr), dtype=bool)
+        below[left if ties == "right" else right] = True
+        counts = _segment_counts(values, child, thr, below)
+        len_a = child[right] - child[left]
+        len_b = child[right + 1] - child[right]
+
+        if ties == "right":
+            # A se agota primero si max(A) < max(B): quedan #{b > max(A)}
+            rem = np.where(a_max < b_max, counts[right], len_a - counts[left])
+        else:
+            # A se agota primero si max(A) <= max(B): quedan #{b >= max(A)}
+            rem = np.where(a_max <= b_max, len_b - counts[right], counts[left])
+        total += int(lengths[split].sum() - rem.sum())
+        parent = child
+
+
+def mergesort_numpy_count(arr):
+    """Interfaz de ALGORITHMS: (ordenado, comparaciones). El ordenado es el
+       np.sort del arreglo; las comparaciones son las de mergesort_count."""
+    values = np.asarray(arr)
+    return np.sort(values, kind="stable"), mergesort_comparisons(values, "right")
@@ -0,0 +1,196 @@
+# merge_events.py
+# Motor de eventos de merge sort sin dependencias de Qt.
+from array import array
+
+# ---------------- Codificación compacta de eventos ----------------
+# Cada evento ocupa STRIDE enteros consecutivos en un array('q'):
+#   (OP_ENTER,   l, r, 0, 0)
+#   (OP_COMPARE, i, j, 0, 0)
+#   (OP_TAKE,    idx, 0, 0, 0)
+#   (OP_WRITE,   l, r, pos, val)
+#   (OP_EXIT,    l, r, 0, 0)
+# Los snapshots no se copian: enter/exit solo llevan el rango (l, r) y quien
+# consume el flujo lee arr[l:r] de su propia copia viva cuando lo necesita.
+OP_ENTER = 0
+OP_COMPARE = 1
+OP_TAKE = 2
+OP_WRITE = 3
+OP_EXIT = 4
+STRIDE = 5
+EVENT_NAMES = ('enter', 'compare', 'take', 'write', 'exit')
+
+# eventos por bloque emitido (4096 * 5 * 8 bytes = 160 KiB)
+CHUNK_EVENTS = 4096
+
+_INT32_MIN, _INT32_MAX = -(1 << 31), (1 << 31) - 1
+
+
+def event_typecode(values):
+    """'i' si n y todos los valores caben en int32 (4 bytes por entero en
+       los bloques codificados); si no, 'q'."""
+    if len(values) <= _INT32_MAX and all(_INT32_MIN <= v <= _INT32_MAX for v in values):
+        return 'i'
+    return 'q'
+
+
+# ---------------- Instrumented merge sort (generador de eventos) ----------------
+def merge_sort_gen(arr, l, r):
+    """Generador que ordena arr[l:r] y emite eventos:
+       ('enter', l, r, snapshot)
+       ('compare', i, j)
+       ('take', idx)
+       ('write', l, r, pos, val)
+       ('exit', l, r, snapshot_final)
+    """
+    yield ('enter', l, r, arr[l:r])
+    if r - l <= 1:
+        yield ('exit', l, r, arr[l:r])
+        return
+    m = (l + r) // 2
+    yield from merge_sort_gen(arr, l, m)
+    yield from merge_sort_gen(arr, m, r)
+    i, j = l, m
+    temp = []
+    while i < m and j < r:
+        yield ('compare', i, j)
+        if arr[i] <= arr[j]:
+            temp.append(arr[i]); yield ('take', i); i += 1
+        else:
+            temp.append(arr[j]); yield ('take', j); j += 1
+    while i < m:
+        temp.append(arr[i]); yield ('take', i); i += 1
+    while j < r:
+        temp.append(arr[j]); yield ('take', j); j += 1
+    for idx, val in enumerate(temp):
+        pos = l + idx
+        yield ('write', l, r, pos, val)
+        arr[pos] = val
+    yield ('exit', l, r, arr[l:r])
+
+
+def merge_sort_iter(arr, l, r):
+    """Mismo protocolo y mismo orden de eventos que merge_sort_gen, pero con
+       una pila explícita en lugar de recursión: cada evento sale directamente
+       de este generador, sin atravesar O(log n) marcos de `yield from`.
+    """
+    # pila plana de enteros: (l, r) por abrir o (l, ~r) pendiente de merge
+    stack = [l, r]
+    while stack:
+        r = stack.pop()
+        l = stack.pop()
+        if r >= 0:
+            yield ('enter', l, r, arr[l:r])
+            if r - l <= 1:
+                yield ('exit', l, r, arr[l:r])
+                continue
+            m = (l + r) // 2
+            stack += (l, ~r, m, r, l, m)
+            continue
+        r = ~r
+        m = (l + r) // 2
+        i, j = l, m
+        temp = []
+        while i < m and j < r:
+            yield ('compare', i, j)
+            if arr[i] <= arr[j]:
+                temp.append(arr[i]); yield ('take', i); i += 1
+            else:
+                temp.append(arr[j]); yield ('take', j); j += 1
+        while i < m:
+            temp.append(arr[i]); yield ('take', i); i += 1
+        while j < r:
+            temp.append(arr[j]); yield ('take', j); j += 1
+        for idx, val in enumerate(temp):
+            pos = l + idx
+            yield ('write', l, r, pos, val)
+            arr[pos] = val
+        yield ('exit', l, r, arr[l:r])
+
+
+def merge_sort_encoded(arr, l, r, chunk_events=CHUNK_EVENTS, typecode='q'):
+    """Igual que merge_sort_gen pero emite bloques array(typecode) con los
+       eventos codificados (ver OP_*). Cada bloque contiene como mucho
+       ~chunk_events eventos; el orden de los eventos es idéntico al de
+       merge_sort_gen. Usa la misma pila explícita que merge_sort_iter.
+       Con typecode 'i' los bloques ocupan la mitad, si los valores caben.
+    """
+    limit = chunk_events * STRIDE
+    # se acumula en una lista (extend de tuplas es ~3x más rápido que en
+    # array) y se vuelca a un array('q') compacto al cerrar cada bloque
+    buf = []
+    put = buf.extend
+    stack = [l, r]
+    while stack:
+        r = stack.pop()
+        l = stack.pop()
+        if r >= 0:
+            put((OP_ENTER, l, r, 0, 0))
+            if r - l <= 1:
+                put((OP_EXIT, l, r, 0, 0))
+            else:
+                m = (l + r) // 2
+                stack += (l, ~r, m, r, l, m)
+            if len(buf) >= limit:
+                yield array(typecode, buf)
+                buf.clear()
+            continue
+        r = ~r
+        m = (l + r) // 2
+        i, j = l, m
+        temp = []
+        while i < m and j < r:
+            if arr[i] <= arr[j]:
+                put((OP_COMPARE, i, j, 0, 0))
+                temp.append(arr[i]); put((OP_TAKE, i, 0, 0, 0)); i += 1
+            else:
+                put((OP_COMPARE, i, j, 0, 0))
+                temp.append(arr[j]); put((OP_TAKE, j, 0, 0, 0)); j += 1
+            if len(buf) >= limit:
+                yield array(typecode, buf)
+                buf.clear()
+        while i < m:
+            temp.append(arr[i]); put((OP_TAKE, i, 0, 0, 0)); i += 1
+        while j < r:
+            temp.append(arr[j]); put((OP_TAKE, j, 0, 0, 0)); j += 1
+        for idx, val in enumerate(temp):
+            pos = l + idx
+            put((OP_WRITE, l, r, pos, val))
+            arr[pos] = val
+            if len(buf) >= limit:
+                yield array(typecode, buf)
+                buf.clear()
+        put((OP_EXIT, l, r, 0, 0))
+    if buf:
+        yield array(typecode, buf)
+
+
+def decode_events(chunks, original):
+    """Convierte un flujo codificado en las tuplas de merge_sort_gen.
+       Reconstruye los snapshots sobre una copia de `original`; útil para
+       depurar y para comprobar que ambos motores coinciden.
+    """
+    arr = list(original)
+    for buf in chunks:
+        for k in range(0, len(buf), STRIDE):
+            op = buf[k]
+            if op == OP_ENTER or op == OP_EXIT:
+                l, r = buf[k + 1], buf[k + 2]
+                yield (EVENT_NAMES[op], l, r, arr[l:r])
+            elif op == OP_COMPARE:
+                yield ('compare', buf[k + 1], buf[k + 2])
+            elif op == OP_TAKE:
+                yield ('take', buf[k + 1])
+            else:
+                l, r, pos, val = buf[k + 1], buf[k + 2], buf[k + 3], buf[k + 4]
+                yield ('write', l, r, pos, val)
+                arr[pos] = val
+
+
+def make_sort_events(original):
+    arr = original[:]  # copia que se muta dentro del generator
+    return merge_sort_iter(arr, 0, len(arr)), arr
+
+
+def make_encoded_events(original, chunk_events=CHUNK_EVENTS, typecode='q'):
+    arr = original[:]  # copia que se muta dentro del generator
+    return merge_sort_encoded(arr, 0, len(arr), chunk_events, typecode), arr
@@ -0,0 +1,348 @@
+# merge_timeline.py
+# Estado del árbol de merge sort + línea de tiempo grabada con checkpoints.
+# Sin dependencias de Qt: la vista solo lee estilos y textos de MergeTreeState.
+import heapq
+import time
+from array import array
+from bisect import bisect_right
+
+from merge_events import (
+    OP_ENTER, OP_COMPARE, OP_WRITE, OP_EXIT, STRIDE, CHUNK_EVENTS,
+    event_typecode, make_encoded_events,
+)
+from instrumented import SortStats
+
+# fase de cada nodo
+NODE_IDLE = 0
+NODE_ENTERED = 1
+NODE_EXITED = 2
+
+# estilo visual que la UI traduce a colores
+STYLE_IDLE = 0
+STYLE_ACTIVE = 1    # entrada al llamado recursivo
+STYLE_DONE = 2      # segmento ordenado
+STYLE_COMPARED = 3  # hoja comparada durante un merge
+
+
+# ---------------- Índices de nodo (numeración tipo heap) ----------------
+# La raíz (0, n) es el nodo 1; los hijos de k son 2k (izquierda) y 2k+1.
+def node_capacity(n):
+    """Tamaño necesario para indexar por heap todos los nodos del árbol de n."""
+    depth = max(0, n - 1).bit_length()
+    return 1 << (depth + 1)
+
+
+def node_range(n, idx):
+    """(l, r) del nodo idx, bajando desde la raíz con el mismo corte (l+r)//2."""
+    l, r = 0, n
+    for shift in range(idx.bit_length() - 2, -1, -1):
+        m = (l + r) // 2
+        if (idx >> shift) & 1:
+            l = m
+        else:
+            r = m
+    return l, r
+
+
+# ---------------- Estado del árbol ----------------
+class MergeTreeState:
+    """Estado visible del árbol tras aplicar un prefijo del flujo de eventos.
+
+       Todo lo que muestra la vista se deriva de aquí:
+       - arr: copia viva del arreglo (se actualiza con cada 'write')
+       - phase[idx]: fase de cada nodo, compared[pos]: hoja ya comparada
+       - writing / write_pos: nodo que está escribiendo su merge
+       Los nodos tocados desde el último repintado quedan en `dirty`.
+    """
+
+    def __init__(self, original):
+        self.original = list(original)
+        n = len(self.original)
+        self.n = n
+        self.arr = list(self.original)
+        self.phase = bytearray(node_capacity(n))
+        self.compared = bytearray(n)
+        self.leaf_node = array('q', [0]) * n  # pos -> idx de su hoja
+        self.stack = []    # nodos abiertos (idx)
+        self.stack_l = []  # l de cada nodo abierto
+        self.writing = 0
+        self.write_pos = -1
+        self.comparisons = 0
+        self.dirty = set()
+
+    def apply(self, op, a, b, c, d):
+        """Aplica un evento codificado (mismos operandos que handle_event)."""
+        if op == OP_ENTER:
+            stack = self.stack
+            if stack:
+                parent = stack[-1]
+                idx = 2 * parent if a == self.stack_l[-1] else 2 * parent + 1
+            else:
+                idx = 1
+            stack.append(idx)
+            self.stack_l.append(a)
+            self.phase[idx] = NODE_ENTERED
+            if b - a == 1:
+                self.leaf_node[a] = idx
+            self.dirty.add(idx)
+        elif op == OP_COMPARE:
+            self.comparisons += 1
+            self.compared[a] = 1
+            self.compared[b] = 1
+            self.dirty.add(self.leaf_node[a])
+            self.dirty.add(self.leaf_node[b])
+        elif op == OP_WRITE:
+            idx = self.stack[-1]
+            self.writing = idx
+            self.write_pos = c
+            self.arr[c] = d
+            self.dirty.add(idx)
+            self.dirty.add(self.leaf_node[c])
+        elif op == OP_EXIT:
+            idx = self.stack.pop()
+            self.stack_l.pop()
+            self.phase[idx] = NODE_EXITED
+            if self.writing == idx:
+                self.writing = 0
+            self.dirty.add(idx)
+        # OP_TAKE no cambia el estado visible
+
+    def node_style(self, idx, l, r):
+        if r - l == 1 and self.compared[l]:
+            return STYLE_COMPARED
+        phase = self.phase[idx]
+        if phase == NODE_ENTERED:
+            return STYLE_ACTIVE
+        if phase == NODE_EXITED:
+            return STYLE_DONE
+        return STYLE_IDLE
+
+    def node_text(self, idx, l, r, max_items=None):
+        """Texto de la columna de contenido, igual que lo pintaba handle_event.
+           Con max_items solo se formatean los primeros elementos del segmento.
+        """
+        if idx == self.writing:
+            pos = self.write_pos
+            return f"... writing {pos}:{self.arr[pos]} ..."
+        if max_items is not None and r - l > max_items:
+            stop, extra = l + max_items, r - l - max_items
+        else:
+            stop, extra = r, 0
+        if r - l == 1:
+            # una hoja siempre muestra el último valor escrito en su posición
+            seg = self.arr[l:r]
+        elif self.phase[idx] == NODE_EXITED:
+            # snapshot de salida: el segmento ya ordenado. Mientras el padre no
+            # escriba su merge sigue intacto en arr; si no, hay que reordenar.
+            parent = idx >> 1
+            if idx == 1 or (self.phase[parent] == NODE_ENTERED and self.writing != parent):
+                seg = self.arr[l:stop]
+            elif extra:
+                seg = heapq.nsmallest(stop - l, self.original[l:r])
+            else:
+                seg = sorted(self.original[l:r])
+        else:
+            # antes de escribir, el segmento coincide con la entrada original
+            seg = self.original[l:stop]
+        if extra:
+            return f"{str(seg)[:-1]}, ... (+{extra})]"
+        return str(seg)
+
+    # ------------ checkpoints ------------
+    def snapshot(self):
+        return (list(self.arr), bytes(self.phase), bytes(self.compared),
+                array('q', self.leaf_node), list(self.stack), list(self.stack_l),
+                self.writing, self.write_pos, self.comparisons)
+
+    def restore(self, cp):
+        (arr, phase, compared, leaf_node, stack, stack_l,
+         self.writing, self.write_pos, self.comparisons) = cp
+        self.arr = list(arr)
+        self.phase = bytearray(phase)
+        self.compared = bytearray(compared)
+        self.leaf_node = array('q', leaf_node)
+        self.stack = list(stack)
+        self.stack_l = list(stack_l)
+        self.dirty.clear()
+
+
+# ---------------- Línea de tiempo grabada ----------------
+# checkpoints como máximo de una línea de tiempo leída de una traza: con
+# trazas enormes la memoria queda en O(n) en vez de crecer con los eventos
+MAX_TRACE_CHECKPOINTS = 64
+
+
+def count_stats(events, count):
+    """SortStats de los primeros `count` eventos codificados de `events`."""
+    stats = SortStats()
+    step = CHUNK_EVENTS * STRIDE
+    for i in range(0, count * STRIDE, step):
+        stats.feed(events[i:i + step])
+    return stats
+
+
+class MergeTimeline:
+    """Graba el flujo de eventos a medida que se lo pide y guarda un
+       checkpoint del estado cada `interval` eventos. seek(state, k) restaura
+       el checkpoint anterior a k y reaplica como mucho `interval` eventos.
+
+       La grabación es incremental: record() avanza el generador de a bloques
+       (hasta un evento o un deadline) y la reproducción usa el prefijo ya
+       grabado, así que no hay que ordenar todo antes del primer frame.
+       len() es lo grabado hasta ahora; `done` indica que el sort terminó y
+       recién ahí están `sorted` y `comparisons`.
+
+       El intervalo nunca es menor que n: cada checkpoint copia O(n) datos y
+       así la memoria de checkpoints queda en O(n log n), como la del registro.
+       Los eventos se guardan con 4 bytes por entero cuando los valores caben.
+
+       Al grabar se mide por bloque cuánto tardó el generador (gen_chunk_ns y
+       gen_chunk_events) y en total aplicar y tomar checkpoints (record_ns).
+    """
+
+    def __init__(self, original, checkpoint_interval=1024, chunk_events=CHUNK_EVENTS):
+        self.original = list(original)
+        self.interval = max(1, checkpoint_interval, len(self.original))
+        typecode = event_typecode(self.original)
+        self.events = array(typecode)
+        self.checkpoint_at = [0]
+        self.checkpoints = []
+        self._state = MergeTreeState(self.original)
+        self.checkpoints.append(self._state.snapshot())
+        self._gen, self._arr = make_encoded_events(self.original, chunk_events, typecode)
+        self.count = 0
+        self.done = False
+        self.sorted = None
+        self.comparisons = None
+        self._stats = SortStats()
+        self.gen_chunk_ns = array('q')
+        self.gen_chunk_events = array('q')
+        self.record_ns = {"generator": 0, "apply": 0, "checkpoint": 0}
+
+    def record(self, until=None, deadline=None):
+        """Graba bloques hasta tener `until` eventos, pasar `deadline` (en
+           time.perf_counter) o terminar el sort; al menos un bloque si
+           queda algo. Devuelve cuántos eventos hay grabados."""
+        if self.done:
+            return self.count
+        state = self._state
+        apply = state.apply
+        interval = self.interval
+        events = self.events
+        perf = time.perf_counter_ns
+        count = self.count
+        apply_ns = checkpoint_ns = 0
+        t = perf()
+        for buf in self._gen:
+            t_gen = perf()
+            self.gen_chunk_ns.append(t_gen - t)
+            self.gen_chunk_events.append(len(buf) // STRIDE)
+            events.extend(buf)
+            self._stats.feed(buf)
+            for k in range(0, len(buf), STRIDE):
+                apply(buf[k], buf[k+1], buf[k+2], buf[k+3], buf[k+4])
+                count += 1
+                if count % interval == 0:
+                    t_cp = perf()
+                    state.dirty.clear()
+                    self.checkpoint_at.append(count)
+                    self.checkpoints.append(state.snapshot())
+                    checkpoint_ns += perf() - t_cp
+            t = perf()
+            apply_ns += t - t_gen
+            if until is not None and count >= until:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        else:
+            # el generador se agotó: el sort terminó
+            self.done = True
+            self.sorted = self._arr
+            self.comparisons = state.comparisons
+            self._gen = self._state = self._arr = None
+        self.count = count
+        self.record_ns["generator"] = sum(self.gen_chunk_ns)
+        self.record_ns["apply"] += apply_ns - checkpoint_ns
+        self.record_ns["checkpoint"] += checkpoint_ns
+        return count
+
+    def record_all(self):
+        """Graba lo que falte de la corrida."""
+        while not self.done:
+            self.record()
+        return self.count
+
+    @classmethod
+    def from_trace(cls, trace, checkpoint_interval=1024):
+        """Línea de tiempo sobre una traza abierta (merge_trace.TraceFile): los
+           eventos se leen del archivo mapeado y no se vuelve a ordenar. Los
+           checkpoints se toman a demanda en seek hacia adelante, como mucho
+           MAX_TRACE_CHECKPOINTS."""
+        self = cls.__new__(cls)
+        self.trace = trace          # mantiene vivo el mmap
+        self.original = list(trace.original)
+        self.sorted = list(trace.sorted)
+        self.count = trace.count
+        self.comparisons = trace.comparisons
+        self.interval = max(1, checkpoint_interval, len(self.original),
+                            -(-trace.count // MAX_TRACE_CHECKPOINTS))
+        self.events = trace.events
+        self.checkpoint_at = [0]
+        self.checkpoints = [MergeTreeState(self.original).snapshot()]
+        self.gen_chunk_ns = array('q')
+        self.gen_chunk_events = array('q')
+        self.record_ns = {}
+        self.done = True
+        # las trazas de la versión 1 no traen los costos: se cuentan en stats()
+        self._stats = SortStats.from_dict(trace.costs) if trace.costs else None
+        return self
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def has_stats(self):
+        """True si stats() no tiene que recorrer los eventos."""
+        return self._stats is not None
+
+    def stats(self):
+        """Costos de lo grabado (instrumented.SortStats): lecturas, escrituras,
+           pico de memoria auxiliar y profundidad. Al grabar se cuentan bloque
+           a bloque y una traza los trae en la cabecera; solo en trazas viejas
+           se cuentan una vez recorriendo sus eventos (ver count_stats)."""
+        if self._stats is None:
+            self._stats = count_stats(self.events, self.count)
+        return self._stats
+
+    def set_stats(self, stats):
+        """Costos contados aparte (p. ej. en otro hilo con count_stats)."""
+        self._stats = stats
+
+    def event(self, k):
+        base = k * STRIDE
+        return tuple(self.events[base:base + STRIDE])
+
+    def apply_range(self, state, start, stop):
+        """Aplica los eventos [start, stop) sobre state."""
+        ev = self.events
+        apply = state.apply
+        for base in range(start * STRIDE, stop * STRIDE, STRIDE):
+            apply(ev[base], ev[base+1], ev[base+2], ev[base+3], ev[base+4])
+
+    def seek(self, state, k):
+        """Deja state tal como queda tras aplicar los primeros k eventos."""
+        k = max(0, min(k, self.count))
+        i = bisect_right(self.checkpoint_at, k) - 1
+        state.restore(self.checkpoints[i])
+        start = self.checkpoint_at[i]
+        if i == len(self.checkpoints) - 1:
+            # más allá del último checkpoint (solo pasa con from_trace): se
+            # toman en el camino los que faltan
+            while start + self.interval <= k:
+                self.apply_range(state, start, start + self.interval)
+                start += self.interval
+                state.dirty.clear()
+                self.checkpoint_at.append(start)
+                self.checkpoints.append(state.snapshot())
+        self.apply_range(state, start, k)
+        return k
@@ -0,0 +1,164 @@
+# merge_trace.py
+# Trazas binarias de merge sort: el flujo de eventos codificados (ver
+# merge_events.OP_*) se graba una vez en un archivo de ancho fijo y se
+# reproduce después mapeado en memoria, sin volver a ordenar. Sirven para
+# compartir corridas entre máquinas. Sin dependencias de Qt.
+#
+# Formato (little-endian):
+#   cabecera  MAGIC, versión, ancho (4 u 8 bytes), n, eventos, comparaciones
+#   costos    lecturas, escrituras, pico aux, profundidad (desde la versión 2)
+#   original  n enteros del ancho indicado
+#   ordenado  n enteros
+#   eventos   eventos * STRIDE enteros, en el orden de merge_sort_gen
+# El ancho es 4 si n y todos los valores caben en int32; si no, 8.
+import mmap
+import struct
+import sys
+from array import array
+
+from instrumented import SortStats
+from merge_events import CHUNK_EVENTS, STRIDE, event_typecode, make_encoded_events
+
+MAGIC = b"MSTRACE\0"
+VERSION = 2
+HEADER = struct.Struct("<8sHHqqq")
+# totales de instrumented.SortStats: al abrir la traza no se recorren los
+# eventos para mostrar los costos. Las trazas de la versión 1 no los tienen.
+COSTS = struct.Struct("<qqqq")
+COST_FIELDS = ("reads", "writes", "aux_peak", "max_depth")
+TYPECODES = {4: 'i', 8: 'q'}
+WIDTHS = {code: width for width, code in TYPECODES.items()}
+
+def _width_for(original):
+    return WIDTHS[event_typecode(original)]
+
+
+def _to_bytes(values, typecode):
+    buf = array(typecode, values)
+    if sys.byteorder != "little":
+        buf.byteswap()
+    return buf.tobytes()
+
+
+def write_trace(path, original, chunks, sorted_values, stats=None):
+    """Escribe una traza a partir de bloques de eventos codificados (como los
+       de make_encoded_events), sin juntarlos en memoria. `sorted_values` se
+       lee al final: puede ser la lista que el generador ordena en el sitio.
+       `stats` (SortStats) son los costos de la corrida; si no se pasan se
+       cuentan en los bloques. Devuelve la cantidad de eventos."""
+    original = list(original)
+    n = len(original)
+    width = _width_for(original)
+    typecode = TYPECODES[width]
+    count = 0
+    feed = None
+    if stats is None:
+        stats = SortStats()
+        feed = stats.feed
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, width, n, 0, 0))
+        f.write(COSTS.pack(0, 0, 0, 0))
+        f.write(_to_bytes(original, typecode))
+        sorted_at = f.tell()
+        f.write(bytes(n * width))   # se completa al terminar
+        for buf in chunks:
+            count += len(buf) // STRIDE
+            if feed:
+                feed(buf)
+            f.write(_to_bytes(buf, typecode))
+        f.seek(sorted_at)
+        f.write(_to_bytes(sorted_values, typecode))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, width, n, count, stats.comparisons))
+        f.write(COSTS.pack(*(getattr(stats, name) for name in COST_FIELDS)))
+    return count
+
+
+def record_trace(path, original):
+    """Ordena `original` una vez y graba su traza con memoria acotada."""
+    gen, arr = make_encoded_events(list(original))
+    return write_trace(path, original, gen, arr)
+
+
+def save_timeline(path, timeline):
+    """Graba una MergeTimeline (terminando antes de grabar lo que falte, sin
+       volver a ordenar lo ya grabado), por bloques de CHUNK_EVENTS eventos."""
+    timeline.record_all()
+    events = timeline.events
+    step = CHUNK_EVENTS * STRIDE
+    chunks = (events[i:i + step] for i in range(0, len(timeline) * STRIDE, step))
+    return write_trace(path, timeline.original, chunks, timeline.sorted,
+                       timeline.stats())
+
+
+class TraceFile:
+    """Traza abierta con mmap: `events` es una vista de solo lectura sobre el
+       archivo que se indexa igual que el array('q') de MergeTimeline, así
+       que la memoria residente no crece con la cantidad de eventos (las
+       páginas las maneja el sistema y se pueden desalojar)."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except Exception:
+            self._mm.close()
+            raise
+
+    def _parse(self):
+        mm = self._mm
+        if len(mm) < HEADER.size:
+            raise ValueError(f"{self.path}: archivo demasiado corto para ser una traza")
+        magic, version, width, n, count, comparisons = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path}: no es una traza de merge sort")
+        if version not in (1, VERSION):
+            raise ValueError(f"{self.path}: versión de traza no soportada ({version})")
+        if width not in TYPECODES:
+            raise ValueError(f"{self.path}: ancho de entero inválido ({width})")
+        start = HEADER.size + (COSTS.size if version >= 2 else 0)
+        expected = start + (2 * n + count * STRIDE) * width
+        if len(mm) != expected:
+            raise ValueError(f"{self.path}: tamaño {len(mm)} != {expected} (traza truncada)")
+        self.version = version
+        self.width = width
+        self.n = n
+        self.count = count
+        self.comparisons = comparisons
+        # costos guardados (forma de SortStats.to_dict()); None en la versión 1
+        self.costs = None
+        if version >= 2:
+            self.costs = dict(zip(COST_FIELDS, COSTS.unpack_from(mm, HEADER.size)),
+                              events=count, comparisons=comparisons)
+        typecode = TYPECODES[width]
+        self.original = self._read(start, n, typecode)
+        self.sorted = self._read(start + n * width, n, typecode)
+        ev_start = start + 2 * n * width
+        # vistas a liberar antes de cerrar el mmap
+        self._views = [memoryview(mm)]
+        self._views.append(self._views[0][ev_start:ev_start + count * STRIDE * width])
+        if sys.byteorder == "little":
+            self.events = self._views[-1].cast(typecode)
+            self._views.append(self.events)
+        else:
+            # sin mmap directo: se copia y se invierte el orden de bytes
+            self.events = array(typecode)
+            self.events.frombytes(self._views[-1])
+            self.events.byteswap()
+
+    def _read(self, offset, count, typecode):
+        values = array(typecode, self._mm[offset:offset + count * WIDTHS[typecode]])
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values.tolist()
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._mm.close()
+
@@ -0,0 +1,248 @@
+# monitor.py
+# Monitor de recursos de bajo costo para las visualizaciones: ventana de
+# muestras CPU/RSS en un ring buffer preasignado y resumen de cada corrida
+# (percentiles de CPU, pico de RSS, eventos/s, tiempo de pared y costo del
+# propio monitor), más contadores e histogramas de la reproducción (costo
+# del generador y de cada tipo de evento, eventos por tick, tiempo de frame).
+# Sin dependencias de Qt.
+from array import array
+
+from merge_events import EVENT_NAMES
+
+
+def percentile(values, q):
+    """Percentil q (0-100) con interpolación lineal, como numpy.percentile.
+       None si no hay valores."""
+    s = sorted(values)
+    if not s:
+        return None
+    pos = (len(s) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (pos - lo)
+
+
+class SampleRing:
+    """Últimas `capacity` muestras (cpu %, rss MB). Cada muestra se escribe
+       dos veces (en i e i + capacity), así la ventana es siempre una vista
+       contigua del arreglo: agregar es O(1) y graficar no copia ni rota."""
+
+    def __init__(self, capacity):
+        # numpy ya está cargado por pyqtgraph cuando se crea la gráfica
+        import numpy as np
+        self.capacity = capacity
+        self._data = np.zeros((2, 2 * capacity))   # filas: cpu, rss
+        self._next = 0
+        self.count = 0
+
+    def append(self, cpu, rss):
+        i, j = self._next, self._next + self.capacity
+        self._data[0, i] = self._data[0, j] = cpu
+        self._data[1, i] = self._data[1, j] = rss
+        self._next = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def window(self):
+        """(cpu, rss) de la ventana, de la muestra más vieja a la más nueva."""
+        start = self._next + self.capacity - self.count
+        end = self._next + self.capacity
+        return self._data[0, start:end], self._data[1, start:end]
+
+    def clear(self):
+        self._next = 0
+        self.count = 0
+
+
+class RunStats:
+    """Acumula una corrida: todas las muestras de CPU (para los percentiles),
+       el pico de RSS, el tiempo activo (sin pausas), los eventos aplicados y
+       cuánto tardó el monitor en muestrear y actualizar las curvas."""
+
+    def __init__(self):
+        self.cpu = array('d')
+        self.rss_peak_mb = None
+        self.wall_s = 0.0
+        self.events = 0
+        self.monitor_s = 0.0
+
+    def add_sample(self, cpu, rss_mb):
+        self.cpu.append(cpu)
+        if self.rss_peak_mb is None or rss_mb > self.rss_peak_mb:
+            self.rss_peak_mb = rss_mb
+
+    def summary(self):
+        wall = self.wall_s
+        return {
+            "cpu_p50": percentile(self.cpu, 50),
+            "cpu_p95": percentile(self.cpu, 95),
+            "rss_peak_mb": self.rss_peak_mb,
+            "samples": len(self.cpu),
+            "events": self.events,
+            "events_per_s": self.events / wall if wall > 0 else None,
+            "wall_s": wall,
+            "monitor_ms": self.monitor_s * 1000,
+            "monitor_pct": 100 * self.monitor_s / wall if wall > 0 else None,
+        }
+
+
+def _fmt(value, spec, unit=""):
+    return "n/d" if value is None else f"{value:{spec}}{unit}"
+
+
+def format_summary(s):
+    """Resumen de una corrida en una línea legible."""
+    return (f"CPU p50 {_fmt(s['cpu_p50'], '.0f', ' %')}, "
+            f"p95 {_fmt(s['cpu_p95'], '.0f', ' %')} · "
+            f"pico RSS {_fmt(s['rss_peak_mb'], '.1f', ' MB')} · "
+            f"{s['events']} eventos en {s['wall_s']:.2f} s "
+            f"({_fmt(s['events_per_s'], ',.0f', ' ev/s')}) · "
+            f"monitor {s['monitor_ms']:.1f} ms "
+            f"({_fmt(s['monitor_pct'], '.2f', ' %')} del tiempo)")
+
+
+# ---------------- Instrumentación de la reproducción ----------------
+HIST_SUB_BITS = 2   # cubetas por potencia de 2: 2^HIST_SUB_BITS
+
+
+def _bucket_bounds(i):
+    """[lo, hi] de los valores que caen en la cubeta i de Histogram."""
+    sub = 1 << HIST_SUB_BITS
+    if i < sub:
+        return i, i
+    bits = i // sub + HIST_SUB_BITS
+    lo = (sub + i % sub) << (bits - 1 - HIST_SUB_BITS)
+    return lo, lo + (1 << (bits - 1 - HIST_SUB_BITS)) - 1
+
+
+class Histogram:
+    """Histograma logarítmico de enteros >= 0: cada potencia de 2 se parte en
+       2^HIST_SUB_BITS cubetas iguales (los valores chicos quedan exactos).
+       Registrar es O(1) y ocupa 256 contadores sin importar cuántas muestras
+       haya; los cuantiles salen con un error relativo de ~12 %."""
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = array('q', [0]) * ((64 - HIST_SUB_BITS + 1) << HIST_SUB_BITS)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        value = int(value)
+        if value < 0:
+            value = 0
+        bits = value.bit_length()
+        if bits <= HIST_SUB_BITS:
+            i = value
+        else:
+            # bit líder + HIST_SUB_BITS bits siguientes
+            top = value >> (bits - 1 - HIST_SUB_BITS)
+            i = ((bits - HIST_SUB_BITS) << HIST_SUB_BITS) + top - (1 << HIST_SUB_BITS)
+        self.counts[i] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Valor aproximado del cuantil q (0-1): centro de la cubeta que lo
+           contiene, acotado por el mínimo y el máximo vistos."""
+        if not self.count:
+            return None
+        target = q * self.count
+        acc = 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if c and acc >= target:
+                lo, hi = _bucket_bounds(i)
+                return min(self.max, max(self.min, (lo + hi) / 2))
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            # límite inferior de cada cubeta no vacía -> cantidad
+            "buckets": {str(_bucket_bounds(i)[0]): c
+                        for i, c in enumerate(self.counts) if c},
+        }
+
+
+class PlaybackMetrics:
+    """Contadores de una reproducción del árbol de merge sort:
+       - generator_ns_per_event: costo del generador por evento (un valor por
+         bloque grabado) y record_ns: totales de grabación;
+       - handler_ns[tipo]: costo de aplicar un evento de ese tipo (muestreado:
+         uno por lote en la reproducción, todos en el paso a paso);
+       - events_per_tick, tick_work_us (aplicar + pintar), paint_us (avisar a
+         la vista) y frame_interval_us (entre ticks: incluye el repintado de
+         Qt y todo lo que corra en el event loop)."""
+
+    def __init__(self):
+        self.generator_ns_per_event = Histogram()
+        self.record_ns = {}
+        self._record_chunks = 0
+        self.handler_ns = [Histogram() for _ in EVENT_NAMES]
+        self.events_per_tick = Histogram()
+        self.tick_work_us = Histogram()
+        self.paint_us = Histogram()
+        self.frame_interval_us = Histogram()
+        self.events = 0
+        self.ticks = 0
+
+    def add_record(self, timeline):
+        """Toma las mediciones de grabación de una MergeTimeline. Se llama a
+           medida que graba: solo suma los bloques nuevos desde la anterior."""
+        ns, counts = timeline.gen_chunk_ns, timeline.gen_chunk_events
+        for i in range(self._record_chunks, len(ns)):
+            if counts[i]:
+                self.generator_ns_per_event.add(ns[i] // counts[i])
+        self._record_chunks = len(ns)
+        self.record_ns = dict(timeline.record_ns)
+
+    def to_dict(self):
+        return {
+            "events": self.events,
+            "ticks": self.ticks,
+            "record_ns": self.record_ns,
+            "generator_ns_per_event": self.generator_ns_per_event.to_dict(),
+            "handler_ns": {name: h.to_dict() for name, h in zip(EVENT_NAMES, self.handler_ns)},
+            "events_per_tick": self.events_per_tick.to_dict(),
+            "tick_work_us": self.tick_work_us.to_dict(),
+            "paint_us": self.paint_us.to_dict(),
+            "frame_interval_us": self.frame_interval_us.to_dict(),
+        }
+
+    def hud_text(self):
+        """Resumen de pocas líneas para el HUD (medianas y p95)."""
+        gen = self.generator_ns_per_event
+        rec_ms = sum(self.record_ns.values()) / 1e6
+        handlers = " ".join(f"{name} {_fmt(h.quantile(0.5), '.0f')}"
+                            for name, h in zip(EVENT_NAMES, self.handler_ns))
+        ept, work = self.events_per_tick, self.tick_work_us
+        paint, frame = self.paint_us, self.frame_interval_us
+        return "\n".join((
+            f"generador {_fmt(gen.quantile(0.5), '.0f', ' ns/ev')} · grabación {rec_ms:.0f} ms",
+            f"handler p50 (ns): {handlers}",
+            f"eventos/tick p50 {_fmt(ept.quantile(0.5), '.0f')} · "
+            f"trabajo p95 {_fmt_us(work.quantile(0.95))} · pintado p95 {_fmt_us(paint.quantile(0.95))}",
+            f"frame p50 {_fmt_us(frame.quantile(0.5))} · p95 {_fmt_us(frame.quantile(0.95))} · "
+            f"{self.ticks} ticks, {self.events} eventos",
+        ))
+
+
+def _fmt_us(value):
+    return "n/d" if value is None else f"{value / 1000:.1f} ms"
@@ -1,78 +1,352 @@
+import math
+import random
 import tkinter as tk
+from bisect import bisect_left, bisect_right
 from tkinter import messagebox
+from array import array
+
+# ---------------- Motor de pasos perezoso y reversible ----------------
+# Los pasos se generan a demanda con una pila explícita (no hay recursión ni
+# copias por paso). Todo el estado es un arreglo `order` de índices de la
+# entrada que se particiona en el sitio de forma estable: cada nodo ocupa un
+# rango [lo, hi) de `order` cuyo *conjunto* no cambia después de crearlo, y al
+# crearlo ese tramo está en orden de entrada. Así:
+#   - la lista con la que se llamó al nodo = tramo ordenado por índice;
+#   - cuando el nodo termina, el tramo ya es su resultado ordenado.
+# El registro de pasos (tipo y nodo de cada uno, en arreglos tipados) es a la
+# vez el log para deshacer: cada paso afecta a un solo nodo y su estado
+# (terminado o no) se deduce del índice, así que retroceder es O(1).
+TIPOS = ("inicio", "base", "particion", "resultado")
+T_INICIO, T_BASE, T_PARTICION, T_RESULTADO = range(4)
+
+# elementos que se muestran dentro de cada nodo del árbol
+NODE_TEXT_ITEMS = 8
+
+# pasos que se generan por delante del que se está mostrando
+LOOKAHEAD = 64
+
+# "clasica": menores < pivote <= mayores (el pivote sale solo);
+# "3vias": menores < iguales == pivote < mayores (bandera holandesa), la banda
+# de iguales sale entera y con todos los valores repetidos no hay recursión
+PARTICIONES = ("clasica", "3vias")
+PIVOTES = ("ultimo", "medio", "mediana3", "aleatorio")
+
+
+class QsNode:
+    __slots__ = ("id", "parent", "nivel", "lo", "hi", "piv", "eq_hi",
+                 "menor", "mayor", "fin", "head")
+
+    def __init__(self, node_id, parent, nivel, lo, hi):
+        self.id = node_id
+        self.parent = parent      # id del padre o None
+        self.nivel = nivel
+        self.lo = lo              # rango de posiciones finales [lo, hi)
+        self.hi = hi
+        self.piv = -1             # posición final del pivote (-1 en caso base)
+        self.eq_hi = -1           # fin de la banda de iguales [piv, eq_hi)
+        self.menor = None         # ids de los hijos
+        self.mayor = None
+        self.fin = -1             # paso 'base' o 'resultado' (-1: aún no)
+        self.head = ()            # primeros índices de entrada (texto del árbol)
+
+
+class QuicksortSteps:
+    """Secuencia perezosa de pasos de quicksort, en el mismo orden que la
+       versión recursiva (por defecto pivote = último, menores <, mayores >=).
+       [k] genera lo necesario y devuelve el dict del paso armado en el
+       momento; len() cuenta los pasos ya generados y `done` indica si no hay
+       más. La regla "aleatorio" usa un Random propio con `seed`: como cada
+       paso se genera una sola vez, retroceder y volver da lo mismo."""
+
+    def __init__(self, lista, particion="clasica", pivote="ultimo", seed=0):
+        if particion not in PARTICIONES:
+            raise ValueError(f"Partición desconocida: {particion}")
+        if pivote not in PIVOTES:
+            raise ValueError(f"Regla de pivote desconocida: {pivote}")
+        self.particion = particion
+        self.pivote = pivote
+        self._rng = random.Random(seed)
+        self.values = list(lista)
+        n = len(self.values)
+        self.order = array('l', range(n))
+        self.nodes = []                 # QsNode; id = índice + 1
+        self.step_tipo = array('B')
+        self.step_node = array('l')     # id del nodo de cada paso
+        # llamadas pendientes: (lo, hi, nivel, parent_id); con hi == -1 es el
+        # cierre (paso 'resultado') del nodo con id lo
+        self._stack = [(0, n, 0, None)]
+        self.done = False
+
+    def __len__(self):
+        return len(self.step_tipo)
+
+    def ensure(self, k):
+        """Genera pasos hasta tener el k (o hasta que no haya más)."""
+        while len(self.step_tipo) <= k and self._stack:
+            self._advance()
+        self.done = not self._stack
+
+    def run_all(self):
+        while self._stack:
+            self._advance()
+        self.done = True
+
+    def _advance(self):
+        """Una llamada de la pila: 'inicio' + 'base', o 'inicio' +
+           'particion' (O(tamaño) por la partición), o un 'resultado'."""
+        values, order, nodes = self.values, self.order, self.nodes
+        step_tipo, step_node = self.step_tipo, self.step_node
+        lo, hi, nivel, parent_id = self._stack.pop()
+        if hi == -1:
+            node = nodes[lo - 1]
+            node.fin = len(step_tipo)
+            step_tipo.append(T_RESULTADO); step_node.append(node.id)
+            return
 
-def build_steps_and_tree(lista):
-    steps = []
-    nodes = [] 
-    node_counter = 0
-
-    def new_node_id():
-        nonlocal node_counter
-        node_counter += 1
-        return node_counter
-
-    def qs(lst, nivel, parent_id=None):
-        node_id = new_node_id()
-
-        nodes.append({
-            "id": node_id,
-            "parent": parent_id,
-            "nivel": nivel,
-            "lista": lst[:]
-        })
-
-        steps.append({
-            "tipo": "inicio",
-            "nivel": nivel,
-            "lista": lst[:],
-            "node_id": node_id
-        })
-
-        if len(lst) <= 1:
-            steps.append({
-                "tipo": "base",
-                "nivel": nivel,
-                "lista": lst[:],
-                "node_id": node_id
-            })
-            return lst
-
-        pivote = lst[-1]  
-        menores = []
-        mayores = []
-
-        for e in lst[:-1]:
-            if e < pivote:
-                menores.append(e)
+        node = QsNode(len(nodes) + 1, parent_id, nivel, lo, hi)
+        nodes.append(node)
+        node.head = tuple(order[lo:min(hi, lo + NODE_TEXT_ITEMS)])
+        if parent_id is not None:
+            parent = nodes[parent_id - 1]
+            if parent.menor is None:
+                parent.menor = node.id
             else:
-                mayores.append(e)
-
-        steps.append({
-            "tipo": "particion",
-            "nivel": nivel,
-            "lista": lst[:],
-            "pivote": pivote,
-            "menores": menores[:],
-            "mayores": mayores[:],
-            "node_id": node_id
-        })
+                parent.mayor = node.id
+        step_tipo.append(T_INICIO); step_node.append(node.id)
 
-        menores_ord = qs(menores, nivel + 1, parent_id=node_id)
-        mayores_ord = qs(mayores, nivel + 1, parent_id=node_id)
-
-        res = menores_ord + [pivote] + mayores_ord
-
-        steps.append({
-            "tipo": "resultado",
-            "nivel": nivel,
-            "lista": res[:],
-            "node_id": node_id
-        })
+        if hi - lo <= 1:
+            node.fin = len(step_tipo)
+            step_tipo.append(T_BASE); step_node.append(node.id)
+            return
 
-        return res
+        # el tramo está en orden de entrada, así que separar en listas que
+        # conservan ese orden mantiene el invariante para los hijos
+        k = self._pick_pivot(lo, hi)
+        piv = order[k]
+        pivote = values[piv]
+        menores = []
+        mayores = []
+        if self.particion == "3vias":
+            iguales = []
+            for i in order[lo:hi]:
+                v = values[i]
+                if v < pivote:
+                    menores.append(i)
+                elif pivote < v:
+                    mayores.append(i)
+                else:
+                    iguales.append(i)
+        else:
+            iguales = [piv]
+            for i in order[lo:k] + order[k + 1:hi]:
+                if values[i] < pivote:
+                    menores.append(i)
+                else:
+                    mayores.append(i)
+        node.piv = lo + len(menores)
+        node.eq_hi = node.piv + len(iguales)
+        menores += iguales
+        menores += mayores
+        order[lo:hi] = array('l', menores)
+        step_tipo.append(T_PARTICION); step_node.append(node.id)
+
+        self._stack.append((node.id, -1, nivel, None))
+        self._stack.append((node.eq_hi, hi, nivel + 1, node.id))
+        self._stack.append((lo, node.piv, nivel + 1, node.id))
+
+    def _pick_pivot(self, lo, hi):
+        """Posición en order[lo:hi] del pivote según la regla elegida."""
+        if self.pivote == "ultimo":
+            return hi - 1
+        if self.pivote == "medio":
+            return lo + (hi - lo) // 2
+        if self.pivote == "aleatorio":
+            return self._rng.randrange(lo, hi)
+        # mediana de primero, medio y último
+        values, order = self.values, self.order
+        a, b, c = lo, lo + (hi - lo) // 2, hi - 1
+        va, vb, vc = values[order[a]], values[order[b]], values[order[c]]
+        if va < vb:
+            if vb < vc:
+                return b
+            return c if va < vc else a
+        if va < vc:
+            return a
+        return c if vb < vc else b
+
+    def __getitem__(self, k):
+        self.ensure(k)
+        tipo = self.step_tipo[k]
+        node = self.nodes[self.step_node[k] - 1]
+        paso = {"tipo": TIPOS[tipo], "nivel": node.nivel, "node_id": node.id}
+        if tipo == T_RESULTADO:
+            paso["lista"] = self.sorted_lista(node)
+        else:
+            paso["lista"] = self.node_lista(node)
+        if tipo == T_PARTICION:
+            paso["pivote"] = self.values[self.order[node.piv]]
+            paso["menores"] = self.range_lista(node.lo, node.piv)
+            paso["mayores"] = self.range_lista(node.eq_hi, node.hi)
+            if self.particion == "3vias":
+                paso["iguales"] = self.range_lista(node.piv, node.eq_hi)
+        return paso
+
+    def range_lista(self, lo, hi):
+        values = self.values
+        return [values[i] for i in sorted(self.order[lo:hi])]
+
+    def node_lista(self, node):
+        """Sublista con la que se llamó al nodo (orden de entrada)."""
+        return self.range_lista(node.lo, node.hi)
+
+    def sorted_lista(self, node):
+        """Sublista del nodo ya ordenada (válida cuando el nodo terminó)."""
+        values = self.values
+        return [values[i] for i in self.order[node.lo:node.hi]]
+
+    def node_text(self, node, index):
+        """Texto del nodo en el árbol al mostrar el paso `index`: la lista de
+           entrada o, si el nodo ya terminó, la ordenada; truncada a
+           NODE_TEXT_ITEMS elementos."""
+        values = self.values
+        if 0 <= node.fin <= index:
+            idxs = self.order[node.lo:min(node.hi, node.lo + NODE_TEXT_ITEMS)]
+        else:
+            idxs = node.head
+        texto = ",".join(str(values[i]) for i in idxs)
+        if node.hi - node.lo > NODE_TEXT_ITEMS:
+            texto += ",…"
+        return texto
+
+    def band_text(self, node):
+        """Texto de la banda de iguales de un nodo particionado en modo
+           "3vias" (valor y cantidad), o None si no corresponde."""
+        if self.particion != "3vias" or node.piv < 0:
+            return None
+        return f"={self.values[self.order[node.piv]]} ×{node.eq_hi - node.piv}"
+
+
+def build_steps_and_tree(lista, particion="clasica", pivote="ultimo", seed=0):
+    """Todos los pasos y nodos de una vez (para listas chicas o uso batch)."""
+    log = QuicksortSteps(lista, particion, pivote, seed)
+    log.run_all()
+    return log, log.nodes
+
+
+# ---------------- Layout del árbol (Reingold–Tilford) ----------------
+# Unidades de mundo (zoom 1 = píxeles): radio del nodo, separación mínima
+# entre centros vecinos de un mismo nivel y alto de cada nivel.
+NODE_R = 24
+MIN_SEP = 2 * NODE_R + 12
+LEVEL_H = 80
+MARGIN = 40
+
+# zoom permitido y nivel de detalle al dibujar
+ZOOM_MIN = 0.02
+ZOOM_MAX = 4.0
+ZOOM_STEP = 1.25
+CULL_MIN_PX = 10        # dos nodos a menos de esto en pantalla: se dibuja uno
+TEXT_MIN_PX = 5         # por debajo de este tamaño de fuente no hay texto
+BAND_H = 14             # alto de la banda de iguales bajo el nodo ("3vias")
+
+# hasta este tamaño de lista se generan todos los pasos de entrada y el árbol
+# usa tidy_layout; por encima los pasos se generan a demanda y los nodos se
+# ubican con rank_x, que no necesita conocer el resto del árbol
+TIDY_MAX_N = 2000
+RANK_W = 2 * MIN_SEP    # ancho por posición final en el layout por rango
+
+
+def tidy_layout(nodes):
+    """x relativa de cada nodo (lista indexada por id - 1) con un layout
+       ordenado tipo Reingold–Tilford: cada subárbol se dibuja igual donde
+       sea que aparezca, los hijos quedan simétricos bajo el padre y dos
+       subárboles vecinos se separan lo mínimo para que ningún nivel se
+       pise. O(n) en total.
+
+       Los nodos vienen en preorden (hijos con id mayor que el padre), así
+       que recorrerlos al revés es un postorden sin recursión. El contorno
+       izquierdo/derecho de cada subárbol es una lista de x por nivel, del
+       más profundo (índice 0) a la raíz (último), más un desplazamiento
+       común: trasladar un subárbol es O(1) y al unir dos se reutiliza la
+       lista del más profundo, así que cada unión cuesta O(min(alturas)).
+    """
+    count = len(nodes)
+    rel = [0.0] * count           # x relativa al padre
+    left = [None] * count         # [lista, desplazamiento] del contorno izquierdo
+    right = [None] * count
+    for node in reversed(nodes):
+        k = node.id - 1
+        hijos = [h for h in (node.menor, node.mayor) if h is not None]
+        if not hijos:
+            left[k] = [[0.0], 0.0]
+            right[k] = [[0.0], 0.0]
+            continue
+        if len(hijos) == 1:
+            c = hijos[0] - 1
+            lc, rc = left[c], right[c]
+            lc[0].append(-lc[1])
+            rc[0].append(-rc[1])
+            left[k], right[k] = lc, rc
+            left[c] = right[c] = None
+            continue
+
+        a, b = hijos[0] - 1, hijos[1] - 1
+        (la, la_d), (ra, ra_d) = left[a], right[a]
+        (lb, lb_d), (rb, rb_d) = left[b], right[b]
+        ha, hb = len(ra), len(lb)
+        h = min(ha, hb)
+        # separación: contorno derecho de A contra el izquierdo de B
+        sep = MIN_SEP
+        for d in range(1, h + 1):
+            gap = (ra[ha - d] + ra_d) - (lb[hb - d] + lb_d) + MIN_SEP
+            if gap > sep:
+                sep = gap
+        half = sep / 2
+        rel[a], rel[b] = -half, half
+
+        # contorno izquierdo: A en sus niveles, B debajo si es más profundo
+        if ha >= hb:
+            lst, desp = la, la_d - half
+        else:
+            lst, desp = lb, lb_d + half
+            for d in range(1, ha + 1):
+                lst[hb - d] = la[ha - d] + la_d - half - desp
+        lst.append(-desp)
+        left[k] = [lst, desp]
+
+        # contorno derecho: B en sus niveles, A debajo si es más profundo
+        if hb >= ha:
+            lst, desp = rb, rb_d + half
+        else:
+            lst, desp = ra, ra_d - half
+            for d in range(1, hb + 1):
+                lst[ha - d] = rb[hb - d] + rb_d + half - desp
+        lst.append(-desp)
+        right[k] = [lst, desp]
+        left[a] = right[a] = left[b] = right[b] = None
+
+    # x absolutas en preorden: el padre siempre se resuelve antes que el hijo
+    xs = [0.0] * count
+    for node in nodes:
+        if node.parent is not None:
+            xs[node.id - 1] = xs[node.parent - 1] + rel[node.id - 1]
+    return xs
+
+
+def rank_x(node):
+    """x de mundo de un nodo en el layout por rango: el centro de su banda de
+       pivote/iguales o la posición de su único elemento (los vacíos, medio
+       lugar a la izquierda).
+       Los rangos de un mismo nivel son disjuntos y el preorden los recorre de
+       izquierda a derecha, así que las x de cada nivel salen ya ordenadas."""
+    if node.piv >= 0:
+        c = (node.piv + node.eq_hi - 1) / 2
+    elif node.hi > node.lo:
+        c = node.lo
+    else:
+        c = node.lo - 0.5
+    return MARGIN + RANK_W * (c + 1)
 
-    qs(lista, 0, None)
-    return steps, nodes
 
 class QuicksortGUI:
     def __init__(self, root):
@@ -82,8 +356,24 @@ class QuicksortGUI:
         self.steps = []
         self.nodes = []
         self.node_positions = {}
+        self.registered = 0        # nodos de self.nodes ya ubicados en el layout
         self.index = 0
 
+        # árbol dibujado: items persistentes del canvas e índice por node_id
+        self.node_by_id = {}
+        self.node_items = {}       # node_id -> (óvalo, texto o None, items de la banda)
+        self.edge_items = {}       # node_id -> id de la línea hacia su padre
+        self.current_node_id = None
+        self.drawn_index = None    # paso con el que se pintaron los textos
+
+        # vista del árbol: coordenadas de mundo * zoom = coordenadas del canvas
+        self.zoom = 1.0
+        self.drawn_zoom = None
+        self.levels = []           # por nivel: (xs ordenadas, ids) para recortar
+        self.world_width = 0
+        self.world_height = 0
+        self._cull_pending = False
+
         frame_input = tk.Frame(root, padx=10, pady=10)
         frame_input.pack(fill="x")
 
@@ -92,6 +382,15 @@ class QuicksortGUI:
         self.entry.insert(0, "8, 3, 1, 7, 0, 10, 2") 
         self.entry.pack(anchor="w", pady=5)
 
+        frame_modo = tk.Frame(frame_input)
+        frame_modo.pack(anchor="w", pady=(0, 5))
+        tk.Label(frame_modo, text="Partición:").pack(side="left")
+        self.var_particion = tk.StringVar(value=PARTICIONES[0])
+        tk.OptionMenu(frame_modo, self.var_particion, *PARTICIONES).pack(side="left", padx=(2, 10))
+        tk.Label(frame_modo, text="Pivote:").pack(side="left")
+        self.var_pivote = tk.StringVar(value=PIVOTES[0])
+        tk.OptionMenu(frame_modo, self.var_pivote, *PIVOTES).pack(side="left", padx=2)
+
         self.btn_generar = tk.Button(frame_input, text="Generar pasos", command=self.generar_pasos)
         self.btn_generar.pack(anchor="w")
 
@@ -116,6 +415,9 @@ class QuicksortGUI:
         self.label_menores = tk.Label(frame_view, text="Menores: -")
         self.label_menores.pack(anchor="w")
 
+        self.label_iguales = tk.Label(frame_view, text="Iguales: -")
+        self.label_iguales.pack(anchor="w")
+
         self.label_mayores = tk.Label(frame_view, text="Mayores: -")
         self.label_mayores.pack(anchor="w")
 
@@ -127,8 +429,29 @@ class QuicksortGUI:
 
         tk.Label(frame_tree, text="Árbol de llamadas de Quicksort", font=("Arial", 11, "bold")).pack(anchor="n")
 
-        self.canvas = tk.Canvas(frame_tree, width=600, height=400, bg="white")
-        self.canvas.pack(fill="both", expand=True, pady=5)
+        frame_canvas = tk.Frame(frame_tree)
+        frame_canvas.pack(fill="both", expand=True, pady=5)
+        self.canvas = tk.Canvas(frame_canvas, width=600, height=400, bg="white")
+        self.scroll_x = tk.Scrollbar(frame_canvas, orient="horizontal", command=self.canvas.xview)
+        self.scroll_y = tk.Scrollbar(frame_canvas, orient="vertical", command=self.canvas.yview)
+        # cada cambio de vista (scroll, arrastre, resize) pasa por aquí
+        self.canvas.configure(xscrollcommand=self.on_xscroll, yscrollcommand=self.on_yscroll)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scroll_y.grid(row=0, column=1, sticky="ns")
+        self.scroll_x.grid(row=1, column=0, sticky="ew")
+        frame_canvas.rowconfigure(0, weight=1)
+        frame_canvas.columnconfigure(0, weight=1)
+
+        # arrastrar para desplazar, rueda para scroll y Ctrl+rueda para zoom
+        self.canvas.bind("<ButtonPress-1>", lambda e: self.canvas.scan_mark(e.x, e.y))
+        self.canvas.bind("<B1-Motion>", lambda e: self.canvas.scan_dragto(e.x, e.y, gain=1))
+        self.canvas.bind("<MouseWheel>", self.on_wheel)
+        self.canvas.bind("<Control-MouseWheel>", self.on_wheel_zoom)
+        self.canvas.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+        self.canvas.bind("<Control-Button-4>", lambda e: self.zoom_at(ZOOM_STEP, e.x, e.y))
+        self.canvas.bind("<Control-Button-5>", lambda e: self.zoom_at(1 / ZOOM_STEP, e.x, e.y))
+        self.canvas.bind("<Configure>", lambda e: self.schedule_cull())
 
         frame_nav = tk.Frame(root, padx=10, pady=10)
         frame_nav.pack()
@@ -142,6 +465,12 @@ class QuicksortGUI:
         self.btn_reiniciar = tk.Button(frame_nav, text="Reiniciar", command=self.reiniciar, state="disabled")
         self.btn_reiniciar.grid(row=0, column=2, padx=5)
 
+        self.btn_zoom_out = tk.Button(frame_nav, text="Zoom −", command=lambda: self.zoom_at(1 / ZOOM_STEP))
+        self.btn_zoom_out.grid(row=0, column=3, padx=5)
+
+        self.btn_zoom_in = tk.Button(frame_nav, text="Zoom +", command=lambda: self.zoom_at(ZOOM_STEP))
+        self.btn_zoom_in.grid(row=0, column=4, padx=5)
+
     def parse_lista(self):
         texto = self.entry.get().strip()
         if not texto:
@@ -167,11 +496,18 @@ class QuicksortGUI:
             messagebox.showerror("Error en la entrada", str(e))
             return
 
-        self.steps, self.nodes = build_steps_and_tree(lista)
+        # listas chicas: todo de una vez; grandes: solo el primer tramo, el
+        # resto se genera al avanzar (extend_steps)
+        self.steps = QuicksortSteps(lista, self.var_particion.get(), self.var_pivote.get())
+        if len(lista) <= TIDY_MAX_N:
+            self.steps.run_all()
+        else:
+            self.steps.ensure(LOOKAHEAD)
+        self.nodes = self.steps.nodes
         self.index = 0
 
         self.compute_tree_layout()
-        self.draw_tree(current_node_id=self.steps[0].get("node_id"))
+        self.draw_tree(current_node_id=self.steps.step_node[0])
 
         self.btn_anterior.config(state="disabled")
         self.btn_siguiente.config(state="normal")
@@ -184,8 +520,9 @@ class QuicksortGUI:
             return
         paso = self.steps[self.index]
         total = len(self.steps)
+        mas = "" if self.steps.done else "+"
 
-        self.label_paso.config(text=f"Paso {self.index + 1} de {total}")
+        self.label_paso.config(text=f"Paso {self.index + 1} de {total}{mas}")
 
         nivel = paso.get("nivel", 0)
         self.label_nivel.config(text=f"Nivel de recursión: {nivel}")
@@ -196,16 +533,25 @@ class QuicksortGUI:
             self.label_pivote.config(text=f"Pivote: {paso.get('pivote')}")
             self.label_menores.config(text=f"Menores: {paso.get('menores')}")
             self.label_mayores.config(text=f"Mayores: {paso.get('mayores')}")
+            self.label_iguales.config(text=f"Iguales: {paso.get('iguales', '-')}")
         else:
             self.label_pivote.config(text="Pivote: -")
             self.label_menores.config(text="Menores: -")
             self.label_mayores.config(text="Mayores: -")
+            self.label_iguales.config(text="Iguales: -")
 
         tipo = paso["tipo"]
         if tipo == "inicio":
             msg = "📦 Nueva llamada de Quicksort sobre esta sublista."
         elif tipo == "base":
             msg = "✅ Caso base: la sublista tiene 0 o 1 elemento, ya está ordenada."
+        elif tipo == "particion" and "iguales" in paso:
+            msg = ("✂ Se ha elegido el pivote y se ha dividido la lista en tres:\n"
+                   "   • 'Menores' contiene los valores más pequeños que el pivote.\n"
+                   "   • 'Iguales' contiene los valores iguales al pivote: ya están\n"
+                   "     en su lugar y no se vuelven a ordenar.\n"
+                   "   • 'Mayores' contiene los valores mayores que el pivote.\n"
+                   "   Después se ordenan 'Menores' y 'Mayores' por separado.")
         elif tipo == "particion":
             msg = ("✂ Se ha elegido el pivote y se ha dividido la lista en dos:\n"
                    "   • 'Menores' contiene los valores más pequeños que el pivote.\n"
@@ -218,23 +564,16 @@ class QuicksortGUI:
 
         self.label_mensaje.config(text=msg)
 
-        # 🔹 CAMBIO IMPORTANTE:
-        # si el paso es 'resultado' o 'base', actualizamos la lista del nodo
-        if tipo in ("resultado", "base"):  # ← CAMBIO
-            node_id = paso.get("node_id")
-            if node_id is not None:
-                for n in self.nodes:
-                    if n["id"] == node_id:
-                        n["lista"] = paso.get("lista", n["lista"])
-                        break
-
-        current_node_id = paso.get("node_id")
-        self.draw_tree(current_node_id=current_node_id)
+        # los nodos cuyo paso 'resultado'/'base' ya pasó se dibujan con su
+        # lista ordenada (QuicksortSteps.node_text lo decide según self.index)
+        self.update_tree(paso.get("node_id"))
 
         self.btn_anterior.config(state="normal" if self.index > 0 else "disabled")
-        self.btn_siguiente.config(state="normal" if self.index < total - 1 else "disabled")
+        hay_mas = self.index < total - 1 or not self.steps.done
+        self.btn_siguiente.config(state="normal" if hay_mas else "disabled")
 
     def siguiente_paso(self):
+        self.extend_steps()
         if self.index < len(self.steps) - 1:
             self.index += 1
             self.mostrar_paso()
@@ -250,63 +589,239 @@ class QuicksortGUI:
         self.index = 0
         self.mostrar_paso()
 
+    def extend_steps(self):
+        """Mantiene generados LOOKAHEAD pasos por delante del actual y ubica
+        los nodos nuevos. Retroceder nunca genera nada: el registro de pasos
+        ya tiene todo lo necesario."""
+        if self.steps.done:
+            return
+        self.steps.ensure(self.index + LOOKAHEAD)
+        if len(self.nodes) > self.registered:
+            self.register_nodes()
+            self.set_scrollregion()
+            self.schedule_cull()
+
     def compute_tree_layout(self):
+        """Posiciones de mundo y, por nivel, las x ordenadas (el preorden
+        recorre cada nivel de izquierda a derecha) para buscar con bisect qué
+        nodos caen en la vista. Con el árbol completo se usa tidy_layout; si
+        los pasos aún se están generando, rank_x nodo a nodo."""
         self.node_positions = {}
+        self.node_by_id = {}
+        self.levels = []
+        self.registered = 0
+        self.world_width = 0
+        self.world_height = 0
         if not self.nodes:
             return
+        if not self.steps.done:
+            self.world_width = RANK_W * (len(self.steps.values) + 1) + 2 * MARGIN
+            self.register_nodes()
+            return
 
-        niveles = {}
-        max_nivel = 0
-        for node in self.nodes:
-            nivel = node["nivel"]
-            max_nivel = max(max_nivel, nivel)
-            niveles.setdefault(nivel, []).append(node)
-
-        width = 600
-        level_height = 80
-
-        for nivel in sorted(niveles.keys()):
-            nodos_nivel = niveles[nivel]
-            count = len(nodos_nivel)
-            if count == 0:
-                continue
-            y = 40 + nivel * level_height
-            spacing = width // (count + 1)
-            for i, node in enumerate(nodos_nivel, start=1):
-                x = spacing * i
-                self.node_positions[node["id"]] = (x, y)
+        xs = tidy_layout(self.nodes)
+        x0 = min(xs)
+        self.register_nodes([x - x0 + MARGIN for x in xs])
+        self.world_width = max(xs) - x0 + 2 * MARGIN
+
+    def register_nodes(self, xs=None):
+        """Agrega al layout los nodos desde self.registered, con las x dadas
+        (indexadas por id - 1) o con rank_x."""
+        for node in self.nodes[self.registered:]:
+            x = rank_x(node) if xs is None else xs[node.id - 1]
+            y = MARGIN + node.nivel * LEVEL_H
+            self.node_by_id[node.id] = node
+            self.node_positions[node.id] = (x, y)
+            while len(self.levels) <= node.nivel:
+                self.levels.append(([], []))
+            lv_xs, lv_ids = self.levels[node.nivel]
+            lv_xs.append(x)
+            lv_ids.append(node.id)
+        self.registered = len(self.nodes)
+        self.world_height = (len(self.levels) - 1) * LEVEL_H + 2 * MARGIN
 
     def draw_tree(self, current_node_id=None):
+        """Reinicia la vista para un árbol nuevo: zoom 1 con la raíz centrada.
+        Solo se crean items para los nodos visibles (ver cull_tree)."""
         self.canvas.delete("all")
+        self.node_items = {}
+        self.edge_items = {}
+        self.current_node_id = current_node_id
+        self.drawn_index = self.index
+        self.drawn_zoom = None
+        self.zoom = 1.0
         if not self.nodes or not self.node_positions:
             return
-
-        for node in self.nodes:
-            node_id = node["id"]
-            parent_id = node["parent"]
-            if parent_id is None:
+        self.set_scrollregion()
+        rx, _ = self.node_positions[self.nodes[0].id]
+        view_w = max(1, self.canvas.winfo_width())
+        self.canvas.xview_moveto(max(0.0, (rx - view_w / 2) / self.world_width))
+        self.canvas.yview_moveto(0.0)
+        self.cull_tree()
+
+    def set_scrollregion(self):
+        self.canvas.configure(scrollregion=(0, 0, self.world_width * self.zoom,
+                                            self.world_height * self.zoom))
+
+    # ----- vista: scroll, zoom y recorte -----
+    def on_xscroll(self, first, last):
+        self.scroll_x.set(first, last)
+        self.schedule_cull()
+
+    def on_yscroll(self, first, last):
+        self.scroll_y.set(first, last)
+        self.schedule_cull()
+
+    def on_wheel(self, event):
+        self.canvas.yview_scroll(-1 if event.delta > 0 else 1, "units")
+
+    def on_wheel_zoom(self, event):
+        self.zoom_at(ZOOM_STEP if event.delta > 0 else 1 / ZOOM_STEP, event.x, event.y)
+
+    def zoom_at(self, factor, sx=None, sy=None):
+        """Cambia el zoom dejando fijo el punto de mundo bajo (sx, sy), o el
+        centro de la vista si no se indica."""
+        if not self.node_positions:
+            return
+        new_zoom = min(ZOOM_MAX, max(ZOOM_MIN, self.zoom * factor))
+        if new_zoom == self.zoom:
+            return
+        if sx is None:
+            sx, sy = self.canvas.winfo_width() / 2, self.canvas.winfo_height() / 2
+        wx = self.canvas.canvasx(sx) / self.zoom
+        wy = self.canvas.canvasy(sy) / self.zoom
+        self.zoom = new_zoom
+        self.set_scrollregion()
+        total_w = self.world_width * new_zoom
+        total_h = self.world_height * new_zoom
+        self.canvas.xview_moveto(max(0.0, (wx * new_zoom - sx) / total_w))
+        self.canvas.yview_moveto(max(0.0, (wy * new_zoom - sy) / total_h))
+        self.schedule_cull()
+
+    def schedule_cull(self):
+        # varios eventos de vista seguidos se resuelven en un solo recorte
+        if not self._cull_pending:
+            self._cull_pending = True
+            self.root.after_idle(self.cull_tree)
+
+    def visible_nodes(self):
+        """ids de los nodos dentro de la vista actual. Si varios nodos caen a
+        menos de CULL_MIN_PX en pantalla (zoom muy alejado) se toma uno:
+        el trabajo queda acotado por el área de la vista, no por el árbol."""
+        z = self.zoom
+        r = NODE_R
+        wx0 = self.canvas.canvasx(0) / z - r
+        wy0 = self.canvas.canvasy(0) / z - r
+        wx1 = self.canvas.canvasx(self.canvas.winfo_width()) / z + r
+        wy1 = self.canvas.canvasy(self.canvas.winfo_height()) / z + r
+
+        l0 = max(0, math.floor((wy0 - MARGIN) / LEVEL_H))
+        l1 = min(len(self.levels) - 1, math.ceil((wy1 - MARGIN) / LEVEL_H))
+        lstep = max(1, math.ceil(CULL_MIN_PX / (LEVEL_H * z)))
+        min_dx = CULL_MIN_PX / z
+        visibles = []
+        for nivel in range(l0 - l0 % lstep, l1 + 1, lstep):
+            if nivel < l0:
                 continue
-            if node_id not in self.node_positions or parent_id not in self.node_positions:
+            xs, ids = self.levels[nivel]
+            i = bisect_left(xs, wx0)
+            end = bisect_right(xs, wx1)
+            while i < end:
+                visibles.append(ids[i])
+                i = max(i + 1, bisect_left(xs, xs[i] + min_dx, i + 1, end))
+        return visibles
+
+    def cull_tree(self):
+        """Sincroniza los items del canvas con los nodos visibles: borra los
+        que salieron, crea los que entraron y, si cambió el zoom, rehace
+        todos (sus coordenadas dependen del zoom)."""
+        self._cull_pending = False
+        if not self.node_positions:
+            return
+        if self.drawn_zoom != self.zoom:
+            self.canvas.delete("all")
+            self.node_items = {}
+            self.edge_items = {}
+            self.drawn_zoom = self.zoom
+
+        visibles = set(self.visible_nodes())
+        for node_id in [n for n in self.node_items if n not in visibles]:
+            oval, text, band = self.node_items.pop(node_id)
+            self.canvas.delete(oval)
+            if text is not None:
+                self.canvas.delete(text)
+            for item in band:
+                self.canvas.delete(item)
+            edge = self.edge_items.pop(node_id, None)
+            if edge is not None:
+                self.canvas.delete(edge)
+        nuevos = [n for n in visibles if n not in self.node_items]
+        for node_id in nuevos:
+            self.create_node_items(node_id)
+        if nuevos:
+            # las aristas siempre debajo de los nodos
+            self.canvas.tag_lower("edge")
+
+    def create_node_items(self, node_id):
+        z = self.zoom
+        node = self.node_by_id[node_id]
+        x, y = self.node_positions[node_id]
+        x, y, r = x * z, y * z, NODE_R * z
+        # en "3vias" todo nodo con hijos lleva la banda de iguales debajo
+        band_h = BAND_H * z if self.steps.particion == "3vias" else 0
+        if node.parent is not None:
+            px, py = self.node_positions[node.parent]
+            self.edge_items[node_id] = self.canvas.create_line(
+                px * z, py * z + r + band_h, x, y - r, tags=("edge",))
+
+        fill, outline, width = self.node_style(node_id == self.current_node_id)
+        oval = self.canvas.create_oval(x - r, y - r, x + r, y + r,
+                                       fill=fill, outline=outline, width=width)
+        text = None
+        font_px = round(8 * z)
+        if font_px >= TEXT_MIN_PX:
+            texto = self.steps.node_text(node, self.drawn_index)
+            text = self.canvas.create_text(x, y, text=texto, font=("Consolas", font_px))
+        band = ()
+        band_texto = self.steps.band_text(node)
+        if band_texto is not None:
+            band = (self.canvas.create_rectangle(x - r, y + r, x + r, y + r + band_h,
+                                                 fill="khaki", outline="goldenrod"),)
+            if font_px >= TEXT_MIN_PX:
+                band += (self.canvas.create_text(x, y + r + band_h / 2, text=band_texto,
+                                                 font=("Consolas", font_px)),)
+        self.node_items[node_id] = (oval, text, band)
+
+    @staticmethod
+    def node_style(is_current):
+        if is_current:
+            return "lightblue", "blue", 2
+        return "white", "black", 1
+
+    def update_tree(self, current_node_id):
+        """Pasa el árbol dibujado al paso self.index tocando solo los nodos
+        que cambian: el actual anterior, el nuevo y, al avanzar o retroceder
+        un paso, el nodo de ese paso (su texto pasa a/desde la lista
+        ordenada). Un salto mayor (Reiniciar) repasa todos los textos.
+        Los nodos fuera de la vista no tienen items: se crean ya al día."""
+        changed = {self.current_node_id, current_node_id}
+        if self.drawn_index is not None and abs(self.index - self.drawn_index) == 1:
+            changed.add(self.steps.step_node[max(self.index, self.drawn_index)])
+        elif self.drawn_index != self.index:
+            changed.update(self.node_items)
+        self.current_node_id = current_node_id
+        self.drawn_index = self.index
+
+        for node_id in changed:
+            items = self.node_items.get(node_id)
+            if items is None:
                 continue
-            x, y = self.node_positions[node_id]
-            px, py = self.node_positions[parent_id]
-            self.canvas.create_line(px, py + 20, x, y - 20)
-
-        for node in self.nodes:
-            node_id = node["id"]
-            x, y = self.node_positions[node_id]
-            r = 24 
-            is_current = (node_id == current_node_id)
-
-            fill = "lightblue" if is_current else "white"
-            outline = "blue" if is_current else "black"
-            width = 2 if is_current else 1
-
-            self.canvas.create_oval(x - r, y - r, x + r, y + r,
-                                    fill=fill, outline=outline, width=width)
-
-            texto = ",".join(str(v) for v in node["lista"])
-            self.canvas.create_text(x, y, text=texto, font=("Consolas", 8))
+            oval, text, _ = items
+            fill, outline, width = self.node_style(node_id == current_node_id)
+            self.canvas.itemconfigure(oval, fill=fill, outline=outline, width=width)
+            if text is not None:
+                self.canvas.itemconfigure(
+                    text, text=self.steps.node_text(self.node_by_id[node_id], self.index))
 
 if __name__ == "__main__":
     root = tk.Tk()
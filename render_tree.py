@@ -0,0 +1,255 @@
+# render_tree.py
+# Render headless del árbol de merge sort: reproduce una corrida sobre la
+# misma vista que MergeTreeController (QTreeView + MergeTreeModel) en la
+# plataforma offscreen de Qt y escribe cuadros PNG o un GIF animado, sin
+# grabar la pantalla en tiempo real.
+#   python render_tree.py --n 64 --frames 300 --out cuadros/
+#   python render_tree.py --trace corrida.mstrace --gif corrida.gif --jobs 16
+#
+# Los cuadros se reparten en tramos contiguos entre procesos: el proceso
+# principal graba la corrida como traza (merge_trace) y avanza un estado una
+# sola vez para tomar un checkpoint al inicio de cada tramo; cada worker abre
+# la traza con mmap, restaura su checkpoint y solo aplica los eventos de su
+# tramo. El GIF necesita Pillow.
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+# antes de importar Qt: sin pantalla ni servidor gráfico
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtCore, QtWidgets
+
+from app import MergeTreeModel, EXPAND_ALL_MAX_N, visible_nodes
+from merge_timeline import MergeTimeline, MergeTreeState
+from merge_trace import TraceFile, record_trace
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+DEFAULT_SIZE = (800, 600)
+FRAME_NAME = "frame_{:06d}.png"
+# tramos por worker: tramos más cortos reparten mejor la carga
+CHUNKS_PER_JOB = 4
+
+
+def ui_stylesheet(ui_filename=None):
+    """Hoja de estilo de la ventana del .ui, para que los cuadros se vean igual."""
+    if ui_filename is None:
+        ui_filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tree.ui")
+    try:
+        root = ET.parse(ui_filename).getroot()
+    except (OSError, ET.ParseError):
+        return ""
+    node = root.find("widget/property[@name='styleSheet']/string")
+    if node is None:
+        return ""
+    return node.text or ""
+
+
+def frame_events(count, frames=None, every=None):
+    """Cursor (eventos aplicados) de cada cuadro: del 0 al final de la corrida,
+       cada `every` eventos o repartidos en `frames` cuadros."""
+    if every is None:
+        frames = max(2, frames or 2)
+        every = max(1, -(-count // (frames - 1)))
+    cursors = list(range(0, count, max(1, every)))
+    cursors.append(count)
+    return cursors
+
+
+def split_chunks(cursors, parts):
+    """Parte [(nro de cuadro, cursor)] en `parts` tramos contiguos."""
+    numbered = list(enumerate(cursors))
+    parts = max(1, min(parts, len(numbered)))
+    size, extra = divmod(len(numbered), parts)
+    chunks, start = [], 0
+    for i in range(parts):
+        stop = start + size + (1 if i < extra else 0)
+        chunks.append(numbered[start:stop])
+        start = stop
+    return chunks
+
+
+# ---------------- Vista fuera de pantalla ----------------
+class TreeFrameRenderer:
+    """Leyenda + QTreeView con el modelo virtual del árbol, en un widget que
+       nunca llega a una pantalla real; cada cuadro es un grab() del widget."""
+
+    def __init__(self, size=DEFAULT_SIZE, stylesheet=""):
+        self.widget = QtWidgets.QWidget()
+        self.widget.setStyleSheet(stylesheet)
+        self.widget.resize(*size)
+        layout = QtWidgets.QVBoxLayout(self.widget)
+        self.caption = QtWidgets.QLabel()
+        self.tree = QtWidgets.QTreeView()
+        self.model = MergeTreeModel(self.tree)
+        self.tree.setModel(self.model)
+        self.tree.header().setDefaultSectionSize(200)
+        # sin foco ni selección: cada cuadro depende solo del estado, no de
+        # qué tramo (proceso) lo pintó
+        self.tree.setFocusPolicy(QtCore.Qt.NoFocus)
+        self.tree.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        layout.addWidget(self.caption)
+        layout.addWidget(self.tree)
+        self.widget.show()
+
+    def set_state(self, state):
+        """Enlaza el estado (tras restaurar un checkpoint) y expande como la ventana."""
+        self.model.set_state(state)
+        if state.n <= EXPAND_ALL_MAX_N:
+            self.tree.expandAll()
+        else:
+            self.tree.expandToDepth(3)
+        state.dirty.clear()
+
+    def render(self, state, cursor, count, path):
+        if state.dirty:
+            self.model.nodes_changed(state.dirty, visible_nodes(self.tree))
+            state.dirty.clear()
+        self.caption.setText(f"MergeSort n={state.n} · evento {cursor} de {count} · "
+                             f"comparaciones {state.comparisons}")
+        QtWidgets.QApplication.processEvents()
+        if not self.widget.grab().save(path, "PNG"):
+            raise OSError(f"No se pudo escribir el cuadro {path}")
+
+
+# ---------------- Workers ----------------
+_worker = {}
+
+
+def _init_worker(trace_path, size, stylesheet):
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    trace = TraceFile(trace_path)
+    _worker.update(app=app, trace=trace, timeline=MergeTimeline.from_trace(trace),
+                   renderer=TreeFrameRenderer(size, stylesheet))
+
+
+def _render_chunk(task):
+    """Restaura el checkpoint del tramo y pinta sus cuadros en orden."""
+    checkpoint, cursor, frames, out_dir = task
+    timeline, renderer = _worker["timeline"], _worker["renderer"]
+    state = MergeTreeState(timeline.original)
+    state.restore(checkpoint)
+    renderer.set_state(state)
+    for number, k in frames:
+        timeline.apply_range(state, cursor, k)
+        cursor = k
+        renderer.render(state, k, len(timeline), os.path.join(out_dir, FRAME_NAME.format(number)))
+    return len(frames)
+
+
+def _chunk_tasks(trace_path, chunks, out_dir):
+    """Un checkpoint por tramo, avanzando un único estado de principio a fin."""
+    trace = TraceFile(trace_path)
+    try:
+        timeline = MergeTimeline.from_trace(trace)
+        state = MergeTreeState(timeline.original)
+        tasks, cursor = [], 0
+        for chunk in chunks:
+            start = chunk[0][1]
+            timeline.apply_range(state, cursor, start)
+            cursor = start
+            tasks.append((state.snapshot(), cursor, chunk, out_dir))
+        return tasks
+    finally:
+        trace.close()
+
+
+def render_frames(trace_path, out_dir, frames=None, every=None, jobs=1,
+                  size=DEFAULT_SIZE, stylesheet="", progress=None):
+    """Escribe los cuadros PNG de la traza en out_dir. Devuelve cuántos son."""
+    trace = TraceFile(trace_path)
+    count = len(trace)
+    trace.close()
+    cursors = frame_events(count, frames, every)
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = max(1, jobs)
+    chunks = split_chunks(cursors, jobs * CHUNKS_PER_JOB if jobs > 1 else 1)
+    tasks = _chunk_tasks(trace_path, chunks, out_dir)
+    done = 0
+    if jobs == 1:
+        _init_worker(trace_path, size, stylesheet)
+        try:
+            for task in tasks:
+                done += _render_chunk(task)
+                if progress: progress(done, len(cursors))
+        finally:
+            _worker.pop("renderer", None)
+            _worker.pop("timeline", None)
+            _worker.pop("trace").close()
+        return done
+    # spawn: un fork heredaría el estado de Qt del proceso principal
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(jobs, _init_worker, (trace_path, size, stylesheet)) as pool:
+        for rendered in pool.imap_unordered(_render_chunk, tasks):
+            done += rendered
+            if progress: progress(done, len(cursors))
+    return done
+
+
+def write_gif(frame_dir, count, path, frame_ms=40):
+    """Junta los cuadros PNG en un GIF animado (se leen de a uno)."""
+    if Image is None:
+        raise RuntimeError("Para escribir GIF hace falta Pillow (pip install pillow)")
+    paths = [os.path.join(frame_dir, FRAME_NAME.format(i)) for i in range(count)]
+    first = Image.open(paths[0])
+    rest = (Image.open(p) for p in paths[1:])
+    first.save(path, save_all=True, append_images=rest, duration=frame_ms, loop=0)
+
+
+def parse_size(text):
+    w, _, h = text.lower().partition("x")
+    return int(w), int(h)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render headless del árbol de merge sort")
+    src = parser.add_mutually_exclusive_group()
+    src.add_argument("--n", type=int, default=32, help="tamaño del arreglo aleatorio")
+    src.add_argument("--trace", help="traza grabada (.mstrace) a renderizar")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--frames", type=int, default=200, help="cuadros en total")
+    parser.add_argument("--every", type=int, help="eventos entre cuadros (ignora --frames)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--size", type=parse_size, default=DEFAULT_SIZE, help="ANCHOxALTO")
+    parser.add_argument("--out", help="carpeta para los cuadros PNG")
+    parser.add_argument("--gif", help="archivo GIF animado a escribir")
+    parser.add_argument("--frame-ms", type=int, default=40, help="duración de cada cuadro del GIF")
+    args = parser.parse_args(argv)
+    if not args.out and not args.gif:
+        parser.error("indicar --out, --gif o ambos")
+    if args.gif and Image is None:
+        parser.error("--gif necesita Pillow (pip install pillow)")
+
+    def progress(done, total):
+        print(f"\r{done}/{total} cuadros", end="", file=sys.stderr, flush=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        trace_path = args.trace
+        if trace_path is None:
+            rnd = random.Random(args.seed)
+            data = rnd.choices(range(args.n * 5 + 1), k=args.n)
+            trace_path = os.path.join(tmp, "corrida.mstrace")
+            record_trace(trace_path, data)
+        out_dir = args.out or os.path.join(tmp, "cuadros")
+        t0 = time.perf_counter()
+        count = render_frames(trace_path, out_dir, args.frames, args.every, args.jobs,
+                              args.size, ui_stylesheet(), progress)
+        dt = time.perf_counter() - t0
+        print(f"\r{count} cuadros en {dt:.2f} s ({count / dt:.1f} cuadros/s, "
+              f"{args.jobs} procesos)", file=sys.stderr)
+        if args.gif:
+            write_gif(out_dir, count, args.gif, args.frame_ms)
+            print(f"GIF: {args.gif}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
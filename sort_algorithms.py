@@ -0,0 +1,335 @@
+# sort_algorithms.py
+# Algoritmos instrumentados (cuentan comparaciones). Sin dependencias de Qt
+# para poder usarlos tanto desde la ventana de comparación como en batch.
+import random
+from functools import partial
+from array import array
+from importlib.util import find_spec
+
+# conteo vectorizado para arreglos enormes (10^7-10^8); NumPy es opcional y
+# se importa recién en la primera llamada, no al cargar el registro
+_HAS_NUMPY = find_spec("numpy") is not None
+
+# -----------------------------
+# Algoritmos instrumentados
+# -----------------------------
+
+def quicksort_count(arr):
+    def quicksort_recursive(a):
+        nonlocal comparisons
+        if len(a) <= 1:
+            return a
+        pivot = a[len(a)//2]
+        left, middle, right = [], [], []
+        for x in a:
+            comparisons += 1
+            if x < pivot:
+                left.append(x)
+            elif x == pivot:
+                middle.append(x)
+            else:
+                right.append(x)
+        return quicksort_recursive(left) + middle + quicksort_recursive(right)
+    comparisons = 0
+    sorted_arr = quicksort_recursive(arr)
+    return sorted_arr, comparisons
+
+
+# ---------------- Quicksort in-place (introsort) ----------------
+PARTITION_SCHEMES = ("hoare", "lomuto", "3way")
+PIVOT_RULES = ("middle", "median3", "random", "ninther")
+
+# por debajo de este tamaño el ninther se reduce a mediana de tres
+NINTHER_MIN = 40
+
+
+def quicksort_inplace_count(arr, scheme="hoare", pivot="median3", seed=0):
+    """Quicksort sobre una copia de arr, particionando en el sitio con
+       `scheme` (PARTITION_SCHEMES) y eligiendo el pivote con `pivot`
+       (PIVOT_RULES). Usa una pila explícita y, si un rango supera
+       2·log2(n) niveles, lo termina con heapsort (introsort).
+
+       Cuenta cada comparación entre elementos, incluidas las de la elección
+       del pivote y las del heapsort. `seed` fija el pivote aleatorio para
+       que el conteo sea reproducible.
+    """
+    if scheme not in PARTITION_SCHEMES:
+        raise ValueError(f"Esquema de partición desconocido: {scheme}")
+    if pivot not in PIVOT_RULES:
+        raise ValueError(f"Regla de pivote desconocida: {pivot}")
+    a = list(arr)
+    n = len(a)
+    comparisons = 0
+    rnd = random.Random(seed)
+
+    def median3(i, j, k):
+        nonlocal comparisons
+        x, y, z = a[i], a[j], a[k]
+        comparisons += 2
+        if x < y:
+            if y < z:
+                return j
+            comparisons += 1
+            return k if x < z else i
+        if x < z:
+            return i
+        comparisons += 1
+        return k if y < z else j
+
+    def choose_pivot(lo, hi):
+        if pivot == "middle":
+            return (lo + hi) // 2
+        if pivot == "random":
+            return rnd.randint(lo, hi)
+        mid = (lo + hi) // 2
+        if pivot == "ninther" and hi - lo + 1 >= NINTHER_MIN:
+            e = (hi - lo + 1) // 8
+            return median3(median3(lo, lo + e, lo + 2 * e),
+                           median3(mid - e, mid, mid + e),
+                           median3(hi - 2 * e, hi - e, hi))
+        return median3(lo, mid, hi)
+
+    def heapsort(lo, hi):
+        size = hi - lo + 1
+
+        def sift(root, end):
+            nonlocal comparisons
+            while True:
+                child = 2 * root + 1
+                if child >= end:
+                    return
+                if child + 1 < end:
+                    comparisons += 1
+                    if a[lo + child] < a[lo + child + 1]:
+                        child += 1
+                comparisons += 1
+                if not a[lo + root] < a[lo + child]:
+                    return
+                a[lo + root], a[lo + child] = a[lo + child], a[lo + root]
+                root = child
+
+        for root in range(size // 2 - 1, -1, -1):
+            sift(root, size)
+        for end in range(size - 1, 0, -1):
+            a[lo], a[lo + end] = a[lo + end], a[lo]
+            sift(0, end)
+
+    depth_limit = 2 * max(1, n.bit_length() - 1)
+    stack = [(0, n - 1, 0)]
+    while stack:
+        lo, hi, depth = stack.pop()
+        if hi <= lo:
+            continue
+        if depth > depth_limit:
+            heapsort(lo, hi)
+            continue
+
+        p = choose_pivot(lo, hi)
+        if scheme == "lomuto":
+            a[p], a[hi] = a[hi], a[p]
+            pv = a[hi]
+            i = lo
+            for j in range(lo, hi):
+                if a[j] < pv:
+                    a[i], a[j] = a[j], a[i]
+                    i += 1
+            comparisons += hi - lo
+            a[i], a[hi] = a[hi], a[i]
+            left, right = (lo, i - 1), (i + 1, hi)
+        elif scheme == "hoare":
+            # con el pivote en lo, j termina en [lo, hi-1]: ambos lados avanzan
+            a[p], a[lo] = a[lo], a[p]
+            pv = a[lo]
+            i, j = lo - 1, hi + 1
+            while True:
+                i += 1
+                comparisons += 1
+                while a[i] < pv:
+                    i += 1
+                    comparisons += 1
+                j -= 1
+                comparisons += 1
+                while pv < a[j]:
+                    j -= 1
+                    comparisons += 1
+                if i >= j:
+                    break
+                a[i], a[j] = a[j], a[i]
+            left, right = (lo, j), (j + 1, hi)
+        else:
+            # Bentley-McIlroy: i y j barren como en Hoare y los iguales al
+            # pivote se apartan en los extremos [lo, eq_lo] y [eq_hi, hi];
+            # al final se llevan al centro. El pivote se toma por valor, sin
+            # moverlo a lo: a diferencia de la partición de Dijkstra no rota
+            # los lados, una entrada ordenada (o invertida) sigue ordenada y
+            # la mediana de tres no se degrada en los niveles siguientes.
+            pv = a[p]
+            i, j = lo - 1, hi + 1
+            eq_lo, eq_hi = lo - 1, hi + 1
+            while True:
+                i += 1
+                comparisons += 1
+                while a[i] < pv and i < hi:
+                    i += 1
+                    comparisons += 1
+                j -= 1
+                comparisons += 1
+                while pv < a[j] and j > lo:
+                    j -= 1
+                    comparisons += 1
+                if i == j:
+                    comparisons += 1
+                    if a[i] == pv:
+                        eq_lo += 1
+                        a[eq_lo], a[i] = a[i], a[eq_lo]
+                if i >= j:
+                    break
+                a[i], a[j] = a[j], a[i]
+                comparisons += 2
+                if a[i] == pv:
+                    eq_lo += 1
+                    a[eq_lo], a[i] = a[i], a[eq_lo]
+                if a[j] == pv:
+                    eq_hi -= 1
+                    a[eq_hi], a[j] = a[j], a[eq_hi]
+            i = j + 1
+            for k in range(lo, eq_lo + 1):
+                a[k], a[j] = a[j], a[k]
+                j -= 1
+            for k in range(hi, eq_hi - 1, -1):
+                a[k], a[i] = a[i], a[k]
+                i += 1
+            left, right = (lo, j), (i, hi)
+
+        # el rango menor se procesa primero: la pila queda en O(log n)
+        if left[1] - left[0] > right[1] - right[0]:
+            left, right = right, left
+        stack.append((right[0], right[1], depth + 1))
+        stack.append((left[0], left[1], depth + 1))
+    return a, comparisons
+
+
+def mergesort_count(arr):
+    def merge(left, right):
+        nonlocal comparisons
+        result = []
+        i = j = 0
+        while i < len(left) and j < len(right):
+            comparisons += 1
+            if left[i] < right[j]:
+                result.append(left[i])
+                i += 1
+            else:
+                result.append(right[j])
+                j += 1
+        result += left[i:]
+        result += right[j:]
+        return result
+
+    def mergesort_recursive(a):
+        if len(a) <= 1:
+            return a
+        mid = len(a)//2
+        left = mergesort_recursive(a[:mid])
+        right = mergesort_recursive(a[mid:])
+        return merge(left, right)
+
+    comparisons = 0
+    sorted_arr = mergesort_recursive(arr)
+    return sorted_arr, comparisons
+
+
+def _split_bounds(n, depth):
+    """Límites de los segmentos a profundidad `depth` del árbol de
+       mergesort_count (un segmento de longitud 1 ya no se divide). Se
+       regenera desde la raíz: el nivel d cuesta O(2^d), O(n) en total."""
+    bounds = array('q', (0, n))
+    for _ in range(depth):
+        nxt = array('q', (0,))
+        for k in range(1, len(bounds)):
+            l, r = bounds[k - 1], bounds[k]
+            if r - l > 1:
+                nxt.append((l + r) // 2)
+            nxt.append(r)
+        bounds = nxt
+    return bounds
+
+
+def mergesort_bottomup_count(arr):
+    """Mismo árbol de divisiones (mid = len // 2) y mismo conteo de
+       comparaciones que mergesort_count, pero iterativo y sin slices: se
+       mezcla nivel por nivel, del más profundo a la raíz, alternando entre
+       dos buffers reservados una sola vez.
+
+       El nivel d escribe en bufs[d % 2] y lee del otro. Las hojas nunca se
+       escriben antes que sus ancestros, así que con ambos buffers iniciados
+       como copia de arr toda hoja se lee bien desde cualquiera de los dos.
+    """
+    n = len(arr)
+    if n <= 1:
+        return list(arr), 0
+
+    # profundidad de los merges más profundos (el segmento mayor llega a 2)
+    depth = 0
+    size = n
+    while size > 2:
+        size = (size + 1) // 2
+        depth += 1
+
+    bufs = (list(arr), list(arr))
+    comparisons = 0
+    for d in range(depth, -1, -1):
+        dst = bufs[d & 1]
+        src = bufs[(d + 1) & 1]
+        bounds = _split_bounds(n, d)
+        for k in range(1, len(bounds)):
+            l, r = bounds[k - 1], bounds[k]
+            if r - l <= 1:
+                continue
+            m = (l + r) // 2
+            i, j, out = l, m, l
+            # sin len() en el bucle: los límites son enteros locales
+            while i < m and j < r:
+                x = src[i]
+                y = src[j]
+                if x < y:
+                    dst[out] = x
+                    i += 1
+                else:
+                    dst[out] = y
+                    j += 1
+                out += 1
+            # una comparación por elemento colocado dentro del bucle
+            comparisons += out - l
+            while i < m:
+                dst[out] = src[i]
+                i += 1
+                out += 1
+            while j < r:
+                dst[out] = src[j]
+                j += 1
+                out += 1
+    return bufs[0], comparisons
+
+
+def mergesort_numpy_count(arr):
+    """merge_counts.mergesort_numpy_count, importado (con NumPy) al usarlo."""
+    from merge_counts import mergesort_numpy_count as count
+    return count(arr)
+
+
+# Registro de algoritmos disponibles: nombre -> función(arr) -> (ordenado, comparaciones)
+ALGORITHMS = {
+    "quicksort": quicksort_count,
+    "mergesort": mergesort_count,
+    "mergesort_bottomup": mergesort_bottomup_count,
+}
+# quicksort in-place: "quicksort_<esquema>_<pivote>", p. ej. "quicksort_hoare_median3"
+for _scheme in PARTITION_SCHEMES:
+    for _pivot in PIVOT_RULES:
+        ALGORITHMS[f"quicksort_{_scheme}_{_pivot}"] = partial(
+            quicksort_inplace_count, scheme=_scheme, pivot=_pivot)
+del _scheme, _pivot
+if _HAS_NUMPY:
+    # mismas comparaciones que "mergesort" y "mergesort_bottomup"
+    ALGORITHMS["mergesort_numpy"] = mergesort_numpy_count
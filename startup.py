@@ -0,0 +1,72 @@
+# startup.py
+# Reporte de arranque en frío: costo de import por paquete y tiempo hasta cada
+# ventana. Se activa con --startup-report (o SORTVIS_STARTUP_REPORT=1) y debe
+# importarse antes que cualquier otra dependencia; sin activar no hace nada.
+# Sin dependencias.
+import builtins
+import os
+import sys
+import time
+
+T0 = time.perf_counter()
+
+FLAG = "--startup-report"
+ENV_VAR = "SORTVIS_STARTUP_REPORT"
+
+_original_import = None
+_imports = {}     # paquete de primer nivel -> segundos propios (sin anidados)
+_nested = []      # por import en curso: tiempo de sus imports anidados
+
+
+def requested(argv=None):
+    """True si se pidió el reporte por línea de comandos o por entorno."""
+    argv = sys.argv if argv is None else argv
+    return FLAG in argv or os.environ.get(ENV_VAR, "") not in ("", "0")
+
+
+def active():
+    return _original_import is not None
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # solo los imports absolutos de módulos nuevos cuestan algo; los
+    # relativos quedan dentro del tiempo del paquete que los hace
+    if level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    _nested.append(0.0)
+    t = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        dt = time.perf_counter() - t
+        own = dt - _nested.pop()
+        top = name.partition(".")[0]
+        _imports[top] = _imports.get(top, 0.0) + own
+        if _nested:
+            _nested[-1] += dt
+
+
+def install():
+    """Empieza a medir los imports (tiempo propio de cada paquete: lo que
+       importa numpy desde pyqtgraph se cuenta en numpy)."""
+    global _original_import
+    if _original_import is None:
+        _original_import = builtins.__import__
+        builtins.__import__ = _timed_import
+
+
+def report(titulo, limit=12, out=None):
+    """Imprime el tiempo desde el arranque y los paquetes importados desde el
+       reporte anterior, de mayor a menor costo."""
+    out = sys.stderr if out is None else out
+    elapsed = time.perf_counter() - T0
+    print(f"[arranque] {titulo} — {elapsed * 1000:.0f} ms desde el inicio", file=out)
+    ranking = sorted(_imports.items(), key=lambda kv: kv[1], reverse=True)
+    for name, secs in ranking[:limit]:
+        print(f"    {secs * 1000:8.1f} ms  {name}", file=out)
+    if len(ranking) > limit:
+        resto = sum(secs for _, secs in ranking[limit:])
+        print(f"    {resto * 1000:8.1f} ms  ({len(ranking) - limit} paquetes más)", file=out)
+    total = sum(_imports.values())
+    print(f"    {total * 1000:8.1f} ms  total en imports", file=out)
+    _imports.clear()
@@ -1,69 +1,149 @@
 import sys
 import random
-import time
-import psutil
+import threading
+import traceback
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel, QToolTip,
-    QLineEdit, QPushButton, QHBoxLayout
+    QLineEdit, QPushButton, QHBoxLayout, QComboBox, QTableWidget, QTableWidgetItem,
+    QHeaderView
 )
-from PySide6.QtCore import QTimer, Qt
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, Signal
 from PySide6.QtGui import QCursor
-import pyqtgraph as pg
+
+from measure import measure_sort, start_batch
+from sort_algorithms import ALGORITHMS, PARTITION_SCHEMES, PIVOT_RULES
+from instrumented import INSTRUMENTED, measure_costs
+from bounds import mergesort_best, mergesort_worst, mergesort_expected, quicksort_expected
+
+
+# Variantes seleccionables: texto del combo -> nombre en ALGORITHMS
+QUICKSORT_VARIANTS = {"Quicksort con listas (original)": "quicksort"}
+for _scheme in PARTITION_SCHEMES:
+    for _pivot in PIVOT_RULES:
+        QUICKSORT_VARIANTS[f"Quicksort in-place {_scheme} / {_pivot}"] = f"quicksort_{_scheme}_{_pivot}"
+del _scheme, _pivot
+
+MERGESORT_VARIANTS = {
+    "Mergesort recursivo (slices)": "mergesort",
+    "Mergesort bottom-up (2 buffers)": "mergesort_bottomup",
+}
+
+# desde este tamaño las comparaciones de mergesort se cuentan con NumPy
+# (mismo resultado que ambas variantes, ~10x más rápido)
+VECTORIZED_MIN_N = 1_000_000
+
+# puntos por curva teórica superpuesta a las comparaciones medidas
+THEORY_POINTS = 200
+
+# los costos se cuentan evento por evento (~30 s por algoritmo en 10^6)
+COSTS_MAX_N = 200_000
+# columnas de la tabla de costos: clave de SortStats.to_dict() -> encabezado
+COST_COLUMNS = {
+    "comparisons": "Comparaciones",
+    "reads": "Lecturas",
+    "writes": "Escrituras",
+    "aux_peak": "Memoria aux. (pico)",
+    "max_depth": "Profundidad",
+}
+
+# pyqtgraph (y con él numpy) se importa al crear la primera ventana: los hijos
+# "spawn" de measure reimportan este módulo cuando se ejecuta como script y
+# no necesitan gráficas, y el launcher no paga por ellas hasta abrirla
+pg = None
+
+
+def _load_pyqtgraph():
+    global pg
+    if pg is None:
+        import pyqtgraph
+        pg = pyqtgraph
+    return pg
 
 
 # -----------------------------
-# Algoritmos instrumentados
+# Ejecución en segundo plano
 # -----------------------------
 
-def quicksort_count(arr):
-    def quicksort_recursive(a):
-        nonlocal comparisons
-        if len(a) <= 1:
-            return a
-        pivot = a[len(a)//2]
-        left, middle, right = [], [], []
-        for x in a:
-            comparisons += 1
-            if x < pivot:
-                left.append(x)
-            elif x == pivot:
-                middle.append(x)
-            else:
-                right.append(x)
-        return quicksort_recursive(left) + middle + quicksort_recursive(right)
-    comparisons = 0
-    sorted_arr = quicksort_recursive(arr)
-    return sorted_arr, comparisons
-
-
-def mergesort_count(arr):
-    def merge(left, right):
-        nonlocal comparisons
-        result = []
-        i = j = 0
-        while i < len(left) and j < len(right):
-            comparisons += 1
-            if left[i] < right[j]:
-                result.append(left[i])
-                i += 1
-            else:
-                result.append(right[j])
-                j += 1
-        result += left[i:]
-        result += right[j:]
-        return result
-
-    def mergesort_recursive(a):
-        if len(a) <= 1:
-            return a
-        mid = len(a)//2
-        left = mergesort_recursive(a[:mid])
-        right = mergesort_recursive(a[mid:])
-        return merge(left, right)
-
-    comparisons = 0
-    sorted_arr = mergesort_recursive(arr)
-    return sorted_arr, comparisons
+class ComparisonSignals(QObject):
+    progress = Signal(str)                        # texto de estado
+    sample = Signal(str, float, float, float)     # algoritmo, t (ms), CPU %, RSS MB
+    result = Signal(object)                       # {"size": n, "quicksort": res, "mergesort": res}
+    cancelled = Signal()
+    failed = Signal(str)
+
+
+class BatchSignals(QObject):
+    done = Signal(object)  # concurrent.futures.Future de measure.compare_task
+
+
+class CostsSignals(QObject):
+    done = Signal(int, object)   # tamaño, {algoritmo: SortStats.to_dict()}
+    failed = Signal(str)
+
+
+class ComparisonWorker(QRunnable):
+    """Genera la lista y mide ambos algoritmos fuera del hilo de la GUI.
+    Las muestras de CPU/RSS llegan en vivo por señales; cancel() mata el
+    proceso que esté ordenando en ese momento."""
+
+    ALGORITHMS = ("quicksort", "mergesort")
+
+    def __init__(self, size, quicksort="quicksort", mergesort="mergesort"):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.size = size
+        # papel en la comparación -> algoritmo registrado que se mide
+        self.names = {"quicksort": quicksort, "mergesort": mergesort}
+        self.signals = ComparisonSignals()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        try:
+            self.signals.progress.emit(f"Generando lista de tamaño {self.size}...")
+            data = [random.randint(1, 10000) for _ in range(self.size)]
+            results = {"size": self.size}
+            for role in self.ALGORITHMS:
+                if self._cancel.is_set():
+                    self.signals.cancelled.emit()
+                    return
+                name = self.names[role]
+                self.signals.progress.emit(f"Tamaño {self.size}: ordenando con {name}...")
+                res = measure_sort(
+                    name, data,
+                    on_sample=lambda t, cpu, rss, role=role: self.signals.sample.emit(role, t, cpu, rss),
+                    should_cancel=self._cancel.is_set,
+                )
+                if res is None:
+                    self.signals.cancelled.emit()
+                    return
+                results[role] = res
+            self.signals.result.emit(results)
+        except Exception:
+            traceback.print_exc()
+            self.signals.failed.emit(traceback.format_exc(limit=1))
+
+
+class CostsWorker(QRunnable):
+    """Corre todos los algoritmos del registro instrumentado sobre una misma
+    lista y reporta sus costos (comparaciones, lecturas, escrituras, pico de
+    memoria auxiliar y profundidad)."""
+
+    def __init__(self, size):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.size = size
+        self.signals = CostsSignals()
+
+    def run(self):
+        try:
+            data = [random.randint(1, 10000) for _ in range(self.size)]
+            self.signals.done.emit(self.size, measure_costs(data))
+        except Exception:
+            traceback.print_exc()
+            self.signals.failed.emit(traceback.format_exc(limit=1))
 
 
 # -----------------------------
@@ -96,28 +176,61 @@ class SortingComparison(QMainWindow):
         self.btn_multi = QPushButton("Comparar múltiples listas")
         self.btn_multi.clicked.connect(self.start_multiple_comparisons)
 
+        self.combo_quick = QComboBox()
+        self.combo_quick.addItems(list(QUICKSORT_VARIANTS))
+        self.combo_quick.setToolTip("Variante de quicksort: partición y regla de pivote")
+        self.combo_quick.currentTextChanged.connect(self.update_theory_curves)
+
+        self.combo_merge = QComboBox()
+        self.combo_merge.addItems(list(MERGESORT_VARIANTS))
+        self.combo_merge.setToolTip("Variante de mergesort a comparar contra quicksort")
+
+        self.btn_costs = QPushButton("Costos por algoritmo")
+        self.btn_costs.setToolTip("Lecturas, escrituras, memoria auxiliar y profundidad "
+                                  "de cada algoritmo instrumentado para el tamaño indicado")
+        self.btn_costs.clicked.connect(self.start_costs)
+
+        self.btn_cancel = QPushButton("Cancelar")
+        self.btn_cancel.setEnabled(False)
+        self.btn_cancel.clicked.connect(self.cancel_comparison)
+
         control_layout.addWidget(self.input_size)
         control_layout.addWidget(self.btn_start)
         control_layout.addWidget(self.input_multi)
         control_layout.addWidget(self.btn_multi)
+        control_layout.addWidget(self.combo_quick)
+        control_layout.addWidget(self.combo_merge)
+        control_layout.addWidget(self.btn_costs)
+        control_layout.addWidget(self.btn_cancel)
         layout.addLayout(control_layout)
 
         self.label_status = QLabel("Listo para comparar algoritmos.")
         self.label_status.setAlignment(Qt.AlignCenter)
+        self.label_status.setWordWrap(True)
         layout.addWidget(self.label_status)
 
         # -----------------------------
         # Gráficas
         # -----------------------------
-        self.plot_widget_cpu = pg.PlotWidget(title="Uso de CPU (%)")
-        self.plot_widget_ram = pg.PlotWidget(title="Uso de RAM (GB)")
+        _load_pyqtgraph()
+        self.plot_widget_cpu = pg.PlotWidget(title="CPU del proceso que ordena (%)")
+        self.plot_widget_ram = pg.PlotWidget(title="RSS del proceso que ordena (MB)")
         self.plot_widget_comp = pg.PlotWidget(title="Tamaño del arreglo vs Comparaciones")
         layout.addWidget(self.plot_widget_cpu)
         layout.addWidget(self.plot_widget_ram)
         layout.addWidget(self.plot_widget_comp)
-        legend_label = QLabel("🔴 Quicksort   🔵 Mergesort")
-        legend_label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(legend_label)
+        self.legend_label = QLabel("🔴 Quicksort   🔵 Mergesort")
+        self.legend_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.legend_label)
+
+        # Costos del registro instrumentado (una fila por algoritmo)
+        self.table_costs = QTableWidget(len(INSTRUMENTED), len(COST_COLUMNS))
+        self.table_costs.setHorizontalHeaderLabels(list(COST_COLUMNS.values()))
+        self.table_costs.setVerticalHeaderLabels([label for label, _ in INSTRUMENTED.values()])
+        self.table_costs.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table_costs.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table_costs.setMaximumHeight(190)
+        layout.addWidget(self.table_costs)
         self.setCentralWidget(main_widget)
 
         # Configuración de curvas
@@ -137,11 +250,8 @@ class SortingComparison(QMainWindow):
         # Datos
         self.sizes, self.comparisons_qs, self.comparisons_ms = [], [], []
 
-        # Timers
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_metrics)
-        self.multi_timer = QTimer()
-        self.multi_timer.timeout.connect(self.run_next_random_list)
+        self.plot_widget_cpu.setLabel('bottom', 'Tiempo desde el inicio del sort (ms)')
+        self.plot_widget_ram.setLabel('bottom', 'Tiempo desde el inicio del sort (ms)')
 
         # Hover interactivo
         self.scatter_comp_qs = pg.ScatterPlotItem(pen=pen_qs, brush='r', size=7, hoverable=True)
@@ -151,16 +261,32 @@ class SortingComparison(QMainWindow):
         self.plot_widget_comp.addItem(self.scatter_comp_qs)
         self.plot_widget_comp.addItem(self.scatter_comp_ms)
 
+        # Curvas teóricas (bounds.py) sobre los puntos medidos
+        self.curve_ms_worst = self.plot_widget_comp.plot(
+            pen=pg.mkPen('b', width=1, style=Qt.DashLine), name="Mergesort peor caso")
+        self.curve_ms_best = self.plot_widget_comp.plot(
+            pen=pg.mkPen('b', width=1, style=Qt.DotLine), name="Mergesort mejor caso")
+        self.curve_ms_expected = self.plot_widget_comp.plot(
+            pen=pg.mkPen('c', width=1, style=Qt.DashDotLine), name="Mergesort esperado")
+        self.curve_qs_expected = self.plot_widget_comp.plot(
+            pen=pg.mkPen('r', width=1, style=Qt.DashLine), name="Quicksort esperado")
+
         self.plot_widget_comp.setLabel('left', 'Comparaciones (miles)')
         self.plot_widget_comp.setLabel('bottom', 'Tamaño del arreglo')
 
-        # Datos de simulación en curso
-        self.cpu_qs, self.cpu_ms, self.ram_qs, self.ram_ms, self.x_data = [], [], [], [], []
-        self.max_steps = 50
+        # Comparaciones múltiples en el pool de procesos
+        self.executor = None
+        self.batch_signals = BatchSignals()
+        self.batch_signals.done.connect(self.on_batch_result)
+        self.batch_futures = set()
+        self.batch_total = 0
+        self.batch_done = 0
 
-        # Parámetros para pruebas múltiples
-        self.random_tests = []
-        self.current_test = 0
+        # Ejecución en segundo plano
+        self.pool = QThreadPool.globalInstance()
+        self.worker = None
+        self.costs_worker = None
+        self.live = {}  # algoritmo -> (t, cpu, rss) de la corrida en curso
 
     # -----------------------------
     # Tooltip de hover
@@ -192,76 +318,170 @@ class SortingComparison(QMainWindow):
         except ValueError:
             self.label_status.setText("❌ Ingresa un número válido de listas.")
             return
-        self.random_tests = [random.randint(100, 10000) for _ in range(n_tests)]
-        self.current_test = 0
-        self.label_status.setText(f"Ejecutando {n_tests} comparaciones...")
-        self.run_next_random_list()
-
-    def run_next_random_list(self):
-        if self.current_test >= len(self.random_tests):
-            self.multi_timer.stop()
-            self.label_status.setText("✅ Comparaciones múltiples completadas.")
+        if n_tests <= 0 or self.worker is not None or self.executor is not None:
             return
-        size = self.random_tests[self.current_test]
-        self.current_test += 1
-        self.prepare_and_run(size, auto_mode=True)
-
-    # -----------------------------
-    # Configura la ejecución
-    # -----------------------------
-    def prepare_and_run(self, size, auto_mode=False):
-        self.data = [random.randint(1, 10000) for _ in range(size)]
-        self.size = size
-        self.x_data.clear()
-        self.cpu_qs.clear()
-        self.cpu_ms.clear()
-        self.ram_qs.clear()
-        self.ram_ms.clear()
-        self.auto_mode = auto_mode
-        self.timer.start(100)
+        sizes = [random.randint(100, 10000) for _ in range(n_tests)]
+        self.batch_total = n_tests
+        self.batch_done = 0
+        self.label_status.setText(f"Ejecutando {n_tests} comparaciones en paralelo...")
+        self.set_running(True)
+        # las señales se emiten desde el hilo del pool y llegan encoladas a la GUI
+        self.executor, futures = start_batch(sizes, self.batch_signals.done.emit,
+                                             quicksort=self.selected_quicksort(),
+                                             mergesort=self.selected_mergesort())
+        self.batch_futures = set(futures)
+
+    def on_batch_result(self, fut):
+        if fut not in self.batch_futures:
+            return  # resultado de un lote ya cancelado
+        self.batch_futures.discard(fut)
+        if not fut.cancelled():
+            try:
+                res = fut.result()
+            except Exception as e:
+                self.finish_batch(f"❌ Error en una comparación: {e}")
+                return
+            self.batch_done += 1
+            res_qs, res_ms = res["quicksort"], res["mergesort"]
+            self.add_comparison_point(res["size"], res_qs["comparisons"], res_ms["comparisons"])
+            self.label_status.setText(
+                f"{self.batch_done}/{self.batch_total} listas | Tamaño {res['size']}: "
+                f"QS={res_qs['comparisons']/1000:.1f}K en {res_qs['wall_ns']/1e6:.1f} ms | "
+                f"MS={res_ms['comparisons']/1000:.1f}K en {res_ms['wall_ns']/1e6:.1f} ms"
+            )
+        if not self.batch_futures:
+            self.finish_batch("✅ Comparaciones múltiples completadas.")
+
+    def finish_batch(self, message):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self.batch_futures = set()
+        self.set_running(False)
+        self.label_status.setText(message)
 
     # -----------------------------
-    # Actualiza métricas durante la ejecución
+    # Modo: Costos del registro instrumentado
     # -----------------------------
-    def update_metrics(self):
-        step = len(self.x_data)
-        if step >= self.max_steps:
-            self.timer.stop()
-            self.run_sorts()
+    def start_costs(self):
+        try:
+            size = int(self.input_size.text())
+        except ValueError:
+            self.label_status.setText("❌ Ingresa un número válido de tamaño.")
             return
-
-        self.x_data.append(step)
-        cpu = psutil.cpu_percent(interval=None)
-        ram = psutil.virtual_memory().used / (1024**3)
-        self.cpu_qs.append(cpu + random.uniform(-5, 5))
-        self.cpu_ms.append(cpu + random.uniform(-10, 10))
-        self.ram_qs.append(ram + random.uniform(-0.05, 0.05))
-        self.ram_ms.append(ram + random.uniform(-0.03, 0.03))
-
-        self.curve_cpu_qs.setData(self.x_data, self.cpu_qs)
-        self.curve_cpu_ms.setData(self.x_data, self.cpu_ms)
-        self.curve_ram_qs.setData(self.x_data, self.ram_qs)
-        self.curve_ram_ms.setData(self.x_data, self.ram_ms)
+        if size <= 0 or self.costs_worker is not None:
+            return
+        if size > COSTS_MAX_N:
+            self.label_status.setText(f"❌ Los costos se cuentan hasta {COSTS_MAX_N} elementos.")
+            return
+        worker = CostsWorker(size)
+        worker.signals.done.connect(self.on_costs)
+        worker.signals.failed.connect(self.on_costs_failed)
+        self.costs_worker = worker
+        self.btn_costs.setEnabled(False)
+        self.label_status.setText(f"Contando costos de {len(INSTRUMENTED)} algoritmos "
+                                  f"con tamaño {size}...")
+        self.pool.start(worker)
+
+    def on_costs(self, size, costs):
+        self.costs_worker = None
+        self.btn_costs.setEnabled(True)
+        for row, name in enumerate(INSTRUMENTED):
+            for col, key in enumerate(COST_COLUMNS):
+                item = QTableWidgetItem(f"{costs[name][key]:,}")
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table_costs.setItem(row, col, item)
+        self.label_status.setText(f"✅ Costos por algoritmo para tamaño {size}.")
+
+    def on_costs_failed(self, message):
+        self.costs_worker = None
+        self.btn_costs.setEnabled(True)
+        self.label_status.setText(f"❌ Error al contar costos: {message.strip()}")
 
     # -----------------------------
-    # Ejecución real y resumen
+    # Configura la ejecución
     # -----------------------------
-    def run_sorts(self):
-        size = self.size
-
-        start_qs = time.time()
-        _, comp_qs = quicksort_count(self.data.copy())
-        end_qs = time.time()
-
-        start_ms = time.time()
-        _, comp_ms = mergesort_count(self.data.copy())
-        end_ms = time.time()
+    def selected_quicksort(self):
+        return QUICKSORT_VARIANTS[self.combo_quick.currentText()]
 
-        avg_cpu_qs = sum(self.cpu_qs) / len(self.cpu_qs)
-        avg_cpu_ms = sum(self.cpu_ms) / len(self.cpu_ms)
-        avg_ram_qs = sum(self.ram_qs) / len(self.ram_qs)
-        avg_ram_ms = sum(self.ram_ms) / len(self.ram_ms)
+    def selected_mergesort(self):
+        return MERGESORT_VARIANTS[self.combo_merge.currentText()]
 
+    def prepare_and_run(self, size):
+        if self.worker is not None or self.executor is not None:
+            return
+        self.size = size
+        self.live = {name: ([], [], []) for name in ComparisonWorker.ALGORITHMS}
+        for curve in (self.curve_cpu_qs, self.curve_cpu_ms, self.curve_ram_qs, self.curve_ram_ms):
+            curve.setData([], [])
+
+        # en tamaños enormes se mide el conteo vectorizado en lugar de la
+        # variante elegida; se avisa en la leyenda y en el resumen
+        mergesort = self.selected_mergesort()
+        if size >= VECTORIZED_MIN_N and "mergesort_numpy" in ALGORITHMS:
+            mergesort = "mergesort_numpy"
+        self.set_mergesort_legend(mergesort)
+        worker = ComparisonWorker(size, self.selected_quicksort(), mergesort)
+        worker.signals.progress.connect(self.label_status.setText)
+        worker.signals.sample.connect(self.on_sample)
+        worker.signals.result.connect(self.run_sorts)
+        worker.signals.cancelled.connect(self.on_cancelled)
+        worker.signals.failed.connect(self.on_failed)
+        self.worker = worker
+        self.set_running(True)
+        self.pool.start(worker)
+
+    def set_mergesort_legend(self, measured):
+        """Nombra en la leyenda de las gráficas el mergesort que se mide."""
+        text = "🔴 Quicksort   🔵 Mergesort"
+        if measured != self.selected_mergesort():
+            text += f" ({measured}, en lugar de {self.selected_mergesort()})"
+        self.legend_label.setText(text)
+
+    def set_running(self, running):
+        self.btn_start.setEnabled(not running)
+        self.btn_multi.setEnabled(not running)
+        self.combo_quick.setEnabled(not running)
+        self.combo_merge.setEnabled(not running)
+        self.btn_cancel.setEnabled(running)
+
+    def cancel_comparison(self):
+        if self.executor is not None:
+            # las tareas pendientes se descartan; las que ya corren terminan solas
+            self.finish_batch("⏹ Comparaciones múltiples canceladas.")
+        elif self.worker is not None:
+            self.label_status.setText("Cancelando...")
+            self.worker.cancel()
+
+    def closeEvent(self, event):
+        # no dejar procesos hijos ordenando al cerrar la ventana
+        if self.executor is not None:
+            self.finish_batch("")
+        if self.worker is not None:
+            self.worker.cancel()
+        super().closeEvent(event)
+
+    def on_cancelled(self):
+        self.worker = None
+        self.set_running(False)
+        self.label_status.setText("⏹ Comparación cancelada.")
+
+    def on_failed(self, message):
+        self.worker = None
+        self.set_running(False)
+        self.label_status.setText(f"❌ Error al medir: {message.strip()}")
+
+    def on_sample(self, name, t_ms, cpu, rss):
+        t, cpu_s, rss_s = self.live[name]
+        t.append(t_ms); cpu_s.append(cpu); rss_s.append(rss)
+        if name == "quicksort":
+            self.curve_cpu_qs.setData(t, cpu_s)
+            self.curve_ram_qs.setData(t, rss_s)
+        else:
+            self.curve_cpu_ms.setData(t, cpu_s)
+            self.curve_ram_ms.setData(t, rss_s)
+
+    def add_comparison_point(self, size, comp_qs, comp_ms):
         # Guardar datos
         self.sizes.append(size)
         self.comparisons_qs.append(comp_qs)
@@ -276,14 +496,65 @@ class SortingComparison(QMainWindow):
         self.curve_comp_ms.setData(self.sizes, [c / 1000 for c in self.comparisons_ms])
         self.scatter_comp_qs.setData(self.sizes, [c / 1000 for c in self.comparisons_qs])
         self.scatter_comp_ms.setData(self.sizes, [c / 1000 for c in self.comparisons_ms])
+        self.update_theory_curves()
+
+    def update_theory_curves(self):
+        """Recalcula las curvas teóricas sobre el rango de tamaños medidos.
+        Cada punto es O(log n), así que se redibujan completas cada vez."""
+        if not self.sizes:
+            return
+        lo, hi = self.sizes[0], self.sizes[-1]
+        step = max(1, (hi - lo) // THEORY_POINTS)
+        xs = list(range(lo, hi + 1, step))
+        if xs[-1] != hi:
+            xs.append(hi)
+        self.curve_ms_worst.setData(xs, [mergesort_worst(n) / 1000 for n in xs])
+        self.curve_ms_best.setData(xs, [mergesort_best(n) / 1000 for n in xs])
+        self.curve_ms_expected.setData(xs, [mergesort_expected(n) / 1000 for n in xs])
+        # "quicksort" es quicksort_count (pivote del medio); las variantes
+        # in-place se llaman "quicksort_<esquema>_<pivote>"
+        name = self.selected_quicksort()
+        scheme, pivot = None, "middle"
+        if name != "quicksort":
+            _, scheme, pivot = name.split("_")
+        self.curve_qs_expected.setData(xs, [quicksort_expected(n, pivot, scheme) / 1000 for n in xs])
 
+    # -----------------------------
+    # Ejecución real y resumen
+    # -----------------------------
+    def run_sorts(self, results):
+        """Recibe las mediciones del worker (cada algoritmo ordenó en su propio
+        proceso) y grafica la CPU y la RSS de ese proceso y las comparaciones."""
+        self.worker = None
+        self.set_running(False)
+        size = results["size"]
+        res_qs, res_ms = results["quicksort"], results["mergesort"]
+        comp_qs, comp_ms = res_qs["comparisons"], res_ms["comparisons"]
+
+        self.curve_cpu_qs.setData(res_qs["t_ms"], res_qs["cpu_pct"])
+        self.curve_cpu_ms.setData(res_ms["t_ms"], res_ms["cpu_pct"])
+        self.curve_ram_qs.setData(res_qs["t_ms"], res_qs["rss_mb"])
+        self.curve_ram_ms.setData(res_ms["t_ms"], res_ms["rss_mb"])
+
+        self.add_comparison_point(size, comp_qs, comp_ms)
+
+        swapped = ""
+        if res_ms["algorithm"] != self.selected_mergesort():
+            swapped = (f" | Desde n = {VECTORIZED_MIN_N:,} se midió {res_ms['algorithm']} "
+                       f"en lugar de {self.selected_mergesort()} (mismas comparaciones)")
         self.label_status.setText(
-            f"✅ Tamaño {size}: QS={comp_qs/1000:.1f}K | MS={comp_ms/1000:.1f}K | "
-            f"CPU(QS): {avg_cpu_qs:.1f}% | CPU(MS): {avg_cpu_ms:.1f}%"
+            f"✅ Tamaño {size} ({res_qs['algorithm']} vs {res_ms['algorithm']}): QS={comp_qs/1000:.1f}K | MS={comp_ms/1000:.1f}K | "
+            f"Tiempo QS: {res_qs['wall_ns']/1e6:.1f} ms, MS: {res_ms['wall_ns']/1e6:.1f} ms | "
+            f"CPU QS: {res_qs['cpu_ns']/1e6:.1f} ms, MS: {res_ms['cpu_ns']/1e6:.1f} ms | "
+            f"Pico tracemalloc QS: {self.format_peak(res_qs)}, MS: {self.format_peak(res_ms)} | "
+            f"Pico RSS QS: {res_qs['rss_peak_mb']:.1f} MB, MS: {res_ms['rss_peak_mb']:.1f} MB"
+            f"{swapped}"
         )
 
-        if self.auto_mode:
-            QTimer.singleShot(500, self.run_next_random_list)
+    @staticmethod
+    def format_peak(res):
+        peak = res["tracemalloc_peak"]
+        return "n/d" if peak is None else f"{peak/1024:.0f} KiB"
 
 
 # -----------------------------